@@ -0,0 +1,194 @@
+import asyncio
+import os
+import sys
+import logging
+import threading
+from http import HTTPStatus
+
+import aiohttp
+
+from decoders import to_records
+from engine import TenantState, load_tenants
+from exceptions import RequestApiError, TelegramApiError
+from homework import (API_OK_MESSAGE, CONNECT_TIMEOUT, ENDPOINT, HEADERS,
+                      READ_TIMEOUT, RETRY_PERIOD, TELEGRAM_CHAT_ID,
+                      TELEGRAM_TOKEN, batch_messages, check_response,
+                      collect_messages, init, log_filters)
+from shutdown import SHUTDOWN_SIGNALS
+
+TELEGRAM_API_URL: str = os.getenv(
+    'TELEGRAM_API_URL', 'https://api.telegram.org'
+)
+CONNECTION_LIMIT: int = int(os.getenv('CONNECTION_LIMIT', 100))
+KEEPALIVE_TIMEOUT: int = 75
+MAX_CONCURRENT_POLLS: int = int(os.getenv('MAX_CONCURRENT_POLLS', 500))
+
+logger = logging.getLogger(__name__)
+for log_filter in log_filters:
+    logger.addFilter(log_filter)
+
+_session = None
+
+
+def get_client_session() -> aiohttp.ClientSession:
+    """Возвращает общую сессию aiohttp с пулом keep-alive соединений.
+    Сессия создаётся при первом вызове внутри работающего цикла событий
+    и переиспользуется всеми запросами к API и к Telegram.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            keepalive_timeout=KEEPALIVE_TIMEOUT
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=CONNECT_TIMEOUT,
+            sock_read=READ_TIMEOUT
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _session
+
+
+async def close_client_session() -> None:
+    """Закрывает общую сессию aiohttp."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def async_get_api_answer(timestamp, headers=HEADERS) -> dict:
+    """Асинхронно делает запрос к API.
+    Принимает временную метку и заголовки авторизации,
+    возвращает ответ API, приведённый к типам данных Python.
+    """
+    session = get_client_session()
+    try:
+        async with session.get(
+            ENDPOINT,
+            headers=headers,
+            params={'from_date': timestamp}
+        ) as homework_statuses:
+            if homework_statuses.status == HTTPStatus.OK:
+                logger.info(API_OK_MESSAGE)
+                return to_records(await homework_statuses.json())
+            text = await homework_statuses.text()
+            logger.error(
+                'Ошибка при запросе к API: %s - %s',
+                homework_statuses.status, text
+            )
+            raise RequestApiError('Ошибка при запросе к API')
+    except RequestApiError:
+        raise
+    except Exception as error:
+        logger.error(error)
+        raise RequestApiError(
+            'Неожиданный результат запроса к API'
+        ) from error
+
+
+async def async_send_message(message, chat_id=TELEGRAM_CHAT_ID,
+                             token=TELEGRAM_TOKEN, api_url=None) -> None:
+    """Асинхронно отправляет сообщение через Bot API.
+    Запрос идёт через ту же общую сессию, что и запросы к API практикума.
+    api_url по умолчанию - TELEGRAM_API_URL.
+    """
+    logger.info('Вызвана async_send_message().')
+    session = get_client_session()
+    async with session.post(
+        f'{api_url or TELEGRAM_API_URL}/bot{token}/sendMessage',
+        json={'chat_id': chat_id, 'text': message}
+    ) as response:
+        payload = await response.json(content_type=None)
+    if not payload.get('ok'):
+        raise TelegramApiError(payload.get('description'))
+    logger.debug('Сообщение успешно отправлено в Telegram')
+
+
+async def async_poll_tenant(state) -> None:
+    """Выполняет один цикл опроса подписчика без блокировок."""
+    response = await async_get_api_answer(state.timestamp, state.headers)
+    check_response(response)
+    state.timestamp = response.get('current_date', state.timestamp)
+    homeworks = response['homeworks']
+    if not homeworks:
+        return
+    messages, changes = collect_messages(homeworks, state.sent_statuses)
+    for batch in batch_messages(messages):
+        await async_send_message(batch, state.tenant.chat_id)
+    state.sent_statuses.update(changes)
+
+
+async def async_poll(state, semaphore) -> None:
+    """Опрашивает подписчика, ограничивая число запросов в полёте."""
+    async with semaphore:
+        try:
+            await async_poll_tenant(state)
+            state.error_sent = False
+        except Exception as error:
+            if not state.error_sent:
+                logger.error(
+                    'Ошибка опроса для чата %s: %s',
+                    state.tenant.chat_id, error
+                )
+                state.error_sent = True
+
+
+def add_signal_handlers(stop):
+    """Взводит stop по SIGTERM и SIGINT.
+    Обработчики ставятся в цикл событий, поэтому сигнал будит
+    ожидание stop сразу. Вне главного потока ничего не делает.
+    Возвращает номера сигналов, для которых поставлен обработчик.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return []
+    loop = asyncio.get_running_loop()
+    for signum in SHUTDOWN_SIGNALS:
+        loop.add_signal_handler(signum, stop.set)
+    return list(SHUTDOWN_SIGNALS)
+
+
+async def async_main(tenants=None, iterations=None) -> None:
+    """Основная логика работы бота на asyncio.
+    Все подписчики опрашиваются конкурентно в одном цикле событий.
+    SIGTERM или SIGINT прерывает паузу между опросами сразу,
+    а начатые опросы и отправки дорабатываются.
+    """
+    if tenants is None:
+        tenants = load_tenants()
+    states = [TenantState(tenant) for tenant in tenants]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+    stop = asyncio.Event()
+    signals = add_signal_handlers(stop)
+    try:
+        while not stop.is_set():
+            await asyncio.gather(
+                *(async_poll(state, semaphore) for state in states)
+            )
+            if iterations is not None:
+                iterations -= 1
+                if iterations <= 0:
+                    break
+            try:
+                await asyncio.wait_for(stop.wait(), RETRY_PERIOD)
+            except asyncio.TimeoutError:
+                pass
+        if stop.is_set():
+            logger.info('Бот остановлен по сигналу')
+    finally:
+        for signum in signals:
+            asyncio.get_running_loop().remove_signal_handler(signum)
+        await close_client_session()
+
+
+def main() -> None:
+    """Запускает асинхронную версию бота."""
+    init()
+    if TELEGRAM_TOKEN is None:
+        logger.critical('Отсутствует переменная окружения: TELEGRAM_TOKEN')
+        sys.exit(1)
+    asyncio.run(async_main())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Бенчмарк разбора больших ответов API разными декодерами JSON.
+
+Сравнивает json.loads в словари, как делает response.json(),
+с декодерами из decoders.py: время разбора одного ответа и память,
+которую занимает результат.
+Запуск: python -m benchmarks.bench_decode --homeworks 500 --responses 50
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+
+from benchmarks.bench_schema import make_responses
+from decoders import DECODERS, get_decoder
+
+
+def parse_args():
+    """Разбирает параметры командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--homeworks', type=int, default=500)
+    parser.add_argument('--responses', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=10)
+    return parser.parse_args()
+
+
+def retained_bytes(decoder, bodies):
+    """Возвращает объём памяти, занятой разобранными ответами."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    decoded = [decoder(body) for body in bodies]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del decoded
+    return retained
+
+
+def run(args):
+    """Замеряет все доступные декодеры и возвращает отчёт."""
+    bodies = [
+        json.dumps(response, ensure_ascii=False).encode()
+        for response in make_responses(args.responses, args.homeworks)
+    ]
+    candidates = {'json.loads': json.loads}
+    for name, (library, _) in DECODERS.items():
+        if library is not None:
+            candidates[name] = get_decoder(name)
+    best = dict.fromkeys(candidates, float('inf'))
+    for _ in range(args.repeat):
+        for name, decoder in candidates.items():
+            elapsed = timeit.timeit(
+                lambda: [decoder(body) for body in bodies], number=1
+            )
+            best[name] = min(best[name], elapsed)
+    report = {
+        'body_kb': round(sum(map(len, bodies)) / len(bodies) / 1024, 1),
+    }
+    for name, decoder in candidates.items():
+        report[f'{name}_ms_per_response'] = round(
+            best[name] / len(bodies) * 1000, 3
+        )
+        report[f'{name}_kb_per_response'] = round(
+            retained_bytes(decoder, bodies) / len(bodies) / 1024, 1
+        )
+    return report
+
+
+def main():
+    """Запускает бенчмарк и печатает результат."""
+    for name, value in run(parse_args()).items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Бенчмарк диспетчера исходящих сообщений на заглушке Bot API.
+
+Запуск: python -m benchmarks.bench_dispatcher --messages 2000 --chats 200
+"""
+import argparse
+import time
+
+import telegram
+from telegram.utils.request import Request
+
+from benchmarks.fake_servers import FakeBotApi
+from dispatcher import SendDispatcher
+
+
+def parse_args():
+    """Разбирает параметры командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--chats', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--global-rate', type=float, default=1000.0)
+    parser.add_argument('--chat-rate', type=float, default=20.0)
+    parser.add_argument('--server-chat-rate', type=float, default=25.0)
+    parser.add_argument('--latency', type=float, default=0.005)
+    return parser.parse_args()
+
+
+def run(args):
+    """Прогоняет сообщения через диспетчер и возвращает метрики."""
+    with FakeBotApi(args.latency, args.server_chat_rate) as api:
+        bot = telegram.Bot(
+            '123:fake', base_url=api.bot_url,
+            request=Request(con_pool_size=args.workers)
+        )
+        dispatcher = SendDispatcher(
+            bot, workers=args.workers, global_rate=args.global_rate,
+            chat_rate=args.chat_rate, chat_burst=1
+        ).start()
+        started = time.perf_counter()
+        for index in range(args.messages):
+            dispatcher.send_message(index % args.chats, f'message {index}')
+        dispatcher.stop()
+        elapsed = time.perf_counter() - started
+        return {
+            'messages': args.messages,
+            'sent': dispatcher.sent,
+            'failed': dispatcher.failed,
+            'rejected_429': api.rejected,
+            'seconds': round(elapsed, 3),
+            'messages_per_second': round(dispatcher.sent / elapsed, 1),
+        }
+
+
+def main():
+    """Запускает бенчмарк и печатает результат."""
+    for name, value in run(parse_args()).items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
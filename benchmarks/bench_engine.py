@@ -0,0 +1,162 @@
+"""Сквозной бенчмарк движка опроса на локальных заглушках.
+
+Заглушки API Практикума и Bot API работают в отдельных процессах,
+бот опрашивает их так же, как в engine.main. Пример:
+
+python -m benchmarks.bench_engine --tenants 1000 --duration 20 --period 5
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import time
+
+from benchmarks.fake_servers import FakeBotApi, FakePracticumApi, ServerProcess
+
+
+def parse_args():
+    """Разбирает параметры командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--period', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--send-workers', type=int, default=8)
+    parser.add_argument('--api-latency', type=float, default=0.01)
+    parser.add_argument('--bot-latency', type=float, default=0.005)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--change-rate', type=float, default=0.05)
+    parser.add_argument('--payload-size', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help='вывести результат одной строкой JSON')
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль методом ближайшего ранга."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def current_rss():
+    """Возвращает текущий размер резидентной памяти в байтах."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cpu_seconds():
+    """Возвращает процессорное время процесса."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_engine(args, endpoint, bot_url):
+    """Гоняет движок заданное время и возвращает его замеры."""
+    os.environ['PRACTICUM_ENDPOINT'] = endpoint
+    import telegram
+    from telegram.utils.request import Request
+
+    import homework
+    from dispatcher import SendDispatcher
+    from engine import PollingEngine, Tenant
+    from polling_policy import FixedPollingPolicy
+    from scheduler import Scheduler
+    from state_store import MemoryStateStore
+
+    homework.ENDPOINT = endpoint
+    homework.HTTP_POOL_SIZE = args.workers
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    rss_before = current_rss()
+    bot = telegram.Bot(
+        '123:bench', base_url=bot_url,
+        request=Request(con_pool_size=args.send_workers)
+    )
+    dispatcher = SendDispatcher(
+        bot, workers=args.send_workers, global_rate=10_000,
+        chat_rate=10_000, chat_burst=10
+    ).start()
+    tenants = [Tenant(f'token{i}', str(i)) for i in range(args.tenants)]
+    engine = PollingEngine(
+        tenants, dispatcher, max_workers=args.workers,
+        scheduler=Scheduler(period=args.period),
+        policy=FixedPollingPolicy(args.period),
+        store=MemoryStateStore()
+    )
+    cpu_before = cpu_seconds()
+    started = time.monotonic()
+    deadline = started + args.duration
+    while time.monotonic() < deadline:
+        time.sleep(min(engine.scheduler.wait_time(), 0.05))
+        engine.run_pending()
+    engine.executor.shutdown(wait=True)
+    dispatcher.stop(timeout=30)
+    elapsed = time.monotonic() - started
+    return {
+        'elapsed': elapsed,
+        'cpu': cpu_seconds() - cpu_before,
+        'rss': current_rss() - rss_before,
+        'pool': homework.get_pool_stats(),
+    }
+
+
+def run(args):
+    """Запускает заглушки и движок, возвращает отчёт."""
+    with ServerProcess(
+        FakePracticumApi, latency=args.api_latency,
+        error_rate=args.error_rate, change_rate=args.change_rate,
+        payload_size=args.payload_size
+    ) as api, ServerProcess(FakeBotApi, latency=args.bot_latency) as bot:
+        measured = run_engine(
+            args, f'{api.url}/api/user_api/homework_statuses/',
+            f'{bot.url}/bot'
+        )
+        api_stats = api.stats()
+        bot_stats = bot.stats()
+    latencies = bot_stats['latencies']
+    elapsed = measured['elapsed']
+    return {
+        'tenants': args.tenants,
+        'seconds': round(elapsed, 2),
+        'polls': api_stats['requests'],
+        'polls_per_second': round(api_stats['requests'] / elapsed, 1),
+        'api_errors': api_stats['errors'],
+        'status_changes': api_stats['changes'],
+        'notifications': len(latencies),
+        'latency_p50_ms': _ms(percentile(latencies, 0.5)),
+        'latency_p99_ms': _ms(percentile(latencies, 0.99)),
+        'cpu_percent': round(100 * measured['cpu'] / elapsed, 1),
+        'cpu_ms_per_poll': _ms(
+            measured['cpu'] / max(1, api_stats['requests'])
+        ),
+        'rss_kb_per_tenant': round(measured['rss'] / args.tenants / 1024, 2),
+        'new_connections': measured['pool']['new_connections'],
+        'reused_connections': measured['pool']['reused_connections'],
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def main():
+    """Запускает бенчмарк и печатает отчёт."""
+    args = parse_args()
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    for name, value in report.items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Бенчмарк времени импорта модулей бота.
+
+Каждый замер - новый интерпретатор с python -X importtime, поэтому
+кеш уже загруженных модулей не влияет на результат. Импорт идёт
+из временного каталога, так что заодно видно, создаёт ли он файлы.
+Запуск: python -m benchmarks.bench_import --module homework --repeat 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('telegram', 'requests', 'aiohttp', 'sqlite3', 'orjson')
+
+
+def parse_args():
+    """Разбирает параметры командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='homework')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10)
+    return parser.parse_args()
+
+
+def import_once(module, workdir):
+    """Импортирует модуль в новом интерпретаторе.
+    Возвращает словарь {модуль: накопленное время импорта в мкс}
+    из самого модуля и его прямых зависимостей и список модулей
+    из HEAVY_MODULES, которые оказались загружены.
+    """
+    code = (
+        f'import sys; import {module}; '
+        f'print(",".join(name for name in {HEAVY_MODULES!r} '
+        f'if name in sys.modules))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=workdir, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': ROOT}
+    )
+    timings = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == module:
+                timings = {**children, module: int(cumulative)}
+            children = {}
+    heavy = [name for name in result.stdout.strip().split(',') if name]
+    return timings, heavy
+
+
+def run(args):
+    """Замеряет импорт и возвращает отчёт."""
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.repeat):
+            timings, heavy = import_once(args.module, workdir)
+            samples.append(timings)
+        created = sorted(os.listdir(workdir))
+    report = {
+        'import_ms': round(
+            statistics.median(s[args.module] for s in samples) / 1000, 1
+        ),
+        'heavy_modules': ','.join(heavy) or '-',
+        'created_files': ','.join(created) or '-',
+    }
+    slowest = sorted(
+        (name for name in samples[0] if name != args.module),
+        key=lambda name: statistics.median(s.get(name, 0) for s in samples),
+        reverse=True
+    )
+    for name in slowest[:args.top]:
+        report[f'{name}_ms'] = round(
+            statistics.median(s.get(name, 0) for s in samples) / 1000, 1
+        )
+    return report
+
+
+def main():
+    """Запускает бенчмарк и печатает результат."""
+    for name, value in run(parse_args()).items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
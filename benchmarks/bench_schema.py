@@ -0,0 +1,130 @@
+"""Микробенчмарк проверки ответов API по скомпилированной схеме.
+
+Сравнивает прежнюю цепочку проверок check_response и parse_status
+с проверкой всей пачки ответов функцией validate_responses.
+Запуск: python -m benchmarks.bench_schema --responses 1000 --homeworks 5
+"""
+import argparse
+import random
+import timeit
+
+from homework import HOMEWORK_VERDICTS, validate_responses
+
+
+def parse_args():
+    """Разбирает параметры командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--responses', type=int, default=1000)
+    parser.add_argument('--homeworks', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--number', type=int, default=20)
+    return parser.parse_args()
+
+
+def make_responses(count, homeworks, seed=0):
+    """Возвращает ответы API со случайными статусами работ."""
+    rand = random.Random(seed)
+    statuses = list(HOMEWORK_VERDICTS)
+    return [
+        {
+            'homeworks': [
+                {
+                    'id': index,
+                    'status': rand.choice(statuses),
+                    'homework_name': f'user__hw{index}.zip',
+                    'reviewer_comment': 'Всё хорошо',
+                    'date_updated': '2024-01-01T00:00:00Z',
+                    'lesson_name': f'Урок {index}',
+                }
+                for index in range(homeworks)
+            ],
+            'current_date': 1700000000,
+        }
+        for _ in range(count)
+    ]
+
+
+def legacy_check_response(response):
+    """Прежняя проверка ответа из check_response."""
+    if not isinstance(response, dict):
+        raise TypeError('Ответ не является словарём!')
+    homeworks = response.get('homeworks')
+    if not isinstance(homeworks, list):
+        raise TypeError('По ключу "homeworks" возвращается не список')
+
+
+def legacy_check_homework(homework):
+    """Прежняя проверка работы из parse_status."""
+    if 'status' not in homework:
+        raise ValueError('Отсутствует статус работы в ответе API')
+    status = homework['status']
+    if status not in HOMEWORK_VERDICTS:
+        raise ValueError(f'Неизвестный статус работы: {status}')
+    if 'homework_name' not in homework:
+        raise ValueError('Отсутствует ключ "homework_name"')
+
+
+def legacy_validate(responses):
+    """Проверяет ответы прежней цепочкой check_response и parse_status.
+    Метрики, логирование и сборка сообщений не выполняются,
+    чтобы сравнивать только сами проверки.
+    """
+    errors = []
+    for response in responses:
+        try:
+            legacy_check_response(response)
+        except TypeError as error:
+            errors.append(error)
+            continue
+        for homework in response['homeworks']:
+            try:
+                legacy_check_homework(homework)
+            except ValueError as error:
+                errors.append(error)
+    return errors
+
+
+def measure(functions, responses, repeat, number):
+    """Возвращает лучшее время одного прогона каждой функции в секундах.
+    Замеры функций чередуются, чтобы фоновая нагрузка на машину
+    одинаково влияла на все.
+    """
+    best = [float('inf')] * len(functions)
+    for _ in range(repeat):
+        for index, function in enumerate(functions):
+            elapsed = timeit.timeit(
+                lambda: function(responses), number=number
+            ) / number
+            best[index] = min(best[index], elapsed)
+    return best
+
+
+def run(args):
+    """Замеряет обе проверки и возвращает отчёт."""
+    responses = make_responses(args.responses, args.homeworks)
+    assert not legacy_validate(responses)
+    assert not validate_responses(responses)
+    legacy, compiled = measure(
+        (legacy_validate, validate_responses), responses,
+        args.repeat, args.number
+    )
+    homeworks = args.responses * args.homeworks
+    return {
+        'responses': args.responses,
+        'homeworks': homeworks,
+        'legacy_us_per_response': round(legacy / args.responses * 1e6, 3),
+        'compiled_us_per_response': round(
+            compiled / args.responses * 1e6, 3
+        ),
+        'speedup': round(legacy / compiled, 2),
+    }
+
+
+def main():
+    """Запускает бенчмарк и печатает результат."""
+    for name, value in run(parse_args()).items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
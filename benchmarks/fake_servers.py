@@ -0,0 +1,317 @@
+"""Локальные заглушки внешних API для бенчмарков."""
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+BENCH_NAME_PATTERN = re.compile(r'bench-(\d+\.\d+)')
+
+
+class FakeServer:
+    """Базовый HTTP-сервер заглушки, работающий в фоновом потоке."""
+
+    handler_class = None
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        handler = type(
+            'Handler', (self.handler_class,), {'fake_server': self}
+        )
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        """Возвращает базовый адрес сервера."""
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def count_request(self):
+        """Учитывает запрос и выдерживает заданную задержку."""
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def stats(self):
+        """Возвращает статистику заглушки."""
+        return {'requests': self.requests}
+
+    def __enter__(self):
+        """Запускает сервер."""
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    """Обработчик с ответами в JSON и keep-alive соединениями."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    fake_server = None
+
+    def send_json(self, data, status=200, headers=None):
+        """Отправляет JSON-ответ."""
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        """Читает JSON или form-data из тела запроса."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if not body:
+            return {}
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(body)
+        return dict(parse_qsl(body.decode()))
+
+    def do_GET(self):
+        """Отдаёт статистику заглушки по адресу /stats."""
+        if self.path == '/stats':
+            self.send_json(self.fake_server.stats())
+        else:
+            self.handle_get()
+
+    def handle_get(self):
+        """Обрабатывает остальные GET-запросы."""
+        self.send_json({'ok': False, 'description': 'Not Found'}, 404)
+
+    def log_message(self, format, *args):
+        """Не пишет журнал запросов в stderr."""
+
+
+class BotApiHandler(JsonHandler):
+    """Заглушка метода sendMessage Bot API."""
+
+    def do_POST(self):
+        """Принимает сообщение или отвечает 429 при превышении лимита."""
+        server = self.fake_server
+        server.count_request()
+        data = self.read_json()
+        if not self.path.endswith('/sendMessage'):
+            self.send_json({'ok': False, 'description': 'Not Found'}, 404)
+            return
+        retry_after = server.check_rate(data.get('chat_id'))
+        if retry_after:
+            self.send_json({
+                'ok': False,
+                'error_code': 429,
+                'description': f'Too Many Requests: retry after {retry_after}',
+                'parameters': {'retry_after': retry_after},
+            }, 429)
+            return
+        server.record(data)
+        self.send_json({'ok': True, 'result': {
+            'message_id': len(server.messages),
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text'),
+        }})
+
+
+class FakeBotApi(FakeServer):
+    """Заглушка Bot API Telegram.
+    chat_rate - допустимое число сообщений в секунду в один чат;
+    при превышении отвечает 429 с retry_after, как настоящий API.
+    """
+
+    handler_class = BotApiHandler
+
+    def __init__(self, latency=0.0, chat_rate=None):
+        super().__init__(latency)
+        self.chat_rate = chat_rate
+        self.messages = []
+        self.rejected = 0
+        self.latencies = []
+        self._last_sent = {}
+
+    @property
+    def bot_url(self):
+        """Возвращает base_url для telegram.Bot."""
+        return f'{self.url}/bot'
+
+    def check_rate(self, chat_id):
+        """Возвращает retry_after, если чат превысил лимит."""
+        if not self.chat_rate:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_sent.get(chat_id)
+            if last is not None and now - last < 1 / self.chat_rate:
+                self.rejected += 1
+                return 1
+            self._last_sent[chat_id] = now
+        return 0
+
+    def record(self, data):
+        """Запоминает принятое сообщение.
+        Для работ, созданных FakePracticumApi, считает задержку
+        от изменения статуса до получения уведомления.
+        """
+        now = time.time()
+        text = data.get('text') or ''
+        with self._lock:
+            self.messages.append((str(data.get('chat_id')), text))
+            self.latencies.extend(
+                now - float(changed_at)
+                for changed_at in BENCH_NAME_PATTERN.findall(text)
+            )
+
+    def stats(self):
+        """Возвращает статистику заглушки."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'messages': len(self.messages),
+                'rejected': self.rejected,
+                'latencies': list(self.latencies),
+            }
+
+
+class PracticumApiHandler(JsonHandler):
+    """Заглушка эндпоинта homework_statuses."""
+
+    def handle_get(self):
+        """Отвечает списком работ или ошибкой с заданной вероятностью."""
+        server = self.fake_server
+        server.count_request()
+        url = urlsplit(self.path)
+        if not url.path.endswith('/homework_statuses/'):
+            super().handle_get()
+            return
+        if server.rand() < server.error_rate:
+            server.count_error()
+            self.send_json({'code': 'server_error'}, 500)
+            return
+        token = self.headers.get('Authorization', '').split(' ')[-1]
+        from_date = int(dict(parse_qsl(url.query)).get('from_date', 0))
+        self.send_json({
+            'homeworks': server.homeworks(token, from_date),
+            'current_date': int(time.time()),
+        })
+
+
+class FakePracticumApi(FakeServer):
+    """Заглушка API Практикума.
+    error_rate - доля ответов 500; change_rate - вероятность того, что
+    в ответе появится работа с новым статусом; payload_size - сколько
+    уже известных работ добавлять в каждый ответ. Имя новой работы
+    содержит время изменения, по нему FakeBotApi считает задержку.
+    """
+
+    handler_class = PracticumApiHandler
+    STATUSES = ('reviewing', 'rejected', 'approved')
+
+    def __init__(self, latency=0.0, error_rate=0.0, change_rate=0.1,
+                 payload_size=0, seed=None):
+        super().__init__(latency)
+        self.error_rate = error_rate
+        self.change_rate = change_rate
+        self.payload_size = payload_size
+        self.errors = 0
+        self.changes = 0
+        self.rand = random.Random(seed).random
+
+    def count_error(self):
+        """Учитывает ответ с ошибкой."""
+        with self._lock:
+            self.errors += 1
+
+    def homeworks(self, token, from_date):
+        """Возвращает работы для ответа."""
+        homeworks = [
+            {
+                'id': index,
+                'homework_name': f'{token}-old-{index}',
+                'status': 'approved',
+                'reviewer_comment': 'x' * 100,
+                'date_updated': '2024-01-01T00:00:00Z',
+                'lesson_name': 'Бенчмарк',
+            }
+            for index in range(self.payload_size)
+        ]
+        if self.rand() < self.change_rate:
+            with self._lock:
+                self.changes += 1
+                change = self.changes
+            homeworks.append({
+                'id': -change,
+                'homework_name': f'bench-{time.time():.6f}',
+                'status': self.STATUSES[change % len(self.STATUSES)],
+            })
+        return homeworks
+
+    @property
+    def endpoint(self):
+        """Возвращает адрес эндпоинта для PRACTICUM_ENDPOINT."""
+        return f'{self.url}/api/user_api/homework_statuses/'
+
+    def stats(self):
+        """Возвращает статистику заглушки."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'changes': self.changes,
+            }
+
+
+def _serve(server_class, kwargs, connection):
+    with server_class(**kwargs) as server:
+        connection.send(server.url)
+        connection.recv()
+
+
+class ServerProcess:
+    """Запускает заглушку в отдельном процессе.
+    Так процессор и память заглушки не попадают в замеры бота.
+    """
+
+    def __init__(self, server_class, **kwargs):
+        self.server_class = server_class
+        self.kwargs = kwargs
+        self.url = None
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(server_class, kwargs, child_connection),
+            daemon=True
+        )
+
+    def stats(self):
+        """Запрашивает статистику заглушки."""
+        return requests.get(f'{self.url}/stats', timeout=10).json()
+
+    def __enter__(self):
+        """Запускает процесс и ждёт адрес сервера."""
+        self._process.start()
+        self.url = self._connection.recv()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Останавливает процесс."""
+        self._connection.send(None)
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
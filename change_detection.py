@@ -0,0 +1,85 @@
+from metrics import STATUS_CHANGES
+from records import ADDED, CHANGED, REMOVED, StatusEvent
+
+
+def get_homework_key(homework):
+    """Возвращает ключ домашней работы: id, а при его отсутствии имя."""
+    return homework.get('id', homework.get('homework_name'))
+
+
+def diff_homeworks(snapshot, homeworks, check=None):
+    """Сравнивает работы из ответа API со снимком подписчика.
+    snapshot - словарь {ключ работы: последний отправленный статус},
+    статус None означает, что работа удалена. Возвращает список
+    StatusEvent: ADDED для работы, которой нет в снимке, и CHANGED
+    со статусом до изменения в previous. Работа, которая в одном
+    ответе встречается несколько раз, даёт одно событие по последнему
+    статусу. Сравниваются только работы из ответа: API с from_date
+    возвращает лишь изменившиеся работы, поэтому время работы
+    пропорционально числу изменений, а не размеру снимка.
+    check вызывается для каждой изменившейся работы до создания
+    события и может бросить исключение.
+    """
+    events = {}
+    for homework in homeworks:
+        key = get_homework_key(homework)
+        status = homework.get('status')
+        if key is None:
+            if check is not None:
+                check(homework)
+            events[object()] = StatusEvent(
+                None, homework['homework_name'], status
+            )
+            continue
+        previous = snapshot.get(key)
+        if previous == status:
+            events.pop(key, None)
+            continue
+        if check is not None:
+            check(homework)
+        events[key] = StatusEvent(
+            key, homework['homework_name'], status,
+            ADDED if previous is None else CHANGED, previous
+        )
+    for event in events.values():
+        STATUS_CHANGES.inc(event.kind)
+    return list(events.values())
+
+
+def find_removed(snapshot, homeworks, names):
+    """Возвращает события REMOVED для работ снимка, которых нет в ответе.
+    homeworks - полный список работ (ответ API с from_date=0), names -
+    названия работ {ключ работы: название}; если названия там нет,
+    в событии будет ключ. Пустой список работ удалений не даёт:
+    пропажа сразу всех работ скорее сбой API, чем их удаление.
+    """
+    if not homeworks:
+        return []
+    seen = {get_homework_key(homework) for homework in homeworks}
+    events = [
+        StatusEvent(key, names.get(key, str(key)), None, REMOVED, previous)
+        for key, previous in snapshot.items()
+        if previous is not None and key not in seen
+    ]
+    STATUS_CHANGES.inc(REMOVED, amount=len(events))
+    return events
+
+
+def get_names(homeworks, keys):
+    """Возвращает названия работ из ответа API, ключи которых в keys."""
+    names = {}
+    for homework in homeworks:
+        key = get_homework_key(homework)
+        if key in keys and 'homework_name' in homework:
+            names[key] = homework['homework_name']
+    return names
+
+
+def get_changes(events):
+    """Возвращает изменения снимка по событиям: {ключ работы: статус}.
+    Удалённая работа получает статус None, чтобы хранилище состояния
+    записало удаление так же, как смену статуса.
+    """
+    return {
+        event.key: event.status for event in events if event.key is not None
+    }
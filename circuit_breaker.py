@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+import time
+
+from exceptions import CircuitOpenError
+from metrics import CIRCUIT_REJECTED, CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+CLOSED: str = 'closed'
+OPEN: str = 'open'
+HALF_OPEN: str = 'half_open'
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+FAILURE_THRESHOLD: int = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+RECOVERY_TIMEOUT: float = float(os.getenv('CIRCUIT_RECOVERY_TIMEOUT', 60))
+HALF_OPEN_CALLS: int = 1
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Предохранитель для запросов к внешнему API.
+    Закрыт - запросы идут как обычно. После failure_threshold
+    неудач подряд открывается: recovery_timeout секунд запросы
+    не отправляются, before_call бросает CircuitOpenError. Затем
+    становится полуоткрытым и пропускает half_open_calls пробных
+    запросов: успех закрывает его, неудача снова открывает.
+    Один предохранитель общий для всех подписчиков, его состояние
+    выгружается в метрики с меткой name.
+    """
+
+    def __init__(self, name='practicum', failure_threshold=FAILURE_THRESHOLD,
+                 recovery_timeout=RECOVERY_TIMEOUT,
+                 half_open_calls=HALF_OPEN_CALLS, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(STATE_VALUES[CLOSED], name)
+
+    def _set_state(self, state):
+        self.state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+        self._probes = 0
+        CIRCUIT_STATE.set(STATE_VALUES[state], self.name)
+        CIRCUIT_TRANSITIONS.inc(self.name, state)
+        logger.warning('Предохранитель %s: %s', self.name, state)
+
+    def before_call(self):
+        """Разрешает запрос или бросает CircuitOpenError.
+        retry_after в исключении - сколько секунд осталось
+        до пробного запроса.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = (
+                    self._opened_at + self.recovery_timeout - self.clock()
+                )
+                if remaining > 0:
+                    self._reject(remaining)
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self._reject(self.recovery_timeout)
+                self._probes += 1
+
+    def _reject(self, retry_after):
+        CIRCUIT_REJECTED.inc(self.name)
+        raise CircuitOpenError(
+            f'Предохранитель {self.name} открыт', retry_after
+        )
+
+    def record(self, success):
+        """Учитывает результат запроса."""
+        with self._lock:
+            if success:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._set_state(CLOSED)
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED
+                and self.failures >= self.failure_threshold
+            ):
+                self._set_state(OPEN)
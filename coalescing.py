@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+from metrics import COALESCED
+
+COALESCE_TTL: float = float(os.getenv('COALESCE_TTL', 5.0))
+
+
+class _Call:
+    """Запрос, который выполняется прямо сейчас."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Склеивает одинаковые запросы из разных потоков.
+    Пока запрос с ключом key выполняется, остальные вызовы do с тем же
+    ключом ждут его и получают тот же результат или то же исключение.
+    Успешный результат ещё ttl секунд отдаётся из кеша без запроса.
+    """
+
+    def __init__(self, ttl=COALESCE_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._calls = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """Возвращает результат function() для ключа key."""
+        with self._lock:
+            now = self.clock()
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > now:
+                COALESCED.inc('cached')
+                return cached[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            COALESCED.inc('shared')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        COALESCED.inc('leader')
+        try:
+            call.result = function()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl > 0:
+                    self._expire(now)
+                    self._results[key] = (self.clock() + self.ttl, call.result)
+            call.done.set()
+        return call.result
+
+    def _expire(self, now):
+        expired = [
+            key for key, (expires, _) in self._results.items()
+            if expires <= now
+        ]
+        for key in expired:
+            del self._results[key]
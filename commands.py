@@ -0,0 +1,294 @@
+import asyncio
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+
+import aiohttp
+from aiohttp import web
+
+from async_homework import (TELEGRAM_API_URL, async_send_message,
+                            close_client_session, get_client_session)
+from engine import COMMANDS_MODE
+from exceptions import TelegramApiError
+from homework import CONNECT_TIMEOUT, READ_TIMEOUT, TELEGRAM_TOKEN, renderer
+from metrics import COMMANDS
+
+LONG_POLL_TIMEOUT: int = int(os.getenv('LONG_POLL_TIMEOUT', 30))
+MAX_CONCURRENT_UPDATES: int = int(os.getenv('MAX_CONCURRENT_UPDATES', 100))
+WEBHOOK_URL: str = os.getenv('WEBHOOK_URL')
+WEBHOOK_SECRET: str = os.getenv('WEBHOOK_SECRET')
+WEBHOOK_HOST: str = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT: int = int(os.getenv('WEBHOOK_PORT', 8443))
+WEBHOOK_PATH: str = '/telegram'
+SECRET_HEADER: str = 'X-Telegram-Bot-Api-Secret-Token'
+HISTORY_LIMIT: int = 10
+ERROR_PAUSE: float = 5.0
+
+HELP_MESSAGE = (
+    'Команды:\n'
+    '/status - текущие статусы работ\n'
+    '/history - последние изменения статусов'
+)
+NOT_SUBSCRIBED_MESSAGE = 'Этот чат не подписан на уведомления.'
+NO_STATUSES_MESSAGE = 'Статусов работ пока нет.'
+NO_HISTORY_MESSAGE = 'Изменений статусов пока не было.'
+REMOVED_VERDICT = 'работа удалена'
+
+logger = logging.getLogger(__name__)
+
+
+def parse_update(update):
+    """Возвращает пару (chat_id, текст) из обновления Bot API.
+    Для обновлений без текстового сообщения возвращает None.
+    """
+    message = update.get('message')
+    if not isinstance(message, dict):
+        return None
+    text = message.get('text')
+    chat = message.get('chat')
+    if not isinstance(text, str) or not isinstance(chat, dict):
+        return None
+    return str(chat.get('id')), text
+
+
+class CommandHandler:
+    """Отвечает на команды бота из локального кеша статусов.
+    states - состояния подписчиков движка (engine.TenantState).
+    Ответы собираются из их homeworks, sent_statuses и history,
+    без запросов к API практикума. Состояния читаются из другого
+    потока, поэтому словари и очереди перед обходом копируются.
+    """
+
+    def __init__(self, states, verdicts=None):
+        self.verdicts = renderer.statuses if verdicts is None else verdicts
+        self.chats = defaultdict(list)
+        for state in states:
+            self.chats[str(state.tenant.chat_id)].append(state)
+        self.commands = {
+            '/start': self.help,
+            '/help': self.help,
+            '/status': self.status,
+            '/history': self.history,
+        }
+
+    def handle(self, chat_id, text):
+        """Возвращает ответ на сообщение или None, если это не команда."""
+        if not text.startswith('/'):
+            return None
+        command = text.split(maxsplit=1)[0].split('@', 1)[0].lower()
+        handler = self.commands.get(command)
+        COMMANDS.inc(command if handler is not None else 'unknown')
+        if handler is None:
+            return HELP_MESSAGE
+        states = self.chats.get(str(chat_id))
+        if not states and handler != self.help:
+            return NOT_SUBSCRIBED_MESSAGE
+        return handler(states)
+
+    def help(self, states):
+        """Возвращает список команд."""
+        return HELP_MESSAGE
+
+    def verdict(self, status):
+        """Возвращает вердикт для статуса или сам статус.
+        Статус None означает, что работа удалена.
+        """
+        if status is None:
+            return REMOVED_VERDICT
+        return self.verdicts.get(status, status)
+
+    def status(self, states):
+        """Возвращает последние известные статусы всех работ чата.
+        Название работы берётся из последнего события, а после
+        перезапуска - из названий, сохранённых в хранилище состояния.
+        """
+        lines = []
+        for state in states:
+            events = dict(state.homeworks)
+            names = dict(state.names)
+            for key, status in dict(state.sent_statuses).items():
+                if status is None:
+                    continue
+                event = events.get(key)
+                name = (
+                    names.get(key, key) if event is None
+                    else event.homework_name
+                )
+                lines.append(f'{name}: {self.verdict(status)}')
+        return '\n'.join(lines) or NO_STATUSES_MESSAGE
+
+    def history(self, states):
+        """Возвращает последние HISTORY_LIMIT изменений статусов чата."""
+        changes = sorted(
+            (change for state in states for change in list(state.history)),
+            key=lambda change: change[0]
+        )[-HISTORY_LIMIT:]
+        return '\n'.join(
+            f'{time.strftime("%d.%m %H:%M", time.localtime(sent_at))} '
+            f'{event.homework_name}: {self.verdict(event.status)}'
+            for sent_at, event in changes
+        ) or NO_HISTORY_MESSAGE
+
+
+class UpdateWorker:
+    """Принимает обновления Bot API и отвечает на команды.
+    Обновления приходят долгим опросом getUpdates или через вебхук.
+    Каждое обрабатывается отдельной задачей asyncio, одновременно
+    не больше max_concurrent. Ответ уходит через send(chat_id, text),
+    например SendDispatcher.send_message с его ограничениями частоты,
+    а без send - напрямую через async_send_message.
+    """
+
+    def __init__(self, handler, token=TELEGRAM_TOKEN, send=None,
+                 api_url=None, timeout=LONG_POLL_TIMEOUT,
+                 max_concurrent=MAX_CONCURRENT_UPDATES):
+        self.handler = handler
+        self.token = token
+        self.send = send
+        self.api_url = api_url or TELEGRAM_API_URL
+        self.timeout = timeout
+        self.offset = None
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks = set()
+
+    def method_url(self, method):
+        """Возвращает адрес метода Bot API."""
+        return f'{self.api_url}/bot{self.token}/{method}'
+
+    async def call(self, method, params, timeout=None):
+        """Вызывает метод Bot API и возвращает поле result ответа.
+        timeout - таймаут aiohttp вместо таймаута общей сессии.
+        """
+        options = {'json': params}
+        if timeout is not None:
+            options['timeout'] = timeout
+        async with get_client_session().post(
+            self.method_url(method), **options
+        ) as response:
+            payload = await response.json(content_type=None)
+        if not payload.get('ok'):
+            raise TelegramApiError(payload.get('description'))
+        return payload.get('result')
+
+    async def reply(self, chat_id, text):
+        """Отправляет ответ в чат."""
+        if self.send is not None:
+            self.send(chat_id, text)
+        else:
+            await async_send_message(text, chat_id, self.token, self.api_url)
+
+    async def process(self, update):
+        """Отвечает на одно обновление, не пропуская исключения наружу."""
+        async with self._semaphore:
+            try:
+                message = parse_update(update)
+                if message is None:
+                    return
+                answer = self.handler.handle(*message)
+                if answer is not None:
+                    await self.reply(message[0], answer)
+            except Exception as error:
+                logger.error('Ошибка обработки команды: %s', error)
+
+    def submit(self, update):
+        """Запускает обработку обновления, не дожидаясь её."""
+        task = asyncio.create_task(self.process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def get_updates(self):
+        """Ждёт новые обновления долгим опросом getUpdates."""
+        params = {'timeout': self.timeout, 'allowed_updates': ['message']}
+        if self.offset is not None:
+            params['offset'] = self.offset
+        updates = await self.call('getUpdates', params, aiohttp.ClientTimeout(
+            sock_connect=CONNECT_TIMEOUT,
+            sock_read=self.timeout + READ_TIMEOUT
+        ))
+        for update in updates:
+            self.offset = update['update_id'] + 1
+        return updates
+
+    async def run_polling(self, iterations=None):
+        """Получает обновления долгим опросом.
+        Следующий getUpdates уходит сразу, не дожидаясь ответов
+        на полученные команды.
+        """
+        while iterations is None or iterations > 0:
+            try:
+                for update in await self.get_updates():
+                    self.submit(update)
+            except Exception as error:
+                logger.error('Сбой получения обновлений: %s', error)
+                await asyncio.sleep(ERROR_PAUSE)
+            if iterations is not None:
+                iterations -= 1
+        await self.drain()
+
+    async def drain(self):
+        """Дожидается обработки уже полученных обновлений."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def handle_webhook(self, request):
+        """Принимает обновление от Telegram через вебхук.
+        Telegram получает ответ сразу, команда обрабатывается
+        в отдельной задаче.
+        """
+        if WEBHOOK_SECRET and (
+            request.headers.get(SECRET_HEADER) != WEBHOOK_SECRET
+        ):
+            raise web.HTTPForbidden()
+        try:
+            update = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest()
+        if isinstance(update, dict):
+            self.submit(update)
+        return web.Response()
+
+    def webhook_app(self):
+        """Возвращает приложение aiohttp с обработчиком вебхука."""
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, self.handle_webhook)
+        return app
+
+    async def run_webhook(self, host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+        """Регистрирует вебхук WEBHOOK_URL и принимает обновления."""
+        params = {'url': WEBHOOK_URL, 'allowed_updates': ['message']}
+        if WEBHOOK_SECRET:
+            params['secret_token'] = WEBHOOK_SECRET
+        await self.call('setWebhook', params)
+        runner = web.AppRunner(self.webhook_app())
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info('Вебхук принимает обновления на порту %s', port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    async def run(self, mode=COMMANDS_MODE):
+        """Принимает обновления в режиме polling или webhook."""
+        try:
+            if mode == 'webhook':
+                await self.run_webhook()
+            else:
+                await self.run_polling()
+        finally:
+            await close_client_session()
+
+
+def start_update_worker(worker, mode=COMMANDS_MODE):
+    """Запускает приём команд в отдельном потоке со своим циклом событий.
+    Так ответы на команды не занимают потоки опроса движка.
+    """
+    thread = threading.Thread(
+        target=asyncio.run, args=(worker.run(mode),),
+        name='update-worker', daemon=True
+    )
+    thread.start()
+    return thread
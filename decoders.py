@@ -0,0 +1,114 @@
+import json
+import os
+from typing import Union
+
+from records import MISSING, Homework, as_homework
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSON_DECODER: str = os.getenv('JSON_DECODER', 'auto')
+
+
+def to_records(payload):
+    """Переводит разобранный ответ API в компактный вид.
+    Описания работ заменяются записями Homework, из ответа остаются
+    только homeworks и current_date. Ответ неожиданной формы
+    возвращается как есть: его отклонит check_response.
+    """
+    if not isinstance(payload, dict):
+        return payload
+    homeworks = payload.get('homeworks')
+    if not isinstance(homeworks, list):
+        return payload
+    response = {'homeworks': [as_homework(homework) for homework in homeworks]}
+    if 'current_date' in payload:
+        response['current_date'] = payload['current_date']
+    return response
+
+
+def decode_stdlib(data):
+    """Разбирает ответ стандартным модулем json.
+    Запасной вариант без orjson и msgspec: результат занимает столько же
+    памяти, сколько у них, но разбор медленнее простого json.loads
+    из-за перевода работ в записи Homework.
+    """
+    return to_records(json.loads(data))
+
+
+def decode_orjson(data):
+    """Разбирает ответ библиотекой orjson."""
+    return to_records(orjson.loads(data))
+
+
+if msgspec is not None:
+    class _HomeworkStruct(msgspec.Struct):
+        id: Union[int, str, msgspec.UnsetType] = msgspec.UNSET
+        status: Union[str, msgspec.UnsetType] = msgspec.UNSET
+        homework_name: Union[str, msgspec.UnsetType] = msgspec.UNSET
+
+    class _ResponseStruct(msgspec.Struct):
+        homeworks: list[_HomeworkStruct]
+        current_date: Union[int, msgspec.UnsetType] = msgspec.UNSET
+
+    _msgspec_decoder = msgspec.json.Decoder(_ResponseStruct)
+
+
+def _field(value):
+    return MISSING if value is msgspec.UNSET else value
+
+
+def decode_msgspec(data):
+    """Разбирает ответ библиотекой msgspec сразу в структуры.
+    Поля, которых нет в _HomeworkStruct, пропускаются без создания
+    объектов Python. Ответ другой формы разбирается как обычный JSON.
+    """
+    try:
+        payload = _msgspec_decoder.decode(data)
+    except msgspec.ValidationError:
+        return to_records(msgspec.json.decode(data))
+    response = {
+        'homeworks': [
+            Homework(
+                _field(homework.id), _field(homework.status),
+                _field(homework.homework_name)
+            )
+            for homework in payload.homeworks
+        ]
+    }
+    if payload.current_date is not msgspec.UNSET:
+        response['current_date'] = payload.current_date
+    return response
+
+
+DECODERS = {
+    'msgspec': (msgspec, decode_msgspec),
+    'orjson': (orjson, decode_orjson),
+    'json': (json, decode_stdlib),
+}
+
+
+def get_decoder(name=None):
+    """Возвращает функцию разбора тела ответа API.
+    name - msgspec, orjson, json или auto; auto выбирает самую
+    быструю из установленных библиотек. По умолчанию берётся
+    JSON_DECODER.
+    """
+    name = name or JSON_DECODER
+    if name == 'auto':
+        for library, decoder in DECODERS.values():
+            if library is not None:
+                return decoder
+    if name not in DECODERS:
+        raise ValueError(f'Неизвестный декодер JSON: {name}')
+    library, decoder = DECODERS[name]
+    if library is None:
+        raise ValueError(f'Библиотека {name} не установлена')
+    return decoder
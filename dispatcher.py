@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import telegram
+
+from metrics import SEND_SECONDS, SENDS
+
+PRIORITY_STATUS: int = 0
+PRIORITY_ALERT: int = 1
+
+GLOBAL_RATE: float = 30.0
+CHAT_RATE: float = 1.0
+CHAT_BURST: int = 3
+SEND_WORKERS: int = 4
+MAX_RETRIES: int = 3
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def delay(self, now):
+        """Возвращает, сколько секунд ждать до появления токена."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Забирает токен; перед этим delay должен вернуть 0."""
+        self.tokens -= 1
+
+
+class OutboundMessage:
+    """Сообщение в очереди на отправку."""
+
+    __slots__ = ('chat_id', 'text', 'priority', 'attempts')
+
+    def __init__(self, chat_id, text, priority):
+        self.chat_id = chat_id
+        self.text = text
+        self.priority = priority
+        self.attempts = 0
+
+
+class PriorityLane:
+    """Обёртка с интерфейсом бота для отправки с заданным приоритетом."""
+
+    measures_sends = True
+
+    def __init__(self, dispatcher, priority):
+        self.dispatcher = dispatcher
+        self.priority = priority
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Ставит сообщение в очередь диспетчера."""
+        self.dispatcher.send_message(chat_id, text, self.priority)
+
+
+class SendDispatcher:
+    """Диспетчер исходящих сообщений Telegram.
+    Сообщения отправляются пулом потоков с учётом общего ограничения
+    частоты бота и ограничения на каждый чат. Изменения статусов
+    уходят раньше оповещений об ошибках. Ответ RetryAfter от Telegram
+    приостанавливает все отправки на указанное время, сетевые ошибки
+    повторяются до max_retries раз.
+    У диспетчера интерфейс бота, поэтому его можно передавать
+    в send_message_to_chat вместо telegram.Bot. Метрики отправки
+    (время вызова Bot API и исход) пишет сам диспетчер, а не
+    send_message_to_chat, который лишь ставит сообщение в очередь.
+    """
+
+    measures_sends = True
+
+    def __init__(self, bot, workers=SEND_WORKERS, global_rate=GLOBAL_RATE,
+                 chat_rate=CHAT_RATE, chat_burst=CHAT_BURST,
+                 max_retries=MAX_RETRIES, clock=time.monotonic):
+        self.bot = bot
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock())
+        self.chat_buckets = {}
+        self.sent = 0
+        self.failed = 0
+        self._ready = []
+        self._delayed = []
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        """Запускает потоки отправки."""
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f'send-dispatcher-{index}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def send_message(self, chat_id, text, priority=PRIORITY_STATUS):
+        """Ставит сообщение в очередь на отправку."""
+        self._push(OutboundMessage(chat_id, text, priority))
+
+    def lane(self, priority):
+        """Возвращает объект с интерфейсом бота для приоритета."""
+        return PriorityLane(self, priority)
+
+    def pending(self):
+        """Возвращает число неотправленных сообщений."""
+        with self._condition:
+            return self.pending_locked()
+
+    def pending_locked(self):
+        """То же, что pending, для вызова под блокировкой."""
+        return len(self._ready) + len(self._delayed) + self._in_flight
+
+    def _push(self, message, not_before=None):
+        with self._condition:
+            if not_before is None:
+                heapq.heappush(self._ready, (
+                    message.priority, next(self._counter), message
+                ))
+            else:
+                heapq.heappush(self._delayed, (
+                    not_before, message.priority, next(self._counter), message
+                ))
+            self._condition.notify()
+
+    def _chat_bucket(self, chat_id, now):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst, now)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _next_message(self):
+        """Ждёт сообщение, которое можно отправить прямо сейчас.
+        Возвращает None, когда диспетчер остановлен и очередь пуста.
+        """
+        with self._condition:
+            while True:
+                now = self.clock()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, priority, order, message = heapq.heappop(self._delayed)
+                    heapq.heappush(self._ready, (priority, order, message))
+                pause = self._paused_until - now
+                if self._ready and pause <= 0:
+                    pause = self.global_bucket.delay(now)
+                if self._ready and pause <= 0:
+                    message = self._take_ready(now)
+                    if message is not None:
+                        return message
+                    continue
+                if self._stopping and not self.pending_locked():
+                    return None
+                timeout = pause if self._ready else None
+                if self._delayed:
+                    delayed_wait = self._delayed[0][0] - now
+                    if timeout is None or delayed_wait < timeout:
+                        timeout = delayed_wait
+                self._condition.wait(timeout)
+
+    def _take_ready(self, now):
+        """Берёт первое по приоритету сообщение из готовых.
+        Общий токен бота к этому моменту уже есть: без него
+        _next_message ждёт, не трогая очередь. Если не хватает
+        токена чата, сообщение откладывается и возвращается None.
+        """
+        _, _, message = heapq.heappop(self._ready)
+        bucket = self._chat_bucket(message.chat_id, now)
+        wait = bucket.delay(now)
+        if wait > 0:
+            heapq.heappush(self._delayed, (
+                now + wait, message.priority, next(self._counter), message
+            ))
+            return None
+        bucket.consume()
+        self.global_bucket.consume()
+        self._in_flight += 1
+        return message
+
+    def _run(self):
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+            try:
+                self._deliver(message)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def _count(self, sent):
+        with self._condition:
+            if sent:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def _deliver(self, message):
+        started = time.perf_counter()
+        try:
+            self.bot.send_message(message.chat_id, message.text)
+            SEND_SECONDS.observe(time.perf_counter() - started)
+            SENDS.inc('ok')
+            self._count(sent=True)
+        except telegram.error.RetryAfter as error:
+            SEND_SECONDS.observe(time.perf_counter() - started)
+            SENDS.inc('rate_limited')
+            with self._condition:
+                self._paused_until = max(
+                    self._paused_until, self.clock() + error.retry_after
+                )
+            self._push(message, self.clock() + error.retry_after)
+        except telegram.error.NetworkError as error:
+            SEND_SECONDS.observe(time.perf_counter() - started)
+            message.attempts += 1
+            if message.attempts > self.max_retries:
+                SENDS.inc('error')
+                self._count(sent=False)
+                logger.warning(
+                    'Сообщение в чат %s не отправлено: %s',
+                    message.chat_id, error
+                )
+                return
+            SENDS.inc('retry')
+            self._push(message, self.clock() + 2 ** message.attempts)
+        except Exception as error:
+            SEND_SECONDS.observe(time.perf_counter() - started)
+            SENDS.inc('error')
+            self._count(sent=False)
+            logger.warning(
+                'Сообщение в чат %s не отправлено: %s', message.chat_id, error
+            )
+
+    def stop(self, timeout=None):
+        """Отправляет оставшиеся сообщения и останавливает потоки.
+        Возвращает True, если очередь успела опустеть за timeout.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        deadline = None if timeout is None else self.clock() + timeout
+        for thread in self._threads:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - self.clock())
+            thread.join(remaining)
+        self._threads = [
+            thread for thread in self._threads if thread.is_alive()
+        ]
+        return not self._threads
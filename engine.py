@@ -0,0 +1,424 @@
+import json
+import os
+import random
+import sys
+import time
+import logging
+import threading
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import telegram
+from dotenv import load_dotenv
+from telegram.utils.request import Request
+
+from change_detection import find_removed, get_changes, get_names
+from circuit_breaker import CircuitBreaker
+from coalescing import SingleFlight
+from decoders import get_decoder
+from dispatcher import PRIORITY_ALERT, SendDispatcher
+from exceptions import CircuitOpenError, RateLimitError
+from homework import (check_response, collect_events, format_event,
+                      get_auth_headers, get_session,
+                      init, request_homework_statuses, save_state,
+                      send_batches, telegram_handler)
+from metrics import start_metrics_server
+from polling_policy import AdaptivePollingPolicy
+from records import REMOVED
+from response_cache import ResponseCache
+from scheduler import Scheduler
+from shutdown import SHUTDOWN_TIMEOUT, GracefulShutdown
+from state_store import open_state_store, tenant_key
+
+load_dotenv()
+
+TELEGRAM_TOKEN: str = os.getenv('TELEGRAM_TOKEN')
+TENANTS_FILE: str = os.getenv('TENANTS_FILE')
+MAX_WORKERS: int = int(os.getenv('MAX_WORKERS', 64))
+TICK: float = 1.0
+SEND_WORKERS: int = int(os.getenv('SEND_WORKERS', 8))
+METRICS_PORT: str = os.getenv('METRICS_PORT')
+STATE_STORE_URL: str = os.getenv('STATE_STORE_URL')
+HISTORY_SIZE: int = int(os.getenv('HISTORY_SIZE', 50))
+COMMANDS_MODE: str = os.getenv('COMMANDS_MODE', 'polling')
+FULL_POLL_INTERVAL: int = int(os.getenv('FULL_POLL_INTERVAL', 24 * 60 * 60))
+
+logger = logging.getLogger(__name__)
+
+Tenant = namedtuple('Tenant', ('token', 'chat_id'))
+
+
+class TenantState:
+    """Состояние опроса одного подписчика.
+    sent_statuses и names - снимок работ подписчика: отправленные
+    статусы и названия работ. full_poll_at - время следующего полного
+    опроса; первый назначается в случайный момент FULL_POLL_INTERVAL,
+    чтобы полные опросы подписчиков не совпадали.
+    """
+
+    __slots__ = ('tenant', 'key', 'headers', 'timestamp', 'error_sent',
+                 'statuses', 'quiet_polls', 'retry_after',
+                 'sent_statuses', 'failures', 'homeworks', 'history',
+                 'names', 'full_poll_at')
+
+    def __init__(self, tenant, timestamp=None, store=None):
+        self.tenant = tenant
+        self.key = tenant_key(tenant.token, tenant.chat_id)
+        self.headers = get_auth_headers(tenant.token)
+        if timestamp is None and store is not None:
+            timestamp = store.get_cursor(self.key)
+        self.timestamp = (
+            int(time.time()) if timestamp is None else timestamp
+        )
+        self.error_sent = False
+        self.statuses = {}
+        self.quiet_polls = 0
+        self.retry_after = None
+        self.failures = 0
+        self.sent_statuses = (
+            {} if store is None else store.get_statuses(self.key)
+        )
+        self.names = {} if store is None else store.get_names(self.key)
+        self.full_poll_at = (
+            time.time() + random.uniform(0, FULL_POLL_INTERVAL)
+            if FULL_POLL_INTERVAL > 0 else float('inf')
+        )
+        self.homeworks = {}
+        self.history = deque(maxlen=HISTORY_SIZE)
+
+
+def remember_events(state, events, now=None):
+    """Запоминает отправленные изменения статусов подписчика.
+    В homeworks хранится последнее изменение по каждой работе,
+    в history - последние HISTORY_SIZE изменений с временем отправки.
+    Из них отвечают команды бота, не обращаясь к API.
+    Удалённая работа пропадает из homeworks, но остаётся в history.
+    """
+    now = time.time() if now is None else now
+    for event in events:
+        if event.kind == REMOVED:
+            state.homeworks.pop(event.key, None)
+        else:
+            state.homeworks[event.key] = event
+        state.history.append((now, event))
+
+
+def load_tenants(path=None):
+    """Загружает список подписчиков.
+    Файл TENANTS_FILE содержит JSON-список объектов с ключами
+    token и chat_id. Если файл не задан, используется пара
+    PRACTICUM_TOKEN/TELEGRAM_CHAT_ID из окружения.
+    """
+    path = path or TENANTS_FILE
+    if path is None:
+        token = os.getenv('PRACTICUM_TOKEN')
+        chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        if token is None or chat_id is None:
+            return []
+        return [Tenant(token, chat_id)]
+    with open(path, encoding='utf-8') as tenants_file:
+        data = json.load(tenants_file)
+    return [Tenant(item['token'], str(item['chat_id'])) for item in data]
+
+
+def request_statuses(state, from_date, session=None, cache=None,
+                     decoder=None, breaker=None, coalescer=None):
+    """Запрашивает статусы работ подписчика, изменившиеся с from_date.
+    Если передан coalescer (coalescing.SingleFlight), запрос склеивается
+    с запросами других подписчиков с тем же токеном и from_date.
+    Такой запрос идёт без условных заголовков: ответ 304 относился бы
+    только к тому, кто его получил.
+    """
+    if coalescer is None:
+        return request_homework_statuses(
+            from_date, state.headers, session, cache, decoder, breaker
+        )
+    return coalescer.do(
+        (state.tenant.token, from_date),
+        lambda: request_homework_statuses(
+            from_date, state.headers, session, None, decoder, breaker
+        )
+    )
+
+
+def send_events(bot, state, events, store=None, names=None):
+    """Отправляет изменения работ подписчика и обновляет его снимок.
+    names - названия работ, которые нужно запомнить помимо
+    названий из событий. Отправленные изменения запоминаются
+    в remember_events: из них отвечают команды бота.
+    """
+    changes = get_changes(events)
+    names = dict(names or {})
+    for event in events:
+        if event.key is not None and event.kind != REMOVED:
+            names[event.key] = event.homework_name
+    send_batches(
+        bot, state.tenant.chat_id, [format_event(event) for event in events]
+    )
+    state.sent_statuses.update(changes)
+    state.names.update(names)
+    remember_events(state, events)
+    if store is not None:
+        save_state(store, state.key, state.timestamp, changes, names)
+
+
+def poll_tenant(bot, state, session=None, cache=None, store=None,
+                decoder=None, breaker=None, coalescer=None):
+    """Выполняет один цикл опроса для подписчика.
+    Тот же конвейер, что и в homework.main:
+    запрос, проверка ответа, разбор статусов всех работ и отправка
+    изменений одной пачкой. Возвращает список работ из ответа API.
+    Метка времени сдвигается только при появлении работ, чтобы
+    повторные запросы без изменений попадали в кеш ответов.
+    Если передано хранилище store, новое состояние сохраняется в нём.
+    decoder, breaker и coalescer передаются в request_statuses.
+    Повторно пришедшие статусы отсеиваются по sent_statuses.
+    Раз в FULL_POLL_INTERVAL вместо обычного запроса идёт полный
+    (from_date=0): только по списку всех работ видно, что работа
+    удалена. Такой опрос сообщает лишь об удалениях и не сдвигает
+    метку времени, остальные изменения подхватит следующий опрос.
+    """
+    now = time.time()
+    full = state.full_poll_at <= now
+    response = request_statuses(
+        state, 0 if full else state.timestamp, session, cache, decoder,
+        breaker, coalescer
+    )
+    if response is None:
+        return []
+    check_response(response)
+    homeworks = response['homeworks']
+    if full:
+        state.full_poll_at = now + FULL_POLL_INTERVAL
+        send_events(
+            bot, state,
+            find_removed(state.sent_statuses, homeworks, state.names),
+            store, get_names(homeworks, state.sent_statuses)
+        )
+        return homeworks
+    if not homeworks:
+        return homeworks
+    state.timestamp = response.get('current_date', state.timestamp)
+    send_events(
+        bot, state, collect_events(homeworks, state.sent_statuses), store
+    )
+    return homeworks
+
+
+class PollingEngine:
+    """Опрашивает API для множества подписчиков из одного процесса.
+    Запросы подписчиков с общим токеном Практикума склеиваются
+    через coalescer, а в расписании такие подписчики стоят рядом,
+    чтобы их опросы попадали в окно кеша склеенных запросов.
+    """
+
+    def __init__(self, tenants, bot, max_workers=MAX_WORKERS,
+                 session=None, scheduler=None, policy=None, store=None,
+                 decoder=None, breaker=None, coalescer=None):
+        self.bot = bot
+        self.store = (
+            open_state_store(STATE_STORE_URL) if store is None else store
+        )
+        self.policy = AdaptivePollingPolicy() if policy is None else policy
+        self.session = get_session() if session is None else session
+        self.cache = ResponseCache()
+        self.decoder = get_decoder() if decoder is None else decoder
+        self.breaker = CircuitBreaker() if breaker is None else breaker
+        self.coalescer = SingleFlight() if coalescer is None else coalescer
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.scheduler = Scheduler() if scheduler is None else scheduler
+        self.states = []
+        self.shared_tokens = set()
+        self._active = set()
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.assign(tenants)
+
+    def assign(self, tenants):
+        """Заменяет список опрашиваемых подписчиков.
+        Ушедшие подписчики снимаются с расписания, новые получают
+        состояние из хранилища и распределяются по периоду опроса.
+        Уже идущий опрос ушедшего подписчика доработает, но больше
+        не будет запланирован.
+        """
+        tenants = list(dict.fromkeys(tenants))
+        with self._lock:
+            current = {state.tenant: state for state in self.states}
+            wanted = set(tenants)
+            self.scheduler.remove([
+                state for tenant, state in current.items()
+                if tenant not in wanted
+            ])
+            added = []
+            for tenant in tenants:
+                if tenant not in current:
+                    self.store.reload(tenant_key(tenant.token, tenant.chat_id))
+                    added.append(TenantState(tenant, store=self.store))
+            self.states = [
+                state for state in self.states if state.tenant in wanted
+            ] + added
+            self._active = set(self.states)
+            tokens = Counter(tenant.token for tenant in tenants)
+            self.shared_tokens = {
+                token for token, count in tokens.items() if count > 1
+            }
+            self.scheduler.spread(
+                sorted(added, key=lambda state: state.tenant.token)
+            )
+        self.store.flush()
+
+    def poll(self, state):
+        """Опрашивает подписчика, не пропуская исключения наружу."""
+        try:
+            homeworks = poll_tenant(
+                self.bot, state, self.session, self.cache, self.store,
+                self.decoder, self.breaker,
+                self.coalescer
+                if state.tenant.token in self.shared_tokens else None
+            )
+            self.policy.observe(state, homeworks)
+            state.error_sent = False
+        except RateLimitError as error:
+            self.policy.on_rate_limit(state, error.retry_after)
+        except CircuitOpenError as error:
+            self.policy.on_circuit_open(state, error.retry_after)
+        except telegram.error.TelegramError as error:
+            logger.error(
+                'Сбой отправки в чат %s: %s', state.tenant.chat_id, error
+            )
+        except Exception as error:
+            self.policy.on_error(state)
+            if not state.error_sent:
+                logger.error(
+                    'Ошибка опроса для чата %s: %s',
+                    state.tenant.chat_id, error
+                )
+                state.error_sent = True
+
+    def run_once(self):
+        """Опрашивает всех подписчиков параллельно."""
+        list(self.executor.map(self.poll, self.states))
+
+    def poll_and_reschedule(self, state, due):
+        """Опрашивает подписчика и планирует следующий опрос.
+        Интервал выбирает политика опроса, отсчёт идёт от
+        запланированного времени, поэтому период не дрейфует.
+        """
+        self.poll(state)
+        interval = self.policy.next_interval(state)
+        with self._lock:
+            if state in self._active:
+                self.scheduler.reschedule(state, due, interval)
+
+    def run_pending(self, now=None):
+        """Запускает опросы, время которых наступило.
+        Возвращает число запущенных опросов.
+        """
+        with self._lock:
+            due_jobs = self.scheduler.pop_due(now)
+        for due, state in due_jobs:
+            future = self.executor.submit(
+                self.poll_and_reschedule, state, due
+            )
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+        return len(due_jobs)
+
+    def run_forever(self, shutdown=None):
+        """Опрашивает подписчиков по расписанию.
+        Опросы разнесены по периоду планировщиком, а интервал
+        для каждого подписчика выбирает политика опроса.
+        Если передан shutdown (shutdown.GracefulShutdown), пауза
+        между тиками прерывается его сигналом, и после сигнала
+        новые опросы не запускаются. Каждый тик хранилище сбрасывает
+        накопленные изменения, чтобы последние записи опроса не ждали
+        следующей записи до следующего опроса.
+        """
+        shutdown = GracefulShutdown() if shutdown is None else shutdown
+        while not shutdown.requested:
+            with self._lock:
+                delay = self.scheduler.wait_time()
+            if shutdown.wait(min(delay, TICK)):
+                break
+            self.run_pending()
+            self.store.flush()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Останавливает движок, не теряя уже полученных изменений.
+        Не начатые опросы отменяются, идущие дорабатываются, затем
+        очередь отправки (если bot - SendDispatcher) дописывается
+        и состояние сбрасывается в хранилище. На всё отводится
+        timeout секунд. Возвращает True, если всё успело завершиться.
+        Перед остановкой очереди оповещения об ошибках переключаются
+        на бота, который отправляет напрямую: у остановленной очереди
+        нет потоков, и записи в ней терялись бы.
+        """
+        deadline = time.monotonic() + timeout
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        _, pending = wait(list(self._futures), timeout=timeout)
+        drained = not pending
+        stop = getattr(self.bot, 'stop', None)
+        if stop is not None:
+            telegram_handler.set_bot(getattr(self.bot, 'bot', None))
+            drained = stop(max(0.0, deadline - time.monotonic())) and drained
+        self.store.close()
+        if not drained:
+            logger.warning('Движок остановлен, не дождавшись всех отправок')
+        return drained
+
+
+def start_engine(tenants, metrics_port=METRICS_PORT,
+                 commands_mode=COMMANDS_MODE):
+    """Создаёт бота, очередь отправки и движок для подписчиков.
+    Если задан metrics_port, поднимает эндпоинт /metrics, а если
+    commands_mode не off - приём команд бота.
+    """
+    init()
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    bot = telegram.Bot(
+        token=TELEGRAM_TOKEN, request=Request(con_pool_size=SEND_WORKERS)
+    )
+    dispatcher = SendDispatcher(bot, workers=SEND_WORKERS).start()
+    telegram_handler.set_bot(dispatcher.lane(PRIORITY_ALERT))
+    engine = PollingEngine(tenants, dispatcher)
+    if commands_mode != 'off':
+        # commands импортирует async_homework, а тот - engine.
+        from commands import CommandHandler, UpdateWorker, start_update_worker
+        start_update_worker(UpdateWorker(
+            CommandHandler(engine.states), send=dispatcher.send_message
+        ), commands_mode)
+    return engine
+
+
+def run_until_signal(engine, timeout=SHUTDOWN_TIMEOUT):
+    """Опрашивает подписчиков до SIGTERM или SIGINT.
+    После сигнала движок останавливается за timeout секунд.
+    """
+    with GracefulShutdown() as shutdown:
+        engine.run_forever(shutdown)
+        engine.shutdown(timeout)
+    logger.info('Движок остановлен')
+
+
+def check_engine_config(tenants):
+    """Завершает программу, если движку нечего или нечем опрашивать."""
+    if TELEGRAM_TOKEN is None:
+        logger.critical('Отсутствует переменная окружения: TELEGRAM_TOKEN')
+        sys.exit(1)
+    if not tenants:
+        logger.critical('Не найдено ни одного подписчика')
+        sys.exit(1)
+
+
+def main() -> None:
+    """Запускает многопользовательский движок."""
+    init()
+    tenants = load_tenants()
+    check_engine_config(tenants)
+    logger.info('Запущен опрос для %s подписчиков', len(tenants))
+    run_until_signal(start_engine(tenants))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,22 @@
 class RequestApiError(Exception):
     pass
+
+
+class TelegramApiError(Exception):
+    pass
+
+
+class RateLimitError(RequestApiError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RequestApiError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ShutdownRequested(Exception):
+    pass
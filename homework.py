@@ -1,15 +1,24 @@
 import os
 import sys
 import time
-import requests
+import queue
 import logging
+import threading
 from http import HTTPStatus
 from logging.handlers import RotatingFileHandler
 
-import telegram
 from dotenv import load_dotenv
 
-from exceptions import RequestApiError
+from change_detection import diff_homeworks, get_changes
+from exceptions import RateLimitError, RequestApiError, ShutdownRequested
+from logging_utils import (BufferingHandler, JsonFormatter, LoggerNameFilter,
+                           SamplingFilter, parse_sampling, setup_queue_logging)
+from metrics import (API_REQUEST_SECONDS, API_RESPONSES, JSON_DECODE_SECONDS,
+                     RESPONSE_CHECKS, SEND_SECONDS, SENDS, VERDICTS)
+from records import REMOVED, Homework, StatusEvent
+from rendering import create_renderer
+from schema import Field, compile_batch, compile_schema
+from shutdown import GracefulShutdown
 
 load_dotenv()
 
@@ -18,15 +27,67 @@ TELEGRAM_TOKEN: str = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID: str = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_PERIOD: int = 600
-ENDPOINT: str = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+ENDPOINT: str = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
 HEADERS: dict = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+HTTP_POOL_SIZE: int = int(os.getenv('HTTP_POOL_SIZE', 64))
+CONNECT_TIMEOUT: float = float(os.getenv('CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT: float = float(os.getenv('READ_TIMEOUT', 30))
+MESSAGE_LIMIT: int = 4096
+STATE_STORE_URL: str = os.getenv('STATE_STORE_URL')
+ERROR_QUEUE_SIZE: int = 1000
+ERROR_COALESCE_WINDOW: float = 5.0
+ERROR_DRAIN_TIMEOUT: float = 10.0
+LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'text')
+LOG_FILE: str = os.getenv('LOG_FILE', 'main.log')
+
+API_OK_MESSAGE = 'Запрос к API практикума вернулся с кодом 200!'
+RESPONSE_OK_MESSAGE = 'Ответ прошёл проверку!'
+DEFAULT_LOG_SAMPLING = {API_OK_MESSAGE: 0.01, RESPONSE_OK_MESSAGE: 0.01}
+ALERT_LOGGERS = (
+    '__main__', 'homework', 'engine', 'async_homework', 'dispatcher',
+    'circuit_breaker', 'commands', 'sharding', 'shutdown', 'state_store',
+)
+
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+renderer = create_renderer(HOMEWORK_VERDICTS)
+
+HOMEWORK_SCHEMA = Field((dict, Homework), fields={
+    'status': Field(choices=renderer.statuses, messages={
+        'missing': 'Отсутствует статус работы в ответе API',
+        'choice': 'Неизвестный статус работы: {value}',
+    }),
+    'homework_name': Field(messages={
+        'missing': 'Отсутствует ключ "homework_name"',
+    }),
+}, messages={'type': 'Описание работы не является словарём'})
+
+
+def get_response_schema(homework_schema=None):
+    """Возвращает схему ответа API.
+    Если передана схема работы, проверяются и элементы homeworks.
+    """
+    return Field(dict, fields={
+        'homeworks': Field(list, items=homework_schema, messages={
+            'type': 'По ключу "homeworks" возвращается не список',
+            'missing': 'В ответе API нет ключа "homeworks"',
+        }),
+    }, messages={'type': 'Ответ не является словарём!'})
+
+
+validate_response = compile_schema(get_response_schema())
+validate_homework = compile_schema(HOMEWORK_SCHEMA)
+validate_homeworks = compile_batch(HOMEWORK_SCHEMA)
+validate_responses = compile_batch(get_response_schema(HOMEWORK_SCHEMA))
+
 _format = ('%(asctime)s - '
            '[%(levelname)s]- '
            '%(name)s - '
@@ -34,48 +95,267 @@ _format = ('%(asctime)s - '
            '%(message)s')
 
 
+def get_formatter():
+    """Возвращает форматтер журнала.
+    При LOG_FORMAT=json записи пишутся компактными строками JSON,
+    иначе - в читаемом формате _format.
+    """
+    if LOG_FORMAT == 'json':
+        return JsonFormatter()
+    return logging.Formatter(_format)
+
+
+def get_log_filters():
+    """Возвращает фильтры выборки записей.
+    Доли задаются в LOG_SAMPLING JSON-объектом {"шаблон": доля}.
+    В режиме LOG_FORMAT=json без LOG_SAMPLING частые записи
+    об успешном опросе пишутся с долей DEFAULT_LOG_SAMPLING.
+    """
+    rates = parse_sampling(os.getenv('LOG_SAMPLING'))
+    if not rates and LOG_FORMAT == 'json':
+        rates = DEFAULT_LOG_SAMPLING
+    return [SamplingFilter(rates)] if rates else []
+
+
 def get_file_handler():
     """Возвращает обработчик файлового лога."""
     file_handler = RotatingFileHandler(
-        'main.log',
-        mode='w',
+        LOG_FILE,
+        mode='a',
         maxBytes=50000000,
         backupCount=5
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter(_format))
+    file_handler.setFormatter(get_formatter())
     return file_handler
 
 
 class TelegramErrorHandler(logging.Handler):
-    """Обработчик для логера отправки сообщения в Telegram."""
+    """Обработчик для логера отправки сообщения в Telegram.
+    emit только кладёт запись в ограниченную очередь, а отправку
+    выполняет фоновый поток через один общий экземпляр бота.
+    Одинаковые записи, пришедшие за coalesce_window секунд,
+    уходят одним сообщением со счётчиком повторов. Если очередь
+    переполнена, новые записи отбрасываются и учитываются в dropped.
+    Неудачные отправки учитываются в failed и пишутся в sys.stderr.
+    """
+
+    def __init__(self, level=logging.ERROR, queue_size=ERROR_QUEUE_SIZE,
+                 coalesce_window=ERROR_COALESCE_WINDOW):
+        super().__init__(level)
+        self.queue = queue.Queue(queue_size)
+        self.coalesce_window = coalesce_window
+        self.dropped = 0
+        self._reported_dropped = 0
+        self.failed = 0
+        self._reported_failed = 0
+        self._bot = None
+        self._worker = None
+        self._worker_lock = threading.Lock()
 
     def emit(self, record):
-        """Отправляет сообщение об ошибке в Telegram, если уровень записи.
-        превышает или равен уровню ERROR.
-        Принимает объект записи лога (record) и
-        отправляет соответствующее сообщение.
+        """Ставит сообщение об ошибке в очередь на отправку в Telegram.
+        Запись попадает в очередь, если её уровень превышает или равен
+        уровню ERROR. Принимает объект записи лога (record),
+        не блокируется.
         """
-        if record.levelno >= logging.ERROR:
-            log_entry = self.format(record)
-            bot = telegram.Bot(token=TELEGRAM_TOKEN)
-            bot.send_message(TELEGRAM_CHAT_ID, log_entry)
+        if record.levelno < logging.ERROR:
+            return
+        try:
+            key = (record.levelno, record.getMessage())
+            self.queue.put_nowait((key, self.format(record)))
+        except queue.Full:
+            self.dropped += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        self._start_worker()
+
+    def _start_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name='telegram-error-handler',
+                    daemon=True
+                )
+                self._worker.start()
+
+    def set_bot(self, bot):
+        """Задаёт бота для отправки, например полосу диспетчера."""
+        self._bot = bot
+
+    def get_bot(self):
+        """Возвращает общий экземпляр бота.
+        Бот создаётся при первой отправке.
+        """
+        if self._bot is None:
+            import telegram
+
+            self._bot = telegram.Bot(token=TELEGRAM_TOKEN)
+        return self._bot
+
+    def _collect(self, first):
+        """Собирает записи за окно склейки.
+        Возвращает словарь {ключ: [текст, число повторов]} и признак
+        того, что пришёл сигнал остановки.
+        """
+        batch = {first[0]: [first[1], 1]}
+        deadline = time.monotonic() + self.coalesce_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, False
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+            if item is None:
+                return batch, True
+            if item[0] in batch:
+                batch[item[0]][1] += 1
+            else:
+                batch[item[0]] = [item[1], 1]
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch, stopped = self._collect(item)
+            for text, count in batch.values():
+                if count > 1:
+                    text = f'{text}\n(повторилось {count} раз)'
+                self._send(text)
+            dropped = self.dropped - self._reported_dropped
+            if dropped:
+                self._reported_dropped += dropped
+                self._send(f'Отброшено сообщений об ошибках: {dropped}')
+            failed = self.failed - self._reported_failed
+            if failed:
+                self._reported_failed += failed
+                self._send(f'Не отправлено сообщений об ошибках: {failed}')
+
+    def _send(self, text):
+        """Отправляет сообщение в Telegram.
+        Сбой нельзя записать в журнал: запись снова пришла бы сюда.
+        Поэтому он, как в logging.Handler.handleError, пишется
+        в sys.stderr и учитывается в failed.
+        """
+        try:
+            self.get_bot().send_message(TELEGRAM_CHAT_ID, text)
+        except Exception as error:
+            self.failed += 1
+            if sys.stderr:
+                sys.stderr.write(
+                    f'Не удалось отправить ошибку в Telegram: {error!r}\n'
+                )
+
+    def close(self):
+        """Дожидается отправки очереди и останавливает фоновый поток."""
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            try:
+                self.queue.put(None, timeout=ERROR_DRAIN_TIMEOUT)
+            except queue.Full:
+                pass
+            worker.join(ERROR_DRAIN_TIMEOUT)
+        self._worker = None
+        super().close()
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=_format)
 logger = logging.getLogger(__name__)
+log_filters = get_log_filters()
+for log_filter in log_filters:
+    logger.addFilter(log_filter)
 telegram_handler = TelegramErrorHandler()
 telegram_handler.setFormatter(logging.Formatter(_format))
 telegram_handler.setLevel(logging.ERROR)
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(logging.Formatter(_format))
-stream_handler.setLevel(logging.ERROR)
+telegram_handler.addFilter(LoggerNameFilter(ALERT_LOGGERS))
+log_listener = None
+
+
+def init():
+    """Настраивает журналы бота.
+    Импорт модуля журналы не трогает: корневой логер, обработчики,
+    файл LOG_FILE и поток записи создаются здесь. Вывод в stderr
+    тоже идёт через поток записи, а не в потоке опроса. Очередь подключается
+    к корневому логеру, поэтому в файл и в консоль попадают записи
+    всех логеров, а в Telegram - только логеров бота из ALERT_LOGGERS:
+    ошибки сторонних библиотек в чат администратора не уходят.
+    Вызывается из main каждой точки входа, повторный вызов ничего
+    не делает. Возвращает слушатель очереди журнала.
+    """
+    global log_listener
+    if log_listener is not None:
+        return log_listener
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(get_formatter())
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(get_formatter())
+    stream_handler.setLevel(logging.ERROR)
+    log_listener = setup_queue_logging(root_logger, [
+        console_handler,
+        stream_handler,
+        telegram_handler,
+        BufferingHandler(get_file_handler()),
+    ])
+    return log_listener
+
+
+_session = None
+
+
+def get_session():
+    """Возвращает общую сессию requests с пулом keep-alive соединений.
+    Размер пула задаётся HTTP_POOL_SIZE, сессия создаётся
+    при первом обращении.
+    """
+    global _session
+    if _session is None:
+        import requests
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=HTTP_POOL_SIZE
+        )
+        _session = requests.Session()
+        _session.mount('https://', adapter)
+        _session.mount('http://', adapter)
+    return _session
+
+
+def close_session():
+    """Закрывает общую сессию и все соединения пула."""
+    global _session
+    if _session is not None:
+        _session.close()
+    _session = None
+
 
-logger.addHandler(stream_handler)
-logger.addHandler(telegram_handler)
-logger.addHandler(get_file_handler())
+def get_pool_stats() -> dict:
+    """Возвращает статистику пула соединений общей сессии.
+    new_connections - число открытых соединений (рукопожатий TCP/TLS),
+    reused_connections - число запросов, ушедших по уже открытым.
+    """
+    new_connections = requests_sent = 0
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                new_connections += pool.num_connections
+                requests_sent += pool.num_requests
+    return {
+        'new_connections': new_connections,
+        'reused_connections': requests_sent - new_connections,
+        'requests': requests_sent,
+    }
 
 
 def check_tokens():
@@ -97,8 +377,29 @@ def send_message(bot, message):
     """Отправляет сообщение в Telegram.
     Принимает экземпляр класса Bot и строку с текстом сообщения.
     """
+    send_message_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to_chat(bot, chat_id, message):
+    """Отправляет сообщение в указанный чат Telegram.
+    Используется как для основного чата, так и для чатов
+    подписчиков многопользовательского движка. Если бот сам
+    пишет метрики отправки (measures_sends, как SendDispatcher),
+    здесь они не пишутся: вызов только ставит сообщение в очередь.
+    """
     logger.info('Вызвана send_message().')
-    bot.send_message(TELEGRAM_CHAT_ID, message)
+    if getattr(bot, 'measures_sends', False):
+        bot.send_message(chat_id, message)
+        return
+    started = time.perf_counter()
+    try:
+        bot.send_message(chat_id, message)
+    except Exception:
+        SENDS.inc('error')
+        raise
+    finally:
+        SEND_SECONDS.observe(time.perf_counter() - started)
+    SENDS.inc('ok')
     logger.debug('Сообщение успешно отправлено в Telegram')
 
 
@@ -108,23 +409,124 @@ def get_api_answer(timestamp) -> dict:
     В случае успешного запроса должна возвращает ответ API,
     приведённый к типам данных Python из формата JSON .
     """
+    return request_homework_statuses(timestamp, HEADERS)
+
+
+def get_auth_headers(token) -> dict:
+    """Возвращает заголовки авторизации для токена Практикума."""
+    return {'Authorization': f'OAuth {token}'}
+
+
+def get_retry_after(response):
+    """Возвращает паузу из заголовка Retry-After в секундах.
+    Если заголовка нет или он не число, возвращает None.
+    """
+    headers = getattr(response, 'headers', None) or {}
     try:
-        homework_statuses = requests.get(
+        return float(headers['Retry-After'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def decode_response(response, decoder=None):
+    """Разбирает JSON из ответа API, замеряя время разбора.
+    decoder - функция из decoders.get_decoder(), которая разбирает
+    тело ответа сразу в записи Homework; без него используется
+    response.json().
+    """
+    started = time.perf_counter()
+    data = response.json() if decoder is None else decoder(response.content)
+    JSON_DECODE_SECONDS.observe(time.perf_counter() - started)
+    return data
+
+
+def handle_api_response(homework_statuses, token, timestamp, cache=None,
+                        decoder=None):
+    """Разбирает ответ API по коду HTTP.
+    Возвращает разобранный ответ или None, если он не изменился,
+    на 429 бросает RateLimitError, на остальные коды - RequestApiError.
+    """
+    if homework_statuses.status_code == HTTPStatus.OK:
+        logger.info(API_OK_MESSAGE)
+        if cache is not None and cache.is_unchanged(
+            token, timestamp, homework_statuses
+        ):
+            return None
+        return decode_response(homework_statuses, decoder)
+    elif (homework_statuses.status_code == HTTPStatus.NOT_MODIFIED
+          and cache is not None):
+        cache.not_modified(token, timestamp)
+        return None
+    elif homework_statuses.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        retry_after = get_retry_after(homework_statuses)
+        logger.warning(
+            'API практикума ограничило частоту запросов, '
+            'повтор через %s с', retry_after
+        )
+        raise RateLimitError('Превышена частота запросов к API',
+                             retry_after)
+    else:
+        logger.error(
+            'Ошибка при запросе к API: %s - %s',
+            homework_statuses.status_code, homework_statuses.text
+        )
+        raise RequestApiError("Ошибка при запросе к API")
+
+
+def request_homework_statuses(timestamp, headers, session=None,
+                              cache=None, decoder=None,
+                              breaker=None) -> dict:
+    """Делает запрос к API с заданными заголовками.
+    Общая часть get_api_answer и многопользовательского движка:
+    session может быть любым объектом с методом get, например
+    общей сессией из get_session(); по умолчанию используется
+    модуль requests.
+    Если передан cache (response_cache.ResponseCache), запрос уходит
+    с условными заголовками, а на ответ 304 или ответ, байт в байт
+    совпадающий с прошлым, возвращается None: такой ответ не нужно
+    заново разбирать и проверять.
+    decoder передаётся в decode_response.
+    Если передан breaker (circuit_breaker.CircuitBreaker), запрос
+    не отправляется при открытом предохранителе, а ответы 5xx
+    и сетевые ошибки учитываются в нём как неудачи.
+    В API_RESPONSES ответ учитывается один раз: по коду HTTP,
+    а без ответа - как error.
+    """
+    if session is None:
+        import requests
+
+        session = requests
+    token = headers.get('Authorization')
+    if cache is not None:
+        headers = {**headers, **cache.conditional_headers(token, timestamp)}
+    if breaker is not None:
+        breaker.before_call()
+    homework_statuses = None
+    started = time.perf_counter()
+    try:
+        homework_statuses = session.get(
             ENDPOINT,
-            headers=HEADERS,
-            params={'from_date': timestamp}
+            headers=headers,
+            params={'from_date': timestamp},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
         )
-        if homework_statuses.status_code == HTTPStatus.OK:
-            logger.info('Запрос к API практикума вернулся с кодом 200!')
-            return homework_statuses.json()
-        else:
-            logger.error(
-                f'Ошибка при запросе к API: '
-                f'{homework_statuses.status_code} - '
-                f'{homework_statuses.text}'
+        API_REQUEST_SECONDS.observe(time.perf_counter() - started)
+        API_RESPONSES.inc(str(int(homework_statuses.status_code)))
+        if breaker is not None:
+            breaker.record(
+                homework_statuses.status_code
+                < HTTPStatus.INTERNAL_SERVER_ERROR
             )
-            raise RequestApiError("Ошибка при запросе к API")
+        return handle_api_response(
+            homework_statuses, token, timestamp, cache, decoder
+        )
+    except RequestApiError:
+        raise
     except Exception as error:
+        if homework_statuses is None:
+            API_RESPONSES.inc('error')
+            if breaker is not None:
+                breaker.record(False)
         logger.error(error)
         raise Exception('Неожиданный результат запроса к API')
 
@@ -133,12 +535,12 @@ def check_response(response) -> None:
     """Проверяет ответ API на соответствие документации.
     Возвращает True или False, в зависимости от результата.
     """
-    if not isinstance(response, dict):
-        raise TypeError('Ответ не является словарём!')
-    homeworks = response.get('homeworks')
-    if not isinstance(homeworks, list):
-        raise TypeError('По ключу "homeworks" возвращается не список')
-    logger.info('Ответ прошёл проверку!')
+    errors = validate_response(response)
+    if errors:
+        RESPONSE_CHECKS.inc('error')
+        raise TypeError(errors[0].message)
+    RESPONSE_CHECKS.inc('ok')
+    logger.info(RESPONSE_OK_MESSAGE)
     return True
 
 
@@ -147,60 +549,161 @@ def parse_status(homework):
     возвращает строку с описанием статуса.
     Принимает элемент списка статусов работ.
     """
-    if 'status' not in homework:
-        error_message = 'Отсутствует статус работы в ответе API'
-        raise ValueError(error_message)
-    status = homework['status']
-    if status not in HOMEWORK_VERDICTS:
-        error_message = f'Неизвестный статус работы: {status}'
-        raise ValueError(error_message)
-    verdict = HOMEWORK_VERDICTS[status]
-    if 'homework_name' not in homework:
-        error_message = 'Отсутствует ключ "homework_name"'
-        raise ValueError(error_message)
-    homework_name = homework.get('homework_name')
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    check_homework(homework)
+    return format_event(StatusEvent(
+        None, homework['homework_name'], homework['status']
+    ))
+
+
+def check_homework(homework):
+    """Проверяет работу по схеме, при ошибке бросает ValueError."""
+    errors = validate_homework(homework)
+    if errors:
+        raise ValueError(errors[0].message)
+
+
+def format_event(event):
+    """Возвращает сообщение об изменении статуса работы.
+    Сообщение собирает общий renderer по заранее скомпилированному
+    шаблону статуса, об удалённой работе - по шаблону удаления.
+    """
+    if event.kind == REMOVED:
+        return renderer.render_removed(event.homework_name)
+    VERDICTS.inc(event.status)
+    return renderer.render(event.homework_name, event.status)
+
+
+def collect_events(homeworks, sent_statuses):
+    """Возвращает изменения работ из ответа API.
+    sent_statuses - снимок {ключ работы: последний отправленный статус};
+    работы, статус которых уже был отправлен, пропускаются. События
+    типизированы и считаются в change_detection.diff_homeworks.
+    Все работы проверяются по схеме за один проход; если среди них
+    есть неверные, каждая изменившаяся работа проверяется отдельно
+    и первая неверная бросает ValueError, как в parse_status.
+    """
+    check = check_homework if validate_homeworks(homeworks) else None
+    return diff_homeworks(sent_statuses, homeworks, check)
+
+
+def collect_messages(homeworks, sent_statuses):
+    """Формирует сообщения по всем работам из ответа API.
+    Работы отбираются в collect_events. Возвращает список сообщений
+    и словарь изменений для индекса, который нужно применить после
+    успешной отправки.
+    """
+    events = collect_events(homeworks, sent_statuses)
+    return [format_event(event) for event in events], get_changes(events)
+
+
+def batch_messages(messages, limit=MESSAGE_LIMIT):
+    """Склеивает сообщения в пачки не длиннее limit символов.
+    Так несколько изменений статуса уходят одним сообщением Telegram.
+    """
+    batch = ''
+    for message in messages:
+        if batch and len(batch) + len(message) + 2 > limit:
+            yield batch
+            batch = ''
+        batch = f'{batch}\n\n{message}' if batch else message
+    if batch:
+        yield batch
+
+
+def send_batches(bot, chat_id, messages):
+    """Отправляет сообщения пачками в указанный чат."""
+    for batch in batch_messages(messages):
+        send_message_to_chat(bot, chat_id, batch)
+
+
+def save_state(store, key, timestamp, changes, names=None):
+    """Сохраняет метку времени и отправленные статусы подписчика.
+    names - новые названия работ {ключ работы: название}.
+    """
+    for homework_key, status in changes.items():
+        store.set_status(key, homework_key, status)
+    for homework_key, name in (names or {}).items():
+        store.set_name(key, homework_key, name)
+    if timestamp is not None:
+        store.set_cursor(key, timestamp)
+
+
+def send_changes(bot, store, key, timestamp, homeworks, sent_statuses):
+    """Отправляет изменения статусов работ и сохраняет их.
+    Индекс sent_statuses и хранилище обновляются только после
+    того, как все сообщения ушли. Сбой Telegram пишется корневым
+    логером: он попадает в файл и консоль, но не в Telegram, которому
+    не удалось отправить и само сообщение.
+    """
+    import telegram
+
+    messages, changes = collect_messages(homeworks, sent_statuses)
+    try:
+        for batch in batch_messages(messages):
+            send_message(bot, batch)
+            logger.info('Сообщение отправлено!')
+    except telegram.error.TelegramError as error:
+        logging.error('Сбой в работе программы: %s', error)
+        return
+    sent_statuses.update(changes)
+    save_state(store, key, timestamp, changes)
 
 
 def main() -> None:
-    """Основная логика работы бота."""
+    """Основная логика работы бота.
+    На SIGTERM и SIGINT бот доделывает текущий опрос и отправку,
+    прерывает паузу между опросами и сохраняет состояние.
+    """
+    import telegram
+
+    from decoders import to_records
+    from state_store import open_state_store, tenant_key
+
+    init()
     check_tokens()
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
+    store = open_state_store(STATE_STORE_URL)
+    key = tenant_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+    timestamp = store.get_cursor(key) or int(time.time())
     error_sent = False
+    sent_statuses = store.get_statuses(key)
 
-    while True:
-        try:
-            response = get_api_answer(timestamp)
-            timestamp = response.get('current_date')
-
-            if not check_response(response):
-                continue
+    shutdown = GracefulShutdown().install()
+    try:
+        while not shutdown.requested:
+            try:
+                response = to_records(get_api_answer(timestamp))
+                timestamp = response.get('current_date')
 
-            homeworks = response.get('homeworks')
-            if homeworks is None:
-                error_sent = False
-                continue
+                if not check_response(response):
+                    continue
 
-            homework, *_ = homeworks
-            message = parse_status(homework)
-            if message:
-                try:
-                    send_message(bot, message)
-                    logger.info('Сообщение отправлено!')
-                except telegram.error.TelegramError as error:
-                    message = f'Сбой в работе программы: {error}'
-                    logging.error(message)
+                homeworks = response.get('homeworks')
+                if homeworks is None:
+                    error_sent = False
+                    continue
 
-            error_sent = False
+                send_changes(
+                    bot, store, key, timestamp, homeworks, sent_statuses
+                )
 
-        except Exception as error:
-            if not error_sent:
-                logger.error('Произошла ошибка', error)
-                error_sent = True
+                error_sent = False
 
-        finally:
-            time.sleep(RETRY_PERIOD)
+            except Exception as error:
+                if not error_sent:
+                    logger.error('Произошла ошибка: %s', error)
+                    error_sent = True
+
+            finally:
+                store.flush()
+                with shutdown.interruptible():
+                    time.sleep(RETRY_PERIOD)
+
+    except ShutdownRequested:
+        logger.info('Бот остановлен по сигналу')
+    finally:
+        shutdown.restore()
+        store.close()
 
 
 if __name__ == '__main__':
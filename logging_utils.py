@@ -0,0 +1,210 @@
+import atexit
+import copy
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+
+LOG_QUEUE_SIZE: int = 10000
+FILE_BUFFER_RECORDS: int = 100
+FILE_FLUSH_INTERVAL: float = 1.0
+JSON_FIELDS = (
+    ('ts', 'created'),
+    ('level', 'levelname'),
+    ('logger', 'name'),
+    ('func', 'funcName'),
+    ('line', 'lineno'),
+)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler с ограниченной очередью.
+    Если очередь заполнена, запись отбрасывается и учитывается
+    в dropped, поэтому вызов логера никогда не ждёт диск или сеть.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        """Подставляет аргументы в сообщение и передаёт копию записи.
+        Аргументы могут измениться, пока запись ждёт в очереди,
+        поэтому сообщение собирается сразу, как в QueueHandler.
+        Остальное форматирование откладывается до потока-слушателя.
+        Шаблон до подстановки нужен только фильтрам логера, а они
+        к этому моменту уже отработали.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        """Кладёт запись в очередь без ожидания."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BufferingHandler(MemoryHandler):
+    """Копит записи и передаёт их целевому обработчику пачкой.
+    Пачка сбрасывается, когда набралось capacity записей, пришла
+    запись уровня flushLevel или с прошлого сброса прошло
+    flush_interval секунд. По времени пачку сбрасывает фоновый
+    поток, так что записи не ждут следующей записи и после затишья.
+    """
+
+    def __init__(self, target, capacity=FILE_BUFFER_RECORDS,
+                 flush_interval=FILE_FLUSH_INTERVAL,
+                 flushLevel=logging.ERROR):
+        super().__init__(capacity, flushLevel, target)
+        self.setLevel(target.level)
+        self.flush_interval = flush_interval
+        self._flushed_at = time.monotonic()
+        self._closed = threading.Event()
+        threading.Thread(
+            target=self._flush_periodically, name='log-buffer-flush',
+            daemon=True
+        ).start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def shouldFlush(self, record):
+        """Проверяет, пора ли сбросить пачку."""
+        return (
+            super().shouldFlush(record)
+            or time.monotonic() - self._flushed_at >= self.flush_interval
+        )
+
+    def flush(self):
+        """Передаёт накопленные записи целевому обработчику."""
+        with self.lock:
+            super().flush()
+            if self.target is not None:
+                self.target.flush()
+            self._flushed_at = time.monotonic()
+
+    def close(self):
+        """Сбрасывает записи и останавливает фоновый сброс."""
+        self._closed.set()
+        super().close()
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись в компактную строку JSON.
+    В строку попадают время, уровень, логер, функция, строка кода
+    и сообщение. Словарь из extra={'fields': {...}} добавляется
+    к полям записи, у выборочных записей есть поле sample с долей.
+    """
+
+    def format(self, record):
+        """Возвращает запись одной строкой JSON."""
+        data = {key: getattr(record, name) for key, name in JSON_FIELDS}
+        data['msg'] = record.getMessage()
+        sample = getattr(record, 'sample', None)
+        if sample is not None:
+            data['sample'] = sample
+        fields = getattr(record, 'fields', None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(
+            data, ensure_ascii=False, separators=(',', ':'), default=str
+        )
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает заданную долю записей каждого типа.
+    Тип записи - её шаблон record.msg до подстановки аргументов,
+    поэтому сообщения с аргументами нужно писать в стиле
+    logger.info('... %s', value). Доля 0.01 пропускает первую
+    запись и затем каждую сотую, доля 0 отбрасывает все.
+    Записи с шаблоном не из rates проходят без изменений.
+    Фильтр вешается на логер, а не на обработчик, чтобы отброшенная
+    запись не доходила и до обработчиков родительских логеров.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates)
+        self._counters = {
+            message: itertools.count() for message in self.rates
+        }
+        self._periods = {
+            message: max(1, round(1 / rate)) if rate > 0 else 0
+            for message, rate in self.rates.items()
+        }
+
+    def filter(self, record):
+        """Решает, пропустить ли запись."""
+        period = self._periods.get(record.msg)
+        if period is None:
+            return True
+        if not period or next(self._counters[record.msg]) % period:
+            return False
+        if period > 1:
+            record.sample = self.rates[record.msg]
+        return True
+
+
+class LoggerNameFilter(logging.Filter):
+    """Пропускает записи только перечисленных логеров и их потомков.
+    В отличие от logging.Filter, принимает несколько имён.
+    """
+
+    def __init__(self, names):
+        super().__init__()
+        self.names = frozenset(names)
+
+    def filter(self, record):
+        """Решает, пропустить ли запись."""
+        name = record.name
+        while name not in self.names:
+            name, dot, _ = name.rpartition('.')
+            if not dot:
+                return False
+        return True
+
+
+def parse_sampling(value) -> dict:
+    """Разбирает доли выборки из JSON-объекта {"шаблон": доля}."""
+    if not value:
+        return {}
+    rates = json.loads(value)
+    if not isinstance(rates, dict):
+        raise ValueError('Доли выборки задаются JSON-объектом')
+    return {message: float(rate) for message, rate in rates.items()}
+
+
+def setup_queue_logging(logger, handlers, queue_size=LOG_QUEUE_SIZE):
+    """Подключает обработчики к логеру через очередь.
+    Логер получает только DroppingQueueHandler, а обработчики
+    вызываются в отдельном потоке QueueListener с учётом их уровней.
+    Возвращает запущенный слушатель.
+    """
+    log_queue = queue.Queue(queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    logger.addHandler(queue_handler)
+    listener.start()
+    atexit.register(stop_queue_logging, listener)
+    return listener
+
+
+def stop_queue_logging(listener):
+    """Останавливает слушатель, дописав оставшуюся очередь.
+    Сами обработчики сбрасывает и закрывает logging.shutdown,
+    который выполняется при выходе после этой функции.
+    """
+    if listener._thread is not None:
+        listener.stop()
@@ -0,0 +1,242 @@
+import threading
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    5.0, 10.0, 30.0
+)
+DECODE_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1
+)
+
+
+def _format_labels(labelnames, labelvalues):
+    if not labelnames:
+        return ''
+    pairs = ','.join(
+        f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)
+    )
+    return f'{{{pairs}}}'
+
+
+class Counter:
+    """Счётчик с необязательными метками.
+    Запись - одна операция со словарём под блокировкой, без
+    выделения памяти на уже встречавшиеся значения меток.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        """Увеличивает счётчик для значений меток."""
+        with self._lock:
+            self._values[labelvalues] = (
+                self._values.get(labelvalues, 0) + amount
+            )
+
+    def value(self, *labelvalues):
+        """Возвращает значение счётчика."""
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        """Возвращает строки метрики в текстовом формате Prometheus."""
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {value}'
+            for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    """Показатель, который можно как увеличивать, так и задавать."""
+
+    kind = 'gauge'
+
+    def set(self, value, *labelvalues):
+        """Задаёт значение показателя."""
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин.
+    observe находит корзину линейным проходом по десятку границ
+    и увеличивает один счётчик под блокировкой.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Добавляет наблюдение."""
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @property
+    def count(self):
+        """Возвращает число наблюдений."""
+        return sum(self._counts)
+
+    def samples(self):
+        """Возвращает строки метрики в текстовом формате Prometheus."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f'{self.name}_sum {total}')
+        lines.append(f'{self.name}_count {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        """Возвращает счётчик, создавая его при первом обращении."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """Возвращает показатель, создавая его при первом обращении."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        """Возвращает гистограмму, создавая её при первом обращении."""
+        return self._register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    'practicum_request_seconds', 'Время запроса к API Практикума.'
+)
+API_RESPONSES = REGISTRY.counter(
+    'practicum_responses_total', 'Ответы API Практикума по коду HTTP.',
+    ('status',)
+)
+JSON_DECODE_SECONDS = REGISTRY.histogram(
+    'practicum_json_decode_seconds', 'Время разбора JSON ответа.',
+    DECODE_BUCKETS
+)
+RESPONSE_CHECKS = REGISTRY.counter(
+    'practicum_response_checks_total', 'Результаты проверки ответа API.',
+    ('result',)
+)
+VERDICTS = REGISTRY.counter(
+    'homework_verdicts_total', 'Разобранные статусы работ.', ('status',)
+)
+SEND_SECONDS = REGISTRY.histogram(
+    'telegram_send_seconds', 'Время отправки сообщения в Telegram.'
+)
+SENDS = REGISTRY.counter(
+    'telegram_sends_total',
+    'Вызовы Bot API: ok, error - сообщение потеряно, rate_limited - '
+    'ответ 429, retry - сетевая ошибка с повтором.', ('result',)
+)
+COALESCED = REGISTRY.counter(
+    'practicum_coalesced_requests_total',
+    'Склеенные запросы к API: leader - выполнен, shared - дождался '
+    'чужого, cached - взят из кеша.', ('result',)
+)
+CIRCUIT_STATE = REGISTRY.gauge(
+    'circuit_breaker_state',
+    'Состояние предохранителя: 0 - закрыт, 1 - открыт, 2 - полуоткрыт.',
+    ('name',)
+)
+CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    'circuit_breaker_transitions_total', 'Переходы предохранителя.',
+    ('name', 'state')
+)
+CIRCUIT_REJECTED = REGISTRY.counter(
+    'circuit_breaker_rejected_total',
+    'Запросы, не отправленные из-за открытого предохранителя.', ('name',)
+)
+COMMANDS = REGISTRY.counter(
+    'bot_commands_total', 'Команды, полученные ботом.', ('command',)
+)
+STATUS_CHANGES = REGISTRY.counter(
+    'homework_status_changes_total',
+    'Изменения работ, найденные сравнением со снимком.', ('kind',)
+)
+
+
+def make_metrics_handler(registry=REGISTRY):
+    """Возвращает обработчик HTTP, который отдаёт метрики /metrics.
+    http.server импортируется здесь, а не при импорте модуля:
+    счётчики нужны везде, а сервер метрик - только движку.
+    """
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Отдаёт метрики по адресу /metrics."""
+
+        def do_GET(self):
+            """Отвечает текстом метрик."""
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Не пишет журнал запросов в stderr."""
+
+    return MetricsHandler
+
+
+def start_metrics_server(port, host='0.0.0.0', registry=REGISTRY):
+    """Запускает HTTP-сервер метрик в фоновом потоке."""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), make_metrics_handler(registry))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,113 @@
+import os
+import random
+
+from change_detection import get_homework_key
+from homework import HOMEWORK_VERDICTS, RETRY_PERIOD
+
+MAX_INTERVAL: int = int(os.getenv('MAX_POLL_INTERVAL', 6 * 60 * 60))
+MAX_BACKOFF: int = int(os.getenv('MAX_BACKOFF', 60 * 60))
+
+STATUS_INTERVALS = {
+    'reviewing': 120,
+    'rejected': RETRY_PERIOD,
+    'approved': 60 * 60,
+}
+
+
+def get_backoff(failures, base, cap=MAX_BACKOFF, rand=random.random):
+    """Возвращает паузу после failures неудач подряд.
+    Пауза растёт вдвое с каждой неудачей, но не больше cap.
+    Половина паузы случайна, чтобы подписчики, упавшие
+    одновременно, не возвращались к API тоже одновременно.
+    """
+    delay = min(cap, base * 2 ** min(failures, 32))
+    return delay / 2 + rand() * delay / 2
+
+
+class FixedPollingPolicy:
+    """Политика с постоянным интервалом опроса, как в homework.main.
+    После ошибок опроса интервал растёт экспоненциально
+    со случайной добавкой, успешный опрос сбрасывает его.
+    """
+
+    def __init__(self, interval=RETRY_PERIOD, max_backoff=MAX_BACKOFF,
+                 rand=random.random):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.rand = rand
+
+    def observe(self, state, homeworks):
+        """Сбрасывает счётчик ошибок после успешного опроса."""
+        state.failures = 0
+
+    def on_rate_limit(self, state, retry_after):
+        """Запоминает паузу, запрошенную API."""
+        state.retry_after = retry_after or self.interval
+
+    def on_error(self, state):
+        """Откладывает следующий опрос подписчика после ошибки."""
+        state.failures += 1
+        state.retry_after = get_backoff(
+            state.failures, self.interval,
+            max(self.max_backoff, self.interval), self.rand
+        )
+
+    def on_circuit_open(self, state, retry_after):
+        """Откладывает опрос, пока предохранитель API открыт.
+        К паузе добавляется случайная доля интервала, чтобы после
+        закрытия предохранителя подписчики не пришли разом.
+        """
+        state.retry_after = (retry_after or 0) + self.rand() * self.interval
+
+    def next_interval(self, state):
+        """Возвращает интервал до следующего опроса подписчика."""
+        interval = max(self.interval, state.retry_after or 0)
+        state.retry_after = None
+        return interval
+
+
+class AdaptivePollingPolicy(FixedPollingPolicy):
+    """Подбирает интервал опроса по последним статусам работ.
+    Пока работа на проверке, опрос идёт часто. Когда все работы
+    приняты, интервал растёт в backoff_factor раз после каждого
+    опроса без изменений, но не больше max_interval.
+    Пауза из Retry-After всегда соблюдается.
+    """
+
+    def __init__(self, intervals=None, interval=RETRY_PERIOD,
+                 max_interval=MAX_INTERVAL, backoff_factor=2, **kwargs):
+        super().__init__(interval, **kwargs)
+        self.intervals = STATUS_INTERVALS if intervals is None else intervals
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+
+    def observe(self, state, homeworks):
+        """Обновляет известные статусы работ подписчика."""
+        super().observe(state, homeworks)
+        if not homeworks:
+            state.quiet_polls += 1
+            return
+        state.quiet_polls = 0
+        for homework in homeworks:
+            status = homework.get('status')
+            if status in HOMEWORK_VERDICTS:
+                state.statuses[get_homework_key(homework)] = status
+
+    def next_interval(self, state):
+        """Возвращает интервал до следующего опроса подписчика."""
+        statuses = set(state.statuses.values())
+        if not statuses:
+            interval = self.interval
+        else:
+            interval = min(
+                self.intervals.get(status, self.interval)
+                for status in statuses
+            )
+        if statuses == {'approved'}:
+            interval = min(
+                interval * self.backoff_factor ** min(state.quiet_polls, 32),
+                self.max_interval
+            )
+        interval = max(interval, state.retry_after or 0)
+        state.retry_after = None
+        return interval
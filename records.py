@@ -0,0 +1,144 @@
+import sys
+
+MISSING = object()
+
+ADDED: str = 'added'
+CHANGED: str = 'changed'
+REMOVED: str = 'removed'
+
+
+def intern_status(status):
+    """Возвращает единственный экземпляр строки статуса.
+    Статусы из HOMEWORK_VERDICTS совпадают с ним по объекту, поэтому
+    у тысяч записей один и тот же статус хранится один раз,
+    а сравнение обычно заканчивается проверкой тождества.
+    """
+    return sys.intern(status) if type(status) is str else status
+
+
+class Homework:
+    """Запись о работе только с полями, которые нужны боту.
+    Остальные поля ответа API не хранятся. Отсутствующий в ответе
+    ключ остаётся отсутствующим: homework['status'] бросает KeyError,
+    а 'status' in homework возвращает False. Поэтому запись можно
+    передавать в check_response, parse_status и collect_messages
+    вместо словаря. Статус хранится интернированной строкой.
+    """
+
+    __slots__ = ('id', 'status', 'homework_name')
+
+    def __init__(self, id=MISSING, status=MISSING, homework_name=MISSING):
+        self.id = id
+        self.status = intern_status(status)
+        self.homework_name = homework_name
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создаёт запись из словаря ответа API."""
+        return cls(
+            data.get('id', MISSING),
+            data.get('status', MISSING),
+            data.get('homework_name', MISSING),
+        )
+
+    def __getitem__(self, key):
+        """Возвращает поле по ключу, как у словаря."""
+        if key in self.__slots__:
+            value = getattr(self, key)
+            if value is not MISSING:
+                return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """Возвращает поле по ключу или default, как у словаря."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        """Проверяет, было ли поле в ответе API."""
+        return (
+            key in self.__slots__
+            and getattr(self, key) is not MISSING
+        )
+
+    def to_dict(self):
+        """Возвращает словарь с полями, которые были в ответе API."""
+        return {
+            name: getattr(self, name) for name in self.__slots__
+            if getattr(self, name) is not MISSING
+        }
+
+    def __eq__(self, other):
+        """Сравнивает запись с записью или словарём ответа API."""
+        if isinstance(other, Homework):
+            other = other.to_dict()
+        elif isinstance(other, dict):
+            other = {
+                name: other[name] for name in self.__slots__
+                if name in other
+            }
+        else:
+            return NotImplemented
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Возвращает строку с полями записи."""
+        fields = ', '.join(
+            f'{name}={value!r}' for name, value in self.to_dict().items()
+        )
+        return f'Homework({fields})'
+
+
+class StatusEvent:
+    """Изменение статуса работы, о котором нужно сообщить.
+    key - ключ работы из get_homework_key, может быть None,
+    если у работы нет ни id, ни имени. kind - тип изменения:
+    ADDED - работа появилась, CHANGED - сменился статус,
+    REMOVED - работа пропала из полного ответа API. previous -
+    статус до изменения, у ADDED - None, у REMOVED status - None.
+    """
+
+    __slots__ = ('key', 'homework_name', 'status', 'kind', 'previous')
+
+    def __init__(self, key, homework_name, status, kind=ADDED,
+                 previous=None):
+        self.key = key
+        self.homework_name = homework_name
+        self.status = intern_status(status)
+        self.kind = kind
+        self.previous = intern_status(previous)
+
+    def __eq__(self, other):
+        """Сравнивает события по всем полям."""
+        if not isinstance(other, StatusEvent):
+            return NotImplemented
+        return (
+            (self.key, self.homework_name, self.status, self.kind,
+             self.previous)
+            == (other.key, other.homework_name, other.status, other.kind,
+                other.previous)
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Возвращает строку с полями события."""
+        return (
+            f'StatusEvent(key={self.key!r}, '
+            f'homework_name={self.homework_name!r}, status={self.status!r}, '
+            f'kind={self.kind!r}, previous={self.previous!r})'
+        )
+
+
+def as_homework(data):
+    """Возвращает запись Homework для словаря ответа API.
+    Записи и значения другого типа возвращаются как есть, чтобы
+    проверка по схеме сообщила о них так же, как о словарях.
+    """
+    if isinstance(data, dict):
+        return Homework.from_dict(data)
+    return data
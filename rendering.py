@@ -0,0 +1,122 @@
+import os
+import threading
+from functools import lru_cache
+
+MESSAGE_TEMPLATES = {
+    'ru': 'Изменился статус проверки работы "{homework_name}". {verdict}',
+    'en': 'Homework "{homework_name}" status changed. {verdict}',
+}
+REMOVED_TEMPLATES = {
+    'ru': 'Работа "{homework_name}" больше не отображается в Практикуме.',
+    'en': 'Homework "{homework_name}" is no longer listed on Practicum.',
+}
+EN_VERDICTS = {
+    'approved': 'Homework approved: the reviewer liked everything. Hooray!',
+    'reviewing': 'Homework is being reviewed.',
+    'rejected': 'Homework reviewed: the reviewer left comments.',
+}
+MESSAGE_LOCALE: str = os.getenv('MESSAGE_LOCALE', 'ru')
+RENDER_CACHE_SIZE: int = int(os.getenv('RENDER_CACHE_SIZE', 4096))
+
+
+def compile_template(template, verdict):
+    """Подставляет вердикт в шаблон заранее.
+    Возвращает метод format строки, которому остаётся передать
+    только название работы.
+    """
+    verdict = verdict.replace('{', '{{').replace('}', '}}')
+    return template.replace('{verdict}', verdict).format
+
+
+class MessageRenderer:
+    """Собирает сообщения об изменении статуса работы.
+    Для каждой пары (язык, статус) шаблон компилируется один раз,
+    готовые сообщения кешируются по (название работы, статус, язык)
+    в LRU-кеше на cache_size записей. Новые статусы и языки
+    добавляются через add_verdict и add_locale без изменения кода,
+    который вызывает render. Сообщения об удалённых работах
+    собирает render_removed по шаблону удаления языка.
+    """
+
+    def __init__(self, locale=MESSAGE_LOCALE, cache_size=RENDER_CACHE_SIZE):
+        self.locale = locale
+        self.templates = {}
+        self.removed_templates = {}
+        self.verdicts = {}
+        self._compiled = {}
+        self._lock = threading.Lock()
+        self._cached = lru_cache(cache_size)(self._render)
+
+    @property
+    def statuses(self):
+        """Возвращает словарь вердиктов языка по умолчанию.
+        Словарь живой: статусы, добавленные позже, в нём появляются.
+        """
+        return self.verdicts[self.locale]
+
+    def add_locale(self, locale, template, verdicts, removed_template=None):
+        """Добавляет язык с шаблоном сообщения и вердиктами.
+        removed_template - шаблон сообщения об удалённой работе.
+        """
+        with self._lock:
+            self.templates[locale] = template
+            if removed_template is not None:
+                self.removed_templates[locale] = removed_template
+            self.verdicts.setdefault(locale, {})
+            for status, verdict in verdicts.items():
+                self._add(locale, status, verdict)
+
+    def add_verdict(self, status, verdict, locale=None):
+        """Добавляет или заменяет вердикт для статуса."""
+        with self._lock:
+            self._add(locale or self.locale, status, verdict)
+
+    def remove_verdict(self, status, locale=None):
+        """Удаляет вердикт статуса, если он есть."""
+        locale = locale or self.locale
+        with self._lock:
+            self.verdicts[locale].pop(status, None)
+            self._compiled.pop((locale, status), None)
+            self._cached.cache_clear()
+
+    def _add(self, locale, status, verdict):
+        self.verdicts[locale][status] = verdict
+        self._compiled[locale, status] = compile_template(
+            self.templates[locale], verdict
+        )
+        self._cached.cache_clear()
+
+    def _render(self, homework_name, status, locale):
+        return self._compiled[locale, status](homework_name=homework_name)
+
+    def render(self, homework_name, status, locale=None):
+        """Возвращает сообщение об изменении статуса работы.
+        Для неизвестного статуса бросает KeyError.
+        """
+        return self._cached(homework_name, status, locale or self.locale)
+
+    def render_removed(self, homework_name, locale=None):
+        """Возвращает сообщение о работе, пропавшей из ответа API.
+        Для языка без шаблона удаления бросает KeyError.
+        """
+        return self.removed_templates[locale or self.locale].format(
+            homework_name=homework_name
+        )
+
+    def cache_info(self):
+        """Возвращает статистику LRU-кеша сообщений."""
+        return self._cached.cache_info()
+
+
+def create_renderer(verdicts, locale=MESSAGE_LOCALE):
+    """Возвращает сборщик сообщений для русского и английского языков.
+    Русские вердикты берутся из verdicts, английские - из EN_VERDICTS,
+    по умолчанию сообщения собираются на языке locale.
+    """
+    renderer = MessageRenderer(locale)
+    for locale, locale_verdicts in (('ru', verdicts), ('en', EN_VERDICTS)):
+        renderer.add_locale(
+            locale, MESSAGE_TEMPLATES[locale], locale_verdicts,
+            REMOVED_TEMPLATES[locale]
+        )
+    return renderer
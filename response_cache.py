@@ -0,0 +1,97 @@
+import hashlib
+import re
+import threading
+
+SERVER_TIME = re.compile(rb'"current_date"\s*:\s*-?\d+')
+
+
+class CacheEntry:
+    """Сведения о последнем ответе API для одного токена."""
+
+    __slots__ = ('from_date', 'etag', 'last_modified', 'body_hash')
+
+    def __init__(self, from_date, etag, last_modified, body_hash):
+        self.from_date = from_date
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
+
+
+def get_body_hash(content):
+    """Возвращает короткий хеш тела ответа.
+    current_date - время сервера, оно меняется в каждом ответе,
+    поэтому перед хешированием значение заменяется на постоянное.
+    Иначе одинаковые по сути ответы никогда бы не совпадали.
+    """
+    return hashlib.blake2b(
+        SERVER_TIME.sub(b'"current_date":0', content), digest_size=16
+    ).digest()
+
+
+class ResponseCache:
+    """Кеш ответов API для условных запросов.
+    Ключ - пара (токен, from_date). На каждый токен хранится только
+    последний from_date, поэтому размер кеша ограничен числом
+    подписчиков. Хранятся ETag, Last-Modified и хеш тела ответа
+    без current_date, но не сам ответ: неизменившийся ответ
+    повторно не разбирается.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Возвращает число токенов в кеше."""
+        return len(self._entries)
+
+    def _get(self, token, from_date):
+        entry = self._entries.get(token)
+        if entry is None or entry.from_date != from_date:
+            return None
+        return entry
+
+    def conditional_headers(self, token, from_date):
+        """Возвращает заголовки условного запроса для ключа."""
+        entry = self._get(token, from_date)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def not_modified(self, token, from_date):
+        """Отмечает ответ 304 и сообщает, был ли ключ в кеше."""
+        hit = self._get(token, from_date) is not None
+        self._count(hit)
+        return hit
+
+    def is_unchanged(self, token, from_date, response):
+        """Проверяет, совпадает ли тело ответа с прошлым.
+        Если не совпадает, запоминает новый ответ.
+        """
+        body_hash = get_body_hash(response.content)
+        entry = self._get(token, from_date)
+        hit = entry is not None and entry.body_hash == body_hash
+        self._count(hit)
+        if not hit:
+            headers = getattr(response, 'headers', None) or {}
+            self._entries[token] = CacheEntry(
+                from_date,
+                headers.get('ETag'),
+                headers.get('Last-Modified'),
+                body_hash
+            )
+        return hit
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
@@ -0,0 +1,93 @@
+import heapq
+import itertools
+import random
+import time
+
+from homework import RETRY_PERIOD
+
+DEFAULT_JITTER: float = 0.5
+
+
+class Scheduler:
+    """Планировщик периодических опросов на двоичной куче.
+    Вставка и извлечение задачи стоят O(log n), поэтому в очереди
+    можно держать сотни тысяч подписчиков. Следующий запуск
+    считается от запланированного, а не от фактического времени,
+    поэтому период не накапливает дрейф.
+    """
+
+    def __init__(self, period=RETRY_PERIOD, jitter=DEFAULT_JITTER,
+                 clock=time.monotonic, rand=random.random):
+        self.period = period
+        self.jitter = jitter
+        self.clock = clock
+        self.rand = rand
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        """Возвращает число запланированных задач."""
+        return len(self._heap)
+
+    def schedule(self, job, due):
+        """Ставит задачу на момент времени due."""
+        heapq.heappush(self._heap, (due, next(self._counter), job))
+
+    def spread(self, jobs, start=None):
+        """Равномерно распределяет задачи по одному периоду.
+        Каждая задача получает свой слот шириной period / n
+        и случайное смещение внутри доли jitter этого слота.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+        start = self.clock() if start is None else start
+        slot = self.period / len(jobs)
+        for index, job in enumerate(jobs):
+            offset = self.jitter * slot * self.rand()
+            self.schedule(job, start + index * slot + offset)
+
+    def remove(self, jobs):
+        """Удаляет из очереди все запуски задач jobs."""
+        ids = {id(job) for job in jobs}
+        if not ids:
+            return
+        self._heap = [entry for entry in self._heap if id(entry[2]) not in ids]
+        heapq.heapify(self._heap)
+
+    def next_due(self):
+        """Возвращает время ближайшего запуска или None."""
+        return self._heap[0][0] if self._heap else None
+
+    def wait_time(self, now=None):
+        """Возвращает, сколько секунд осталось до ближайшего запуска."""
+        due = self.next_due()
+        if due is None:
+            return self.period
+        now = self.clock() if now is None else now
+        return max(0.0, due - now)
+
+    def pop_due(self, now=None):
+        """Извлекает все задачи, время которых наступило.
+        Возвращает список пар (запланированное время, задача).
+        """
+        now = self.clock() if now is None else now
+        due_jobs = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, job = heapq.heappop(self._heap)
+            due_jobs.append((due, job))
+        return due_jobs
+
+    def reschedule(self, job, due, interval=None, now=None):
+        """Ставит задачу на следующий запуск с сохранением ритма.
+        Если задача опоздала больше чем на интервал, пропущенные
+        запуски не догоняются: берётся ближайший слот в будущем.
+        """
+        interval = self.period if interval is None else interval
+        now = self.clock() if now is None else now
+        next_due = due + interval
+        if next_due <= now:
+            missed = (now - next_due) // interval + 1
+            next_due += missed * interval
+        self.schedule(job, next_due)
+        return next_due
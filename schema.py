@@ -0,0 +1,205 @@
+from collections import namedtuple
+
+SchemaError = namedtuple('SchemaError', ('path', 'kind', 'message'))
+
+MESSAGES = {
+    'type': 'Неверный тип значения',
+    'missing': 'Отсутствует обязательный ключ',
+    'choice': 'Недопустимое значение: {value}',
+}
+
+
+class Field:
+    """Описание ожидаемого значения в ответе API.
+    kind - тип или кортеж типов значения (первый из них проверяется
+    быстрее остальных), fields - описания ключей
+    словаря, items - описание элементов списка, choices - допустимые
+    значения. messages переопределяет тексты ошибок из MESSAGES,
+    в тексте ошибки choice можно подставить {value}.
+    """
+
+    __slots__ = ('kind', 'required', 'fields', 'items', 'choices',
+                 'messages')
+
+    def __init__(self, kind=object, required=True, fields=None, items=None,
+                 choices=None, messages=None):
+        self.kind = kind
+        self.required = required
+        self.fields = fields or {}
+        self.items = items
+        self.choices = choices
+        self.messages = {**MESSAGES, **(messages or {})}
+
+    @property
+    def checks(self):
+        """Есть ли у значения собственные проверки."""
+        return bool(
+            self.kind is not object or self.choices is not None
+            or self.fields or self.items is not None
+        )
+
+
+class _Compiler:
+    """Переводит описание схемы в исходный код проверяющих функций.
+    Проверки разворачиваются в плоскую цепочку if без рекурсии
+    и вызовов. Быстрый проход только ищет первую ошибку и на ней
+    выполняет fail - вызов подробной функции explain, которая
+    собирает SchemaError с путями. Поэтому на верных значениях
+    пути и объекты ошибок не создаются.
+    """
+
+    fail = 'return explain(value)'
+
+    def __init__(self):
+        self.lines = []
+        self.namespace = {'SchemaError': SchemaError}
+        self._names = 0
+
+    def name(self, prefix):
+        self._names += 1
+        return f'{prefix}{self._names}'
+
+    def constant(self, value):
+        name = self.name('c')
+        self.namespace[name] = value
+        return name
+
+    def type_check(self, schema, value):
+        kind = self.constant(schema.kind)
+        check = f'not isinstance({value}, {kind})'
+        if isinstance(schema.kind, type):
+            check = f'type({value}) is not {kind} and {check}'
+        else:
+            first = self.constant(schema.kind[0])
+            check = f'type({value}) is not {first} and {check}'
+        return check
+
+    def fields(self, schema, value, indent, emit, path=None):
+        """Разворачивает проверки ключей словаря.
+        path равен None для быстрой функции, которой пути не нужны.
+        """
+        for key, field in schema.fields.items():
+            key_path = None if path is None else f'{path}{key!r},'
+            if field.required:
+                self.lines.append(f'{indent}if {key!r} not in {value}:')
+                if path is None:
+                    self.lines.append(f'{indent}    {self.fail}')
+                else:
+                    self.error(indent + '    ', key_path, 'missing',
+                               field.messages['missing'], None)
+                if not field.checks:
+                    continue
+                if path is not None:
+                    self.lines.append(f'{indent}else:')
+                    indent_nested = indent + '    '
+                else:
+                    indent_nested = indent
+            elif field.checks:
+                self.lines.append(f'{indent}if {key!r} in {value}:')
+                indent_nested = indent + '    '
+            else:
+                continue
+            item = self.name('v')
+            self.lines.append(f'{indent_nested}{item} = {value}[{key!r}]')
+            emit(field, item, indent_nested, key_path)
+
+    def emit_fast(self, schema, value, indent, path=None):
+        """Добавляет проверки, выполняющие fail при первой ошибке."""
+        if schema.kind is not object:
+            self.lines.append(
+                f'{indent}if {self.type_check(schema, value)}:'
+            )
+            self.lines.append(f'{indent}    {self.fail}')
+        if schema.choices is not None:
+            self.lines.append(
+                f'{indent}if {value} not in '
+                f'{self.constant(schema.choices)}:'
+            )
+            self.lines.append(f'{indent}    {self.fail}')
+        self.fields(schema, value, indent, self.emit_fast)
+        if schema.items is not None:
+            item = self.name('v')
+            self.lines.append(f'{indent}for {item} in {value}:')
+            self.emit_fast(schema.items, item, indent + '    ')
+
+    def error(self, indent, path, kind, message, value):
+        message = self.constant(message)
+        if '{value}' in self.namespace[message]:
+            message = f'{message}.format(value={value})'
+        self.lines.append(
+            f'{indent}errors.append(SchemaError(({path}), {kind!r}, '
+            f'{message}))'
+        )
+
+    def emit(self, schema, value, indent, path):
+        """Добавляет проверки, собирающие все ошибки в errors."""
+        messages = schema.messages
+        nested = (schema.choices is not None or schema.fields
+                  or schema.items is not None)
+        if schema.kind is not object:
+            self.lines.append(
+                f'{indent}if {self.type_check(schema, value)}:'
+            )
+            self.error(indent + '    ', path, 'type', messages['type'], value)
+            if not nested:
+                return
+            self.lines.append(f'{indent}else:')
+            indent += '    '
+        if schema.choices is not None:
+            self.lines.append(
+                f'{indent}if {value} not in '
+                f'{self.constant(schema.choices)}:'
+            )
+            self.error(indent + '    ', path, 'choice', messages['choice'],
+                       value)
+        self.fields(schema, value, indent, self.emit, path)
+        if schema.items is not None:
+            index = self.name('i')
+            item = self.name('v')
+            self.lines.append(
+                f'{indent}for {index}, {item} in enumerate({value}):'
+            )
+            self.emit(schema.items, item, indent + '    ', f'{path}{index},')
+
+
+def _build(schema, batch):
+    compiler = _Compiler()
+    lines = compiler.lines
+    if batch:
+        compiler.fail = 'return explain(values)'
+        lines.append('def validate(values):')
+        lines.append('    for value in values:')
+        compiler.emit_fast(schema, 'value', '        ')
+        lines.append('    return []')
+        lines.append('def explain(values):')
+        lines.append('    errors = []')
+        lines.append('    for index, value in enumerate(values):')
+        compiler.emit(schema, 'value', '        ', 'index,')
+    else:
+        lines.append('def validate(value):')
+        compiler.emit_fast(schema, 'value', '    ')
+        lines.append('    return []')
+        lines.append('def explain(value):')
+        lines.append('    errors = []')
+        compiler.emit(schema, 'value', '    ', '')
+    lines.append('    return errors')
+    source = '\n'.join(lines)
+    exec(compile(source, '<schema>', 'exec'), compiler.namespace)
+    function = compiler.namespace['validate']
+    function.source = source
+    return function
+
+
+def compile_schema(schema):
+    """Возвращает функцию проверки значения по схеме.
+    Функция возвращает список SchemaError, пустой для верного
+    значения. Путь в ошибке - кортеж ключей и индексов до значения.
+    """
+    return _build(schema, batch=False)
+
+
+def compile_batch(schema):
+    """Возвращает функцию проверки списка значений за один проход.
+    Путь в каждой ошибке начинается с индекса значения в списке.
+    """
+    return _build(schema, batch=True)
@@ -0,0 +1,326 @@
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from engine import (COMMANDS_MODE, METRICS_PORT, STATE_STORE_URL,
+                    check_engine_config, load_tenants, run_until_signal,
+                    start_engine)
+from homework import init
+from shutdown import SHUTDOWN_TIMEOUT, GracefulShutdown
+
+
+def get_shard_index(environ=os.environ) -> int:
+    """Возвращает номер шарда этого процесса.
+    Номер берётся из SHARD_INDEX, а если он не задан - из имени
+    процесса Heroku в DYNO (shards.1, shards.2, ...; нумерация
+    с единицы). Так масштабированные копии одной строки Procfile
+    получают разные шарды без отдельной настройки каждой.
+    """
+    if 'SHARD_INDEX' in environ:
+        return int(environ['SHARD_INDEX'])
+    process_type, _, number = environ.get('DYNO', '').rpartition('.')
+    if process_type and number.isdigit():
+        return int(number) - 1
+    return 0
+
+
+SHARD_INDEX: int = get_shard_index()
+SHARD_COUNT: int = int(os.getenv('SHARD_COUNT', 1))
+SHARD_WORKERS: int = int(os.getenv('SHARD_WORKERS', os.cpu_count() or 1))
+VIRTUAL_NODES: int = 128
+MONITOR_INTERVAL: float = 1.0
+RESTART_DELAY: float = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+def ring_hash(key) -> int:
+    """Возвращает положение ключа на кольце.
+    Хеш не зависит от PYTHONHASHSEED, поэтому все процессы и машины
+    раскладывают подписчиков одинаково.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(str(key).encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Консистентное хеширование подписчиков по узлам.
+    Каждый узел занимает на кольце replicas виртуальных точек,
+    подписчик достаётся первому узлу по часовой стрелке от хеша
+    своего токена Практикума. Подписчики с общим токеном попадают
+    на один узел, и их запросы продолжают склеиваться. При добавлении
+    или удалении узла переезжает только доля подписчиков,
+    приходящаяся на этот узел.
+    """
+
+    def __init__(self, nodes=(), replicas=VIRTUAL_NODES):
+        self.replicas = replicas
+        self.nodes = set()
+        self._hashes = []
+        self._owners = {}
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        """Возвращает число узлов."""
+        return len(self.nodes)
+
+    def add(self, node):
+        """Добавляет узел на кольцо."""
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = ring_hash(f'{node}#{replica}')
+            self._owners[point] = node
+            bisect.insort(self._hashes, point)
+
+    def remove(self, node):
+        """Убирает узел с кольца."""
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        for replica in range(self.replicas):
+            point = ring_hash(f'{node}#{replica}')
+            del self._owners[point]
+            del self._hashes[bisect.bisect_left(self._hashes, point)]
+
+    def node_for(self, key):
+        """Возвращает узел, которому принадлежит ключ."""
+        if not self._hashes:
+            raise LookupError('На кольце нет ни одного узла')
+        index = bisect.bisect(self._hashes, ring_hash(key))
+        return self._owners[self._hashes[index % len(self._hashes)]]
+
+    def assign(self, tenants):
+        """Раскладывает подписчиков по узлам.
+        Возвращает словарь {узел: список подписчиков}, в котором
+        есть все узлы кольца, в том числе оставшиеся без подписчиков.
+        """
+        assignment = {node: [] for node in self.nodes}
+        for tenant in tenants:
+            assignment[self.node_for(tenant.token)].append(tenant)
+        return assignment
+
+
+def select_shard(tenants, index=SHARD_INDEX, count=SHARD_COUNT):
+    """Возвращает подписчиков шарда index из count.
+    Так процессы из Procfile или на разных машинах с одинаковым
+    списком подписчиков делят его без общего координатора.
+    """
+    if not 0 <= index < count:
+        raise ValueError(f'Шард {index} вне диапазона 0..{count - 1}')
+    ring = HashRing(f'shard-{number}' for number in range(count))
+    return ring.assign(tenants)[f'shard-{index}']
+
+
+def follow_assignments(engine, assignments):
+    """Применяет к движку назначения из очереди координатора."""
+    for tenants in iter(assignments.get, None):
+        engine.assign(tenants)
+        logger.info('Шард получил %s подписчиков', len(tenants))
+
+
+def run_worker(index, tenants, assignments):
+    """Опрашивает подписчиков в дочернем процессе.
+    Метрики каждого процесса отдаются на своём порту METRICS_PORT +
+    номер процесса + 1. Команды бота в пуле не принимаются:
+    getUpdates может читать только один процесс. На SIGTERM процесс
+    дописывает очередь отправки и сохраняет состояние.
+    """
+    metrics_port = int(METRICS_PORT) + index + 1 if METRICS_PORT else None
+    engine = start_engine(tenants, metrics_port, commands_mode='off')
+    threading.Thread(
+        target=follow_assignments, args=(engine, assignments),
+        name='shard-assignments', daemon=True
+    ).start()
+    run_until_signal(engine)
+
+
+class Coordinator:
+    """Локальный координатор пула процессов опроса.
+    Раскладывает подписчиков по workers процессам на кольце HashRing
+    и следит за процессами. Если процесс завершился, его подписчики
+    переходят к остальным, а через RESTART_DELAY секунд процесс
+    запускается заново и забирает их обратно. Изменившиеся назначения
+    отправляются процессам через очереди. По умолчанию процессы
+    запускаются через spawn: каждый заново импортирует модули
+    и настраивает свои журналы в init. Чтобы переехавший
+    подписчик не получил уведомление повторно, процессы должны
+    делить хранилище состояния SQLite.
+    """
+
+    def __init__(self, tenants, workers=SHARD_WORKERS, target=run_worker,
+                 context=None, replicas=VIRTUAL_NODES):
+        self.tenants = list(tenants)
+        self.workers = workers
+        self.target = target
+        self.context = context or multiprocessing.get_context('spawn')
+        self.ring = HashRing(replicas=replicas)
+        self.processes = {}
+        self.assignment = {}
+
+    def start(self):
+        """Запускает все процессы пула.
+        Сначала на кольцо ставятся все узлы, и только потом каждый
+        процесс запускается сразу со своей окончательной долей, чтобы
+        при старте два процесса не опрашивали одного подписчика.
+        """
+        for index in range(self.workers):
+            self.ring.add(index)
+        assignment = self.ring.assign(self.tenants)
+        for index in range(self.workers):
+            self._spawn(index, assignment[index])
+        self.assignment = assignment
+        return self
+
+    def add_worker(self, index):
+        """Запускает процесс index и отдаёт ему его подписчиков.
+        Остальные процессы получают урезанные назначения раньше,
+        чем запускается новый.
+        """
+        self.ring.add(index)
+        assignment = self.ring.assign(self.tenants)
+        self.rebalance(assignment)
+        self._spawn(index, assignment[index])
+
+    def _spawn(self, index, tenants):
+        queue = self.context.Queue()
+        process = self.context.Process(
+            target=self.target, args=(index, tenants, queue),
+            name=f'shard-{index}', daemon=True
+        )
+        process.start()
+        self.processes[index] = (process, queue)
+
+    def remove_worker(self, index):
+        """Останавливает процесс index и раздаёт его подписчиков."""
+        process, queue = self.processes.pop(index)
+        self.ring.remove(index)
+        self.assignment.pop(index, None)
+        process.terminate()
+        process.join()
+        queue.close()
+        if self.ring:
+            self.rebalance(self.ring.assign(self.tenants))
+
+    def rebalance(self, assignment):
+        """Отправляет запущенным процессам изменившиеся назначения."""
+        for index, tenants in assignment.items():
+            if (index in self.processes
+                    and self.assignment.get(index) != tenants):
+                self.processes[index][1].put(tenants)
+        self.assignment = assignment
+        logger.info(
+            'Подписчики распределены по %s процессам', len(assignment)
+        )
+
+    def check_workers(self):
+        """Убирает с кольца завершившиеся процессы.
+        Возвращает их номера.
+        """
+        dead = [
+            index for index, (process, _) in self.processes.items()
+            if not process.is_alive()
+        ]
+        for index in dead:
+            logger.error(
+                'Процесс шарда %s завершился с кодом %s',
+                index, self.processes[index][0].exitcode
+            )
+            self.remove_worker(index)
+        return dead
+
+    def run_forever(self, shutdown=None):
+        """Следит за процессами и перезапускает завершившиеся.
+        Возвращается, когда shutdown (shutdown.GracefulShutdown)
+        получает сигнал завершения.
+        """
+        shutdown = GracefulShutdown() if shutdown is None else shutdown
+        restarts = {}
+        while not shutdown.wait(MONITOR_INTERVAL):
+            now = time.monotonic()
+            for index in self.check_workers():
+                restarts[index] = now + RESTART_DELAY
+            for index, restart_at in list(restarts.items()):
+                if restart_at <= now:
+                    del restarts[index]
+                    self.add_worker(index)
+
+    def stop(self, timeout=SHUTDOWN_TIMEOUT):
+        """Останавливает все процессы пула.
+        Процессы получают SIGTERM и timeout секунд на то, чтобы
+        дописать отправки и сохранить состояние; не успевшие
+        завершаются принудительно.
+        """
+        deadline = time.monotonic() + timeout
+        processes = list(self.processes.values())
+        self.processes = {}
+        for process, _ in processes:
+            process.terminate()
+        for process, queue in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning('Процесс %s не успел завершиться', process.name)
+                process.kill()
+                process.join()
+            queue.close()
+        self.assignment = {}
+
+
+def check_shard_config(index=SHARD_INDEX, count=SHARD_COUNT,
+                       workers=SHARD_WORKERS, store_url=STATE_STORE_URL):
+    """Завершает программу, если шард настроен неверно.
+    Номер шарда должен быть меньше SHARD_COUNT. Пул процессов
+    работает только с общим хранилищем SQLite: журнал log:///
+    не перечитывает чужие записи, а его сжатие затирает дозаписи
+    других процессов.
+    """
+    if not 0 <= index < count:
+        logger.critical(
+            'Номер шарда %s вне диапазона 0..%s: проверьте SHARD_INDEX, '
+            'DYNO и SHARD_COUNT', index, count - 1
+        )
+        sys.exit(1)
+    if workers > 1 and not (store_url or '').startswith('sqlite:///'):
+        logger.critical(
+            'Для SHARD_WORKERS=%s нужно хранилище STATE_STORE_URL=sqlite:///'
+            '..., получено: %s', workers, store_url
+        )
+        sys.exit(1)
+
+
+def main() -> None:
+    """Запускает шард подписчиков.
+    Шард SHARD_INDEX из SHARD_COUNT выбирает своих подписчиков
+    из общего списка и делит их между SHARD_WORKERS процессами.
+    """
+    init()
+    tenants = load_tenants()
+    check_engine_config(tenants)
+    check_shard_config()
+    tenants = select_shard(tenants)
+    logger.info(
+        'Шард %s из %s: %s подписчиков, процессов: %s',
+        SHARD_INDEX, SHARD_COUNT, len(tenants), SHARD_WORKERS
+    )
+    if SHARD_WORKERS <= 1:
+        run_until_signal(start_engine(
+            tenants, commands_mode='off' if SHARD_COUNT > 1 else COMMANDS_MODE
+        ))
+        return
+    coordinator = Coordinator(tenants).start()
+    with GracefulShutdown() as shutdown:
+        coordinator.run_forever(shutdown)
+        coordinator.stop()
+    logger.info('Пул процессов остановлен')
+
+
+if __name__ == '__main__':
+    main()
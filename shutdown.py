@@ -0,0 +1,85 @@
+import logging
+import os
+import signal
+import threading
+from contextlib import contextmanager
+
+from exceptions import ShutdownRequested
+
+SHUTDOWN_TIMEOUT: float = float(os.getenv('SHUTDOWN_TIMEOUT', 20))
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+logger = logging.getLogger(__name__)
+
+
+class GracefulShutdown:
+    """Перехватывает SIGTERM и SIGINT и просит программу завершиться.
+    Сигнал только взводит event: текущий опрос и отправка
+    доделываются, а цикл видит requested и выходит. Ожидание внутри
+    interruptible() сигнал прерывает сразу, бросая ShutdownRequested.
+    Обработчики ставятся install() только из главного потока
+    и снимаются restore(); объект можно использовать и в блоке with.
+    """
+
+    def __init__(self, signals=SHUTDOWN_SIGNALS):
+        self.signals = signals
+        self.event = threading.Event()
+        self._previous = {}
+        self._interruptible = False
+
+    def install(self):
+        """Ставит обработчики сигналов."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in self.signals:
+                self._previous[signum] = signal.signal(signum, self._handle)
+        return self
+
+    def restore(self):
+        """Возвращает прежние обработчики сигналов."""
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous = {}
+
+    def __enter__(self):
+        """Ставит обработчики сигналов."""
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        """Возвращает прежние обработчики сигналов."""
+        self.restore()
+
+    @property
+    def requested(self):
+        """Возвращает True, если пора завершаться."""
+        return self.event.is_set()
+
+    def request(self):
+        """Просит завершиться, как при получении сигнала."""
+        self.event.set()
+
+    def wait(self, timeout):
+        """Ждёт timeout секунд или сигнала завершения.
+        Возвращает True, если пришёл сигнал.
+        """
+        return self.event.wait(timeout)
+
+    def _handle(self, signum, frame):
+        logger.warning(
+            'Получен сигнал %s, завершаем работу', signal.Signals(signum).name
+        )
+        self.event.set()
+        if self._interruptible:
+            raise ShutdownRequested(signal.Signals(signum).name)
+
+    @contextmanager
+    def interruptible(self):
+        """Блок ожидания, который сигнал прерывает сразу.
+        Если завершение уже запрошено, блок не выполняется.
+        """
+        if self.requested:
+            raise ShutdownRequested('завершение уже запрошено')
+        self._interruptible = True
+        try:
+            yield
+        finally:
+            self._interruptible = False
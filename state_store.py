@@ -0,0 +1,280 @@
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+
+BATCH_SIZE: int = 100
+FLUSH_INTERVAL: float = 1.0
+
+
+def tenant_key(token, chat_id) -> str:
+    """Возвращает ключ подписчика для хранилища.
+    Токен в хранилище не пишется, хранится только его хеш.
+    """
+    return hashlib.blake2b(
+        f'{token}:{chat_id}'.encode(), digest_size=12
+    ).hexdigest()
+
+
+class MemoryStateStore:
+    """Хранилище состояния в памяти процесса.
+    Все операции O(1). Реализации с диском наследуют его индекс
+    и переопределяют только запись изменений.
+    """
+
+    def __init__(self):
+        self._cursors = {}
+        self._statuses = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def get_cursor(self, tenant):
+        """Возвращает сохранённую метку времени подписчика."""
+        return self._cursors.get(tenant)
+
+    def get_statuses(self, tenant) -> dict:
+        """Возвращает копию отправленных статусов подписчика."""
+        return dict(self._statuses.get(tenant, ()))
+
+    def set_cursor(self, tenant, timestamp):
+        """Сохраняет метку времени подписчика."""
+        with self._lock:
+            if self._cursors.get(tenant) == timestamp:
+                return
+            self._cursors[tenant] = timestamp
+            self._write(('cursor', tenant, None, timestamp))
+
+    def set_status(self, tenant, homework, status):
+        """Сохраняет последний отправленный статус работы."""
+        with self._lock:
+            statuses = self._statuses.setdefault(tenant, {})
+            if statuses.get(homework) == status:
+                return
+            statuses[homework] = status
+            self._write(('status', tenant, homework, status))
+
+    def get_names(self, tenant) -> dict:
+        """Возвращает копию названий работ подписчика."""
+        return dict(self._names.get(tenant, ()))
+
+    def set_name(self, tenant, homework, name):
+        """Сохраняет название работы.
+        По нему сообщается об удалении работы, которой уже нет
+        в ответе API.
+        """
+        with self._lock:
+            names = self._names.setdefault(tenant, {})
+            if names.get(homework) == name:
+                return
+            names[homework] = name
+            self._write(('name', tenant, homework, name))
+
+    def reload(self, tenant):
+        """Перечитывает состояние подписчика с диска.
+        Нужно, когда подписчика до этого опрашивал другой процесс.
+        В памяти процесса перечитывать нечего.
+        """
+
+    def _load(self, kind, tenant, homework, value):
+        if kind == 'cursor':
+            self._cursors[tenant] = value
+        elif kind == 'name':
+            self._names.setdefault(tenant, {})[homework] = value
+        else:
+            self._statuses.setdefault(tenant, {})[homework] = value
+
+    def _write(self, record):
+        pass
+
+    def flush(self):
+        """Сбрасывает накопленные изменения на диск."""
+
+    def close(self):
+        """Закрывает хранилище, предварительно сбросив изменения."""
+        self.flush()
+
+
+class BatchingStateStore(MemoryStateStore):
+    """Копит изменения и сбрасывает их пачкой.
+    Сброс происходит, когда накопилось batch_size записей или
+    с прошлого сброса прошло больше flush_interval секунд.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        super().__init__()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._flushed_at = time.monotonic()
+
+    def _write(self, record):
+        self._pending.append(record)
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._flushed_at > self.flush_interval):
+            self._flush_pending()
+
+    def flush(self):
+        """Сбрасывает накопленные изменения на диск."""
+        with self._lock:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self._pending:
+            self._persist(self._pending)
+            self._pending = []
+        self._flushed_at = time.monotonic()
+
+    def _persist(self, records):
+        raise NotImplementedError
+
+
+class SQLiteStateStore(BatchingStateStore):
+    """Хранилище состояния в SQLite.
+    При открытии таблицы читаются в память, поэтому чтение не ходит
+    в базу, а запись идёт пачками в одной транзакции.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS state ('
+            'kind TEXT, tenant TEXT, homework TEXT, value TEXT, '
+            'PRIMARY KEY (kind, tenant, homework))'
+        )
+        rows = self._connection.execute(
+            'SELECT kind, tenant, homework, value FROM state'
+        )
+        for kind, tenant, homework, value in rows:
+            self._load(kind, tenant, json.loads(homework), json.loads(value))
+
+    def reload(self, tenant):
+        """Перечитывает состояние подписчика из базы."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT kind, homework, value FROM state WHERE tenant = ?',
+                (tenant,)
+            ).fetchall()
+            for kind, homework, value in rows:
+                self._load(
+                    kind, tenant, json.loads(homework), json.loads(value)
+                )
+
+    def _persist(self, records):
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?)',
+                [
+                    (kind, tenant, json.dumps(homework), json.dumps(value))
+                    for kind, tenant, homework, value in records
+                ]
+            )
+
+    def close(self):
+        """Закрывает хранилище, предварительно сбросив изменения."""
+        super().close()
+        self._connection.close()
+
+
+class LogStateStore(BatchingStateStore):
+    """Хранилище состояния в журнале только для дозаписи.
+    Каждое изменение - строка JSON в конце файла. При открытии
+    журнал отображается в память через mmap и проигрывается в индекс.
+    fsync выполняется один раз на пачку записей.
+    Недописанная при сбое последняя строка, в том числе строка
+    без перевода строки в конце, отбрасывается.
+    Если журнал вырос вдвое больше живых записей, он сжимается.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._records = self._replay()
+        self._file = open(path, 'ab')
+        if self._records > 2 * self._live_records() + self.batch_size:
+            self.compact()
+
+    def _replay(self):
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return 0
+        records = valid_size = 0
+        with open(self.path, 'rb') as log_file:
+            with mmap.mmap(
+                log_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as log_map:
+                for line in iter(log_map.readline, b''):
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        self._load(*json.loads(line))
+                    except ValueError:
+                        break
+                    records += 1
+                    valid_size = log_map.tell()
+        if valid_size < os.path.getsize(self.path):
+            os.truncate(self.path, valid_size)
+        return records
+
+    def _live_records(self):
+        return len(self._cursors) + sum(
+            len(statuses) for statuses in self._statuses.values()
+        ) + sum(len(names) for names in self._names.values())
+
+    def _persist(self, records):
+        self._file.write(b''.join(
+            json.dumps(record, ensure_ascii=False).encode() + b'\n'
+            for record in records
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._records += len(records)
+
+    def compact(self):
+        """Переписывает журнал, оставляя только актуальные записи."""
+        with self._lock:
+            self._flush_pending()
+            records = [
+                ('cursor', tenant, None, timestamp)
+                for tenant, timestamp in self._cursors.items()
+            ] + [
+                ('status', tenant, homework, status)
+                for tenant, statuses in self._statuses.items()
+                for homework, status in statuses.items()
+            ] + [
+                ('name', tenant, homework, name)
+                for tenant, names in self._names.items()
+                for homework, name in names.items()
+            ]
+            self._file.close()
+            compact_path = f'{self.path}.compact'
+            self._file = open(compact_path, 'wb')
+            self._records = 0
+            self._persist(records)
+            self._file.close()
+            os.replace(compact_path, self.path)
+            self._file = open(self.path, 'ab')
+
+    def close(self):
+        """Закрывает хранилище, предварительно сбросив изменения."""
+        super().close()
+        self._file.close()
+
+
+def open_state_store(url=None):
+    """Открывает хранилище состояния по адресу.
+    sqlite:///path - SQLite, log:///path - журнал с дозаписью,
+    пустой адрес - хранилище в памяти.
+    """
+    if not url:
+        return MemoryStateStore()
+    scheme, _, path = url.partition(':///')
+    if scheme == 'sqlite':
+        return SQLiteStateStore(path)
+    if scheme == 'log':
+        return LogStateStore(path)
+    raise ValueError(f'Неизвестное хранилище состояния: {url}')
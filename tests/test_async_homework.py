@@ -0,0 +1,118 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+
+@pytest.fixture
+def async_module():
+    import async_homework
+    return async_homework
+
+
+def run_with_fake_servers(coroutine_factory, homeworks, sent,
+                          monkeypatch, async_module, status=200):
+    async def homework_statuses(request):
+        token = request.headers['Authorization'].split(' ', 1)[1]
+        if status != 200:
+            return web.json_response({}, status=status)
+        return web.json_response({
+            'homeworks': homeworks.get(token, []),
+            'current_date': int(request.query['from_date']) + 1
+        })
+
+    async def send_message(request):
+        sent.append(await request.json())
+        return web.json_response({'ok': True, 'result': {}})
+
+    async def runner():
+        app = web.Application()
+        app.router.add_get('/homework_statuses/', homework_statuses)
+        app.router.add_post('/bot{token}/sendMessage', send_message)
+        app_runner = web.AppRunner(app)
+        await app_runner.setup()
+        site = web.TCPSite(app_runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base_url = f'http://127.0.0.1:{port}'
+        monkeypatch.setattr(
+            async_module, 'ENDPOINT', f'{base_url}/homework_statuses/'
+        )
+        monkeypatch.setattr(async_module, 'TELEGRAM_API_URL', base_url)
+        try:
+            return await coroutine_factory()
+        finally:
+            await async_module.close_client_session()
+            await app_runner.cleanup()
+
+    return asyncio.run(runner())
+
+
+class TestAsyncHomework:
+
+    def test_async_get_api_answer(self, monkeypatch, async_module):
+        result = run_with_fake_servers(
+            lambda: async_module.async_get_api_answer(100),
+            {}, [], monkeypatch, async_module
+        )
+        assert result == {'homeworks': [], 'current_date': 101}
+
+    def test_async_get_api_answer_not_ok(self, monkeypatch, async_module):
+        with pytest.raises(async_module.RequestApiError):
+            run_with_fake_servers(
+                lambda: async_module.async_get_api_answer(100),
+                {}, [], monkeypatch, async_module, status=500
+            )
+
+    def test_async_session_is_shared(self, monkeypatch, async_module):
+        async def two_requests():
+            await async_module.async_get_api_answer(1)
+            first = async_module.get_client_session()
+            await async_module.async_get_api_answer(2)
+            return first is async_module.get_client_session()
+
+        assert run_with_fake_servers(
+            two_requests, {}, [], monkeypatch, async_module
+        ), 'Все запросы должны идти через одну сессию.'
+
+    def test_async_main_sends_to_every_tenant(self, monkeypatch,
+                                              async_module):
+        from engine import Tenant
+
+        tenants = [Tenant(f'token{i}', str(i)) for i in range(10)]
+        homeworks = {
+            tenant.token: [
+                {'homework_name': f'hw{tenant.chat_id}', 'status': 'approved'}
+            ]
+            for tenant in tenants
+        }
+        sent = []
+        run_with_fake_servers(
+            lambda: async_module.async_main(tenants, iterations=1),
+            homeworks, sent, monkeypatch, async_module
+        )
+        assert sorted(item['chat_id'] for item in sent) == sorted(
+            tenant.chat_id for tenant in tenants
+        )
+        assert all('Ура!' in item['text'] for item in sent)
+
+    def test_async_main_stops_on_sigterm(self, monkeypatch, async_module):
+        from engine import Tenant
+
+        monkeypatch.setattr(async_module, 'RETRY_PERIOD', 60)
+        threading.Timer(
+            0.3, os.kill, (os.getpid(), signal.SIGTERM)
+        ).start()
+        started = time.monotonic()
+        run_with_fake_servers(
+            lambda: async_module.async_main([Tenant('token', '1')]),
+            {}, [], monkeypatch, async_module
+        )
+        assert time.monotonic() - started < 5, (
+            'Сигнал должен прерывать паузу между опросами сразу.'
+        )
+        assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
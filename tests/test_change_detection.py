@@ -0,0 +1,103 @@
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def change_detection_module():
+    import change_detection
+    return change_detection
+
+
+def make_homeworks(*statuses):
+    return [
+        {'id': index, 'homework_name': f'hw{index}', 'status': status}
+        for index, status in enumerate(statuses, 1)
+    ]
+
+
+class TestChangeDetection:
+
+    def test_events_are_typed(self, change_detection_module):
+        from records import ADDED, CHANGED, StatusEvent
+
+        snapshot = {1: 'approved', 2: 'reviewing'}
+        events = change_detection_module.diff_homeworks(
+            snapshot, make_homeworks('approved', 'approved', 'reviewing')
+        )
+        assert events == [
+            StatusEvent(2, 'hw2', 'approved', CHANGED, 'reviewing'),
+            StatusEvent(3, 'hw3', 'reviewing', ADDED),
+        ], 'Неизменившаяся работа не должна давать событие.'
+        assert change_detection_module.get_changes(events) == {
+            2: 'approved', 3: 'reviewing'
+        }
+
+    def test_repeated_homework_gives_one_event(self,
+                                               change_detection_module):
+        homeworks = [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+        ]
+        events = change_detection_module.diff_homeworks(
+            {1: 'approved'}, homeworks
+        )
+        assert [(event.key, event.status) for event in events] == [
+            (2, 'approved')
+        ], 'Работа из ответа должна давать одно событие по последнему статусу.'
+
+    def test_removed_needs_full_listing(self, change_detection_module):
+        from records import REMOVED
+
+        snapshot = {1: 'approved', 2: 'reviewing', 3: None}
+        events = change_detection_module.find_removed(
+            snapshot, make_homeworks('approved'), {2: 'hw2'}
+        )
+        assert [
+            (event.key, event.homework_name, event.kind, event.previous)
+            for event in events
+        ] == [(2, 'hw2', REMOVED, 'reviewing')], (
+            'Уже удалённая работа не должна удаляться повторно.'
+        )
+        assert change_detection_module.get_changes(events) == {2: None}
+        assert change_detection_module.find_removed(snapshot, [], {}) == [], (
+            'Пустой ответ API не должен удалять все работы.'
+        )
+
+    def test_periodic_full_poll_reports_removed_homework(
+            self, random_timestamp, homework_module):
+        from engine import Tenant, TenantState, poll_tenant
+        from state_store import MemoryStateStore
+
+        bot = utils.RecordingTelegramBot()
+        session = utils.FakeSession({'token': {
+            'homeworks': make_homeworks('approved', 'reviewing'),
+            'current_date': random_timestamp
+        }})
+        store = MemoryStateStore()
+        state = TenantState(Tenant('token', '1'), store=store)
+        assert state.full_poll_at > 0
+        poll_tenant(bot, state, session, store=store)
+        session.data_by_token['token']['homeworks'] = make_homeworks(
+            'approved'
+        )
+        state.full_poll_at = 0
+        poll_tenant(bot, state, session, store=store)
+        poll_tenant(bot, state, session, store=store)
+        assert [from_date for _, from_date in session.calls[1:]] == [
+            0, random_timestamp
+        ], 'Полный опрос идёт с from_date=0 и не сдвигает метку времени.'
+        assert state.full_poll_at > 0
+        assert len(bot.sent) == 2, (
+            'Об удалении работы нужно сообщить один раз.'
+        )
+        assert bot.sent[-1] == (
+            '1', homework_module.renderer.render_removed('hw2')
+        )
+        assert state.sent_statuses == {1: 'approved', 2: None}
+        assert store.get_names(state.key) == {1: 'hw1', 2: 'hw2'}
+        assert list(state.homeworks) == [1], (
+            'Удалённая работа не должна попадать в ответ на /status.'
+        )
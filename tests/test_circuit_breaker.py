@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+
+import utils
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def breaker_module():
+    import circuit_breaker
+    return circuit_breaker
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(breaker_module, clock):
+    return breaker_module.CircuitBreaker(
+        name='test', failure_threshold=3, recovery_timeout=30, clock=clock
+    )
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self, breaker_module,
+                                              breaker):
+        from exceptions import CircuitOpenError
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record(False)
+        breaker.before_call()
+        breaker.record(True)
+        assert breaker.state == breaker_module.CLOSED, (
+            'Успешный запрос должен сбрасывать счётчик неудач.'
+        )
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record(False)
+        assert breaker.state == breaker_module.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.before_call()
+        assert error.value.retry_after == 30
+
+    def test_half_open_probe(self, breaker_module, breaker, clock):
+        from exceptions import CircuitOpenError
+        for _ in range(3):
+            breaker.record(False)
+        clock.now = 30
+        breaker.before_call()
+        assert breaker.state == breaker_module.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record(False)
+        assert breaker.state == breaker_module.OPEN, (
+            'Неудачная проба должна снова открывать предохранитель.'
+        )
+        clock.now = 60
+        breaker.before_call()
+        breaker.record(True)
+        assert breaker.state == breaker_module.CLOSED
+        breaker.before_call()
+
+    def test_state_is_exported(self, breaker, breaker_module):
+        from metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS, REGISTRY
+        for _ in range(3):
+            breaker.record(False)
+        assert CIRCUIT_STATE.value('test') == 1
+        assert CIRCUIT_TRANSITIONS.value('test', 'open') >= 1
+        assert 'circuit_breaker_state{name="test"} 1' in REGISTRY.render()
+
+    def test_engine_stops_calling_failing_api(self, breaker, clock):
+        from engine import PollingEngine, Tenant
+        from polling_policy import FixedPollingPolicy
+
+        session = utils.FakeSession(
+            {f'token{index}': {} for index in range(10)},
+            http_status=HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+        policy = FixedPollingPolicy(interval=600, rand=lambda: 0.5)
+        polling_engine = PollingEngine(
+            [Tenant(f'token{index}', str(index)) for index in range(10)],
+            utils.RecordingTelegramBot(), max_workers=1, session=session,
+            policy=policy, breaker=breaker
+        )
+        polling_engine.run_once()
+        assert len(session.calls) == 3, (
+            'После открытия предохранителя запросы к API не должны '
+            'отправляться.'
+        )
+        failed, rejected = polling_engine.states[0], polling_engine.states[-1]
+        assert policy.next_interval(failed) == 900
+        assert rejected.retry_after == 330, (
+            'Опрос должен откладываться до пробного запроса.'
+        )
+        assert rejected.failures == 0, (
+            'Открытый предохранитель не должен считаться ошибкой подписчика.'
+        )
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def coalescing_module():
+    import coalescing
+    return coalescing
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_request(self, coalescing_module):
+        flight = coalescing_module.SingleFlight(ttl=0)
+        calls = []
+        started = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return {'homeworks': []}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do('key', fetch))
+            )
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(1)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join(1)
+        assert len(calls) == 1, 'Одинаковые запросы должны склеиваться.'
+        assert len(results) == 5
+        assert all(result is results[0] for result in results), (
+            'Все вызовы должны получить один и тот же результат.'
+        )
+
+    def test_error_is_shared_and_not_cached(self, coalescing_module):
+        flight = coalescing_module.SingleFlight(ttl=60)
+
+        def fail():
+            raise ValueError('Сбой API')
+
+        with pytest.raises(ValueError):
+            flight.do('key', fail)
+        assert flight.do('key', lambda: 'ok') == 'ok', (
+            'Ошибка не должна попадать в кеш.'
+        )
+
+    def test_results_expire(self, coalescing_module):
+        now = [0.0]
+        flight = coalescing_module.SingleFlight(ttl=5, clock=lambda: now[0])
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        assert flight.do('key', fetch) == 1
+        now[0] = 4
+        assert flight.do('key', fetch) == 1
+        assert flight.do('other', fetch) == 2
+        now[0] = 6
+        assert flight.do('key', fetch) == 3
+
+    def test_engine_coalesces_shared_token(self, random_timestamp):
+        from engine import PollingEngine, Tenant
+
+        session = utils.FakeSession({'shared': {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+            ],
+            'current_date': random_timestamp,
+        }})
+        bot = utils.RecordingTelegramBot()
+        polling_engine = PollingEngine(
+            [Tenant('shared', str(chat)) for chat in range(5)], bot,
+            max_workers=5, session=session
+        )
+        polling_engine.run_once()
+        assert len(session.calls) == 1, (
+            'Подписчики с общим токеном должны делить один запрос к API.'
+        )
+        assert sorted(chat for chat, _ in bot.sent) == [
+            str(chat) for chat in range(5)
+        ], 'Уведомление должно прийти в каждый чат.'
@@ -0,0 +1,197 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientSession, web
+
+import utils
+
+
+@pytest.fixture
+def commands_module():
+    import commands
+    return commands
+
+
+def make_state(chat_id='1', events=(), sent_at=1700000000):
+    from engine import Tenant, TenantState, remember_events
+    from records import StatusEvent
+
+    state = TenantState(Tenant('token', chat_id), timestamp=0)
+    events = [StatusEvent(*event) for event in events]
+    state.sent_statuses.update((event.key, event.status) for event in events)
+    remember_events(state, events, now=sent_at)
+    return state
+
+
+def make_update(update_id, chat_id, text):
+    return {
+        'update_id': update_id,
+        'message': {'chat': {'id': chat_id}, 'text': text},
+    }
+
+
+def run_with_fake_bot_api(coroutine_factory, updates, sent,
+                          async_module):
+    async def get_updates(request):
+        params = await request.json()
+        offset = params.get('offset', 0)
+        result = [
+            update for update in updates if update['update_id'] >= offset
+        ]
+        return web.json_response({'ok': True, 'result': result})
+
+    async def send_message(request):
+        sent.append(await request.json())
+        return web.json_response({'ok': True, 'result': {}})
+
+    async def runner():
+        app = web.Application()
+        app.router.add_post('/bot{token}/getUpdates', get_updates)
+        app.router.add_post('/bot{token}/sendMessage', send_message)
+        app_runner = web.AppRunner(app)
+        await app_runner.setup()
+        site = web.TCPSite(app_runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await coroutine_factory(f'http://127.0.0.1:{port}')
+        finally:
+            await async_module.close_client_session()
+            await app_runner.cleanup()
+
+    return asyncio.run(runner())
+
+
+class TestCommands:
+
+    def test_parse_update(self, commands_module):
+        assert commands_module.parse_update(
+            make_update(1, 42, '/status')
+        ) == ('42', '/status')
+        assert commands_module.parse_update({'update_id': 2}) is None, (
+            'Обновления без сообщения должны пропускаться.'
+        )
+
+    def test_status_from_local_cache(self, commands_module):
+        state = make_state(events=[
+            (1, 'hw1', 'approved'), (2, 'hw2', 'reviewing'),
+        ])
+        state.sent_statuses[3] = 'rejected'
+        handler = commands_module.CommandHandler([state])
+        answer = handler.handle('1', '/status')
+        assert answer.splitlines() == [
+            f'hw1: {handler.verdicts["approved"]}',
+            f'hw2: {handler.verdicts["reviewing"]}',
+            f'3: {handler.verdicts["rejected"]}',
+        ], 'Статусы должны браться из состояния подписчика.'
+
+    def test_status_after_restart_uses_stored_names(self, tmp_path,
+                                                    commands_module):
+        from engine import Tenant, TenantState, send_events
+        from records import StatusEvent
+        from state_store import SQLiteStateStore
+
+        path = str(tmp_path / 'state.db')
+        store = SQLiteStateStore(path)
+        state = TenantState(Tenant('token', '1'), store=store)
+        send_events(utils.RecordingTelegramBot(), state, [
+            StatusEvent(1, 'hw1', 'approved'),
+            StatusEvent(2, 'hw2', 'reviewing'),
+        ], store=store)
+        store.close()
+        store = SQLiteStateStore(path)
+        try:
+            state = TenantState(Tenant('token', '1'), store=store)
+        finally:
+            store.close()
+        handler = commands_module.CommandHandler([state])
+        assert handler.handle('1', '/status').splitlines() == [
+            f'hw1: {handler.verdicts["approved"]}',
+            f'hw2: {handler.verdicts["reviewing"]}',
+        ], 'После перезапуска /status должен показывать названия работ.'
+
+    def test_history_keeps_last_changes(self, commands_module):
+        state = make_state(events=[
+            (1, f'hw{index}', 'reviewing') for index in range(15)
+        ])
+        handler = commands_module.CommandHandler([state])
+        lines = handler.handle('1', '/history@practicum_bot').splitlines()
+        assert len(lines) == commands_module.HISTORY_LIMIT
+        assert lines[-1].endswith(
+            f'hw14: {handler.verdicts["reviewing"]}'
+        ), 'История должна заканчиваться последним изменением.'
+
+    def test_unknown_chat_and_text(self, commands_module):
+        handler = commands_module.CommandHandler([make_state()])
+        assert handler.handle('2', '/status') == (
+            commands_module.NOT_SUBSCRIBED_MESSAGE
+        )
+        assert handler.handle('1', '/status') == (
+            commands_module.NO_STATUSES_MESSAGE
+        )
+        assert handler.handle('1', 'привет') is None, (
+            'На обычный текст бот не отвечает.'
+        )
+        assert handler.handle('1', '/unknown') == (
+            commands_module.HELP_MESSAGE
+        )
+
+    def test_long_polling_answers_commands(self, commands_module):
+        import async_homework
+
+        handler = commands_module.CommandHandler([
+            make_state(events=[(1, 'hw1', 'approved')])
+        ])
+        updates = [
+            make_update(index, 1, '/status') for index in range(1, 201)
+        ]
+        sent = []
+
+        async def poll(base_url):
+            worker = commands_module.UpdateWorker(
+                handler, token='token', api_url=base_url, timeout=0
+            )
+            await worker.run_polling(iterations=2)
+            return worker.offset
+
+        offset = run_with_fake_bot_api(poll, updates, sent, async_homework)
+        assert offset == 201, 'offset должен сдвигаться за последнее update_id.'
+        assert len(sent) == len(updates), (
+            'Каждая команда должна получить ровно один ответ.'
+        )
+        assert sent[0] == {
+            'chat_id': '1',
+            'text': f'hw1: {handler.verdicts["approved"]}',
+        }
+
+    def test_webhook_checks_secret(self, monkeypatch, commands_module):
+        monkeypatch.setattr(commands_module, 'WEBHOOK_SECRET', 'secret')
+        replies = []
+        worker = commands_module.UpdateWorker(
+            commands_module.CommandHandler([make_state()]),
+            send=lambda chat_id, text: replies.append((chat_id, text))
+        )
+
+        async def post_updates():
+            runner = web.AppRunner(worker.webhook_app())
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            url = f'http://127.0.0.1:{port}{commands_module.WEBHOOK_PATH}'
+            statuses = []
+            async with ClientSession() as session:
+                for secret in ('wrong', 'secret'):
+                    async with session.post(
+                        url, json=make_update(1, 1, '/help'),
+                        headers={commands_module.SECRET_HEADER: secret}
+                    ) as response:
+                        statuses.append(response.status)
+            await worker.drain()
+            await runner.cleanup()
+            return statuses
+
+        assert asyncio.run(post_updates()) == [403, 200]
+        assert replies == [('1', commands_module.HELP_MESSAGE)], (
+            'Обновление с неверным секретом не должно обрабатываться.'
+        )
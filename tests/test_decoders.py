@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+import decoders
+
+AVAILABLE = [
+    name for name, (library, _) in decoders.DECODERS.items()
+    if library is not None
+]
+
+
+@pytest.fixture(params=AVAILABLE)
+def decoder(request):
+    return decoders.get_decoder(request.param)
+
+
+class TestDecoders:
+
+    def test_decodes_into_records(self, decoder):
+        from records import Homework
+        data = json.dumps({
+            'homeworks': [{
+                'id': 7, 'status': 'approved', 'homework_name': 'hw.zip',
+                'reviewer_comment': 'Отлично', 'lesson_name': 'Урок',
+            }],
+            'current_date': 1700000000,
+        }, ensure_ascii=False).encode()
+        response = decoder(data)
+        assert response['current_date'] == 1700000000
+        homework = response['homeworks'][0]
+        assert isinstance(homework, Homework), (
+            'Работы должны разбираться в записи Homework.'
+        )
+        assert (homework.id, homework['status'], homework['homework_name']) == (
+            7, 'approved', 'hw.zip'
+        )
+        assert 'reviewer_comment' not in homework
+
+    def test_missing_fields_stay_missing(self, decoder):
+        homework = decoder(b'{"homeworks": [{"homework_name": "hw"}]}')[
+            'homeworks'
+        ][0]
+        assert 'status' not in homework
+        assert homework.get('status') is None
+        with pytest.raises(KeyError):
+            homework['status']
+
+    @pytest.mark.parametrize('payload', [
+        [1, 2], {'homeworks': 'none'}, {'current_date': 1},
+    ])
+    def test_unexpected_shape_is_returned_as_is(self, decoder, payload):
+        assert decoder(json.dumps(payload).encode()) == payload
+
+    def test_records_pass_validation(self, decoder):
+        import homework
+        response = decoder(
+            b'{"homeworks": [{"id": 1, "status": "reviewing",'
+            b' "homework_name": "hw"}], "current_date": 1}'
+        )
+        assert homework.check_response(response)
+        messages, changes = homework.collect_messages(
+            response['homeworks'], {}
+        )
+        assert messages == [homework.parse_status(
+            {'status': 'reviewing', 'homework_name': 'hw'}
+        )]
+        assert changes == {1: 'reviewing'}
+        with pytest.raises(ValueError):
+            homework.parse_status(decoder(
+                b'{"homeworks": [{"status": "lost", "homework_name": "x"}]}'
+            )['homeworks'][0])
+
+    def test_get_decoder(self):
+        assert decoders.get_decoder('json') is decoders.decode_stdlib
+        assert decoders.get_decoder('auto') is decoders.DECODERS[
+            AVAILABLE[0]
+        ][1]
+        with pytest.raises(ValueError):
+            decoders.get_decoder('yaml')
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+import telegram
+
+
+class RecordingBot:
+    def __init__(self, fail_with=None):
+        self.sent = []
+        self.fail_with = list(fail_with or [])
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, text, **kwargs):
+        with self.lock:
+            if self.fail_with:
+                raise self.fail_with.pop(0)
+            self.sent.append((chat_id, text, time.monotonic()))
+
+
+@pytest.fixture
+def dispatcher_module():
+    import dispatcher
+    return dispatcher
+
+
+class TestTokenBucket:
+
+    def test_bucket_refills(self, dispatcher_module):
+        bucket = dispatcher_module.TokenBucket(rate=2, capacity=1, now=0)
+        assert bucket.delay(0) == 0
+        bucket.consume()
+        assert bucket.delay(0) == pytest.approx(0.5)
+        assert bucket.delay(0.5) == 0
+        assert bucket.delay(100) == 0
+        assert bucket.tokens == 1, 'Ведро не должно переполняться.'
+
+
+class TestSendDispatcher:
+
+    def test_status_before_alert(self, dispatcher_module):
+        bot = RecordingBot()
+        dispatcher = dispatcher_module.SendDispatcher(bot, workers=1)
+        dispatcher.lane(dispatcher_module.PRIORITY_ALERT).send_message(
+            1, 'alert'
+        )
+        dispatcher.send_message(2, 'status')
+        dispatcher.start()
+        assert dispatcher.stop(timeout=5)
+        assert [text for _, text, _ in bot.sent] == ['status', 'alert'], (
+            'Изменения статусов должны уходить раньше оповещений об ошибках.'
+        )
+
+    def test_chat_rate_is_respected(self, dispatcher_module):
+        bot = RecordingBot()
+        dispatcher = dispatcher_module.SendDispatcher(
+            bot, workers=4, chat_rate=10, chat_burst=1, global_rate=1000
+        ).start()
+        for index in range(4):
+            dispatcher.send_message('chat', f'message {index}')
+        dispatcher.send_message('other', 'fast')
+        assert dispatcher.stop(timeout=5)
+        times = [sent_at for chat_id, _, sent_at in bot.sent
+                 if chat_id == 'chat']
+        assert len(times) == 4
+        assert times[-1] - times[0] >= 0.25, (
+            'В один чат нельзя отправлять чаще chat_rate сообщений в секунду.'
+        )
+        assert bot.sent[1][0] == 'other', (
+            'Ограничение одного чата не должно задерживать другие чаты.'
+        )
+
+    def test_global_limit_does_not_requeue(self, dispatcher_module):
+        bot = RecordingBot()
+        dispatcher = dispatcher_module.SendDispatcher(
+            bot, workers=2, global_rate=200
+        )
+        take_ready = dispatcher._take_ready
+        calls = []
+
+        def counting_take_ready(now):
+            calls.append(now)
+            return take_ready(now)
+
+        dispatcher._take_ready = counting_take_ready
+        for index in range(400):
+            dispatcher.send_message(index, 'text')
+        dispatcher.start()
+        assert dispatcher.stop(timeout=10)
+        assert len(bot.sent) == 400
+        assert len(calls) == 400, (
+            'Пустое общее ведро не должно перекладывать сообщения '
+            'в отложенные.'
+        )
+
+    def test_retry_after_is_honored(self, dispatcher_module):
+        bot = RecordingBot(fail_with=[telegram.error.RetryAfter(0.2)])
+        dispatcher = dispatcher_module.SendDispatcher(bot, workers=2)
+        started = time.monotonic()
+        dispatcher.start().send_message(1, 'text')
+        assert dispatcher.stop(timeout=5)
+        assert [text for _, text, _ in bot.sent] == ['text']
+        assert bot.sent[0][2] - started >= 0.2
+
+    def test_network_errors_are_retried(self, dispatcher_module):
+        bot = RecordingBot(fail_with=[
+            telegram.error.NetworkError('down'),
+            telegram.error.NetworkError('down'),
+        ])
+        dispatcher = dispatcher_module.SendDispatcher(
+            bot, workers=1, max_retries=1
+        )
+        dispatcher.send_message(1, 'text')
+        dispatcher.start()
+        assert dispatcher.stop(timeout=5)
+        assert (dispatcher.sent, dispatcher.failed) == (0, 1)
+        assert dispatcher.pending() == 0
+
+    def test_deliveries_are_measured(self, dispatcher_module):
+        from homework import send_message_to_chat
+        from metrics import SEND_SECONDS, SENDS
+
+        before = {
+            result: SENDS.value(result)
+            for result in ('ok', 'error', 'rate_limited')
+        }
+        seconds_before = SEND_SECONDS.count
+        bot = RecordingBot(fail_with=[
+            telegram.error.RetryAfter(0.05),
+            telegram.error.Unauthorized('bot was blocked'),
+        ])
+        dispatcher = dispatcher_module.SendDispatcher(bot, workers=1)
+        send_message_to_chat(dispatcher, 1, 'first')
+        send_message_to_chat(dispatcher, 2, 'second')
+        assert SENDS.value('ok') == before['ok'], (
+            'Постановка в очередь не считается отправкой.'
+        )
+        dispatcher.start()
+        assert dispatcher.stop(timeout=5)
+        assert {
+            result: SENDS.value(result) - count
+            for result, count in before.items()
+        } == {'ok': 1, 'error': 1, 'rate_limited': 1}
+        assert SEND_SECONDS.count - seconds_before == 3, (
+            'Время каждого вызова Bot API должно попадать в гистограмму.'
+        )
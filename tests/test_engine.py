@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def engine_module():
+    import engine
+    return engine
+
+
+class TestEngine:
+
+    def test_load_tenants_from_file(self, tmp_path, engine_module):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'token': 'a', 'chat_id': 1},
+            {'token': 'b', 'chat_id': '2'},
+        ]))
+        tenants = engine_module.load_tenants(str(path))
+        assert tenants == [
+            engine_module.Tenant('a', '1'),
+            engine_module.Tenant('b', '2'),
+        ], 'Подписчики должны загружаться из JSON-файла.'
+
+    def test_load_tenants_from_env(self, engine_module):
+        tenants = engine_module.load_tenants()
+        assert tenants == [engine_module.Tenant('sometoken', '12345')], (
+            'Без файла подписчиков используется пара из окружения.'
+        )
+
+    def test_run_once_polls_every_tenant(self, random_timestamp,
+                                         engine_module):
+        tenants = [
+            engine_module.Tenant(f'token{i}', str(i)) for i in range(20)
+        ]
+        data = {
+            tenant.token: {
+                'homeworks': [
+                    {'homework_name': f'hw{tenant.chat_id}',
+                     'status': 'approved'}
+                ],
+                'current_date': random_timestamp
+            }
+            for tenant in tenants
+        }
+        session = utils.FakeSession(data)
+        bot = utils.RecordingTelegramBot()
+        polling_engine = engine_module.PollingEngine(
+            tenants, bot, max_workers=4, session=session
+        )
+        polling_engine.run_once()
+        assert len(session.calls) == len(tenants)
+        assert sorted(chat_id for chat_id, _ in bot.sent) == sorted(
+            tenant.chat_id for tenant in tenants
+        ), 'Каждый подписчик должен получить сообщение в свой чат.'
+        for state in polling_engine.states:
+            assert state.timestamp == random_timestamp, (
+                'Метка времени подписчика должна сдвигаться на current_date.'
+            )
+
+    def test_poll_remembers_sent_events(self, random_timestamp,
+                                        engine_module):
+        tenant = engine_module.Tenant('token', '1')
+        data = {'token': {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+            ],
+            'current_date': random_timestamp
+        }}
+        polling_engine = engine_module.PollingEngine(
+            [tenant], utils.RecordingTelegramBot(),
+            session=utils.FakeSession(data)
+        )
+        polling_engine.run_once()
+        polling_engine.run_once()
+        state = polling_engine.states[0]
+        assert state.homeworks[2].homework_name == 'hw2'
+        assert [event.key for _, event in state.history] == [1, 2], (
+            'В истории должны оставаться только отправленные изменения.'
+        )
+
+    def test_poll_error_does_not_stop_other_tenants(self, random_timestamp,
+                                                    engine_module):
+        tenants = [engine_module.Tenant('good', '1'),
+                   engine_module.Tenant('bad', '2')]
+        data = {
+            'good': {
+                'homeworks': [{'homework_name': 'hw', 'status': 'rejected'}],
+                'current_date': random_timestamp
+            },
+            'bad': ['not', 'a', 'dict'],
+        }
+        bot = utils.RecordingTelegramBot()
+        polling_engine = engine_module.PollingEngine(
+            tenants, bot, max_workers=2, session=utils.FakeSession(data)
+        )
+        polling_engine.run_once()
+        assert [chat_id for chat_id, _ in bot.sent] == ['1']
+        bad_state = polling_engine.states[1]
+        assert bad_state.error_sent, (
+            'Ошибка опроса должна запоминаться, чтобы не слать её повторно.'
+        )
+
+    def test_run_pending_polls_due_tenants(self, random_timestamp,
+                                           engine_module):
+        from scheduler import Scheduler
+
+        tenants = [
+            engine_module.Tenant(f'token{i}', str(i)) for i in range(4)
+        ]
+        data = {
+            tenant.token: {'homeworks': [], 'current_date': random_timestamp}
+            for tenant in tenants
+        }
+        session = utils.FakeSession(data)
+        scheduler = Scheduler(period=40, jitter=0, clock=lambda: 0)
+        polling_engine = engine_module.PollingEngine(
+            tenants, utils.RecordingTelegramBot(), max_workers=2,
+            session=session, scheduler=scheduler
+        )
+        assert polling_engine.run_pending(now=15) == 2, (
+            'Должны опрашиваться только подписчики, чьё время наступило.'
+        )
+        polling_engine.executor.shutdown(wait=True)
+        assert sorted(token for token, _ in session.calls) == [
+            'token0', 'token1'
+        ]
+        assert len(scheduler) == 4
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+
+import pytest
+
+
+class SlowRecordingBot:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.event = threading.Event()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        time.sleep(self.delay)
+        self.sent.append(text)
+        self.event.set()
+
+
+class FlakyBot(SlowRecordingBot):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('Telegram недоступен')
+        super().send_message(chat_id, text, **kwargs)
+
+
+def make_record(message, level=logging.ERROR):
+    return logging.LogRecord('test', level, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def make_handler(homework_module):
+    handlers = []
+
+    def factory(bot, **kwargs):
+        handler = homework_module.TelegramErrorHandler(**kwargs)
+        handler._bot = bot
+        handlers.append(handler)
+        return handler
+
+    yield factory
+    for handler in handlers:
+        handler.close()
+
+
+class TestTelegramErrorHandler:
+
+    def test_emit_does_not_block(self, make_handler):
+        bot = SlowRecordingBot(delay=0.5)
+        handler = make_handler(bot, coalesce_window=0)
+        started = time.perf_counter()
+        handler.emit(make_record('boom'))
+        assert time.perf_counter() - started < 0.1, (
+            'Запись в лог не должна ждать отправки в Telegram.'
+        )
+        assert bot.event.wait(2)
+        assert bot.sent == ['boom']
+
+    def test_identical_records_are_coalesced(self, make_handler):
+        bot = SlowRecordingBot()
+        handler = make_handler(bot, coalesce_window=0.3)
+        for _ in range(5):
+            handler.emit(make_record('boom'))
+        handler.emit(make_record('other'))
+        handler.close()
+        assert bot.sent == ['boom\n(повторилось 5 раз)', 'other'], (
+            'Одинаковые ошибки должны уходить одним сообщением со счётчиком.'
+        )
+
+    def test_full_queue_drops_records(self, make_handler):
+        bot = SlowRecordingBot()
+        handler = make_handler(bot, queue_size=2, coalesce_window=0)
+        handler._start_worker = lambda: None
+        for index in range(5):
+            handler.emit(make_record(f'boom {index}'))
+        assert handler.dropped == 3
+        assert handler.queue.qsize() == 2
+
+    def test_low_level_records_are_ignored(self, make_handler):
+        handler = make_handler(SlowRecordingBot())
+        handler.emit(make_record('info', level=logging.INFO))
+        assert handler.queue.empty()
+
+    def test_failed_sends_are_counted_and_reported(self, capsys,
+                                                   make_handler):
+        bot = FlakyBot(failures=1)
+        handler = make_handler(bot, coalesce_window=0)
+        handler.emit(make_record('boom'))
+        handler.close()
+        assert handler.failed == 1
+        assert 'Telegram недоступен' in capsys.readouterr().err, (
+            'Сбой отправки должен попадать в stderr.'
+        )
+        assert bot.sent == ['Не отправлено сообщений об ошибках: 1'], (
+            'О неотправленных сообщениях нужно сообщить при следующей отправке.'
+        )
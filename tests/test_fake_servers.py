@@ -0,0 +1,41 @@
+import telegram
+
+from benchmarks.fake_servers import FakeBotApi, FakePracticumApi
+
+
+class TestFakeServers:
+
+    def test_practicum_api_answers_like_upstream(self, monkeypatch,
+                                                homework_module):
+        with FakePracticumApi(change_rate=1, payload_size=2) as api:
+            monkeypatch.setattr(homework_module, 'ENDPOINT', api.endpoint)
+            response = homework_module.request_homework_statuses(
+                0, homework_module.get_auth_headers('token')
+            )
+        homework_module.check_response(response)
+        assert len(response['homeworks']) == 3
+        assert response['homeworks'][-1]['homework_name'].startswith(
+            'bench-'
+        )
+        assert api.stats()['changes'] == 1
+
+    def test_practicum_api_errors(self, monkeypatch, homework_module):
+        with FakePracticumApi(error_rate=1) as api:
+            monkeypatch.setattr(homework_module, 'ENDPOINT', api.endpoint)
+            try:
+                homework_module.request_homework_statuses(
+                    0, homework_module.HEADERS
+                )
+            except homework_module.RequestApiError:
+                pass
+            else:
+                raise AssertionError('Заглушка должна отвечать ошибкой 500.')
+        assert api.stats()['errors'] == 1
+
+    def test_bot_api_measures_latency(self):
+        with FakeBotApi() as api:
+            bot = telegram.Bot('123:fake', base_url=api.bot_url)
+            bot.send_message(1, 'Изменился статус "bench-1.0"')
+        stats = api.stats()
+        assert stats['messages'] == 1
+        assert len(stats['latencies']) == 1
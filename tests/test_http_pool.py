@@ -0,0 +1,72 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'homeworks': [], 'current_date': 1}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_endpoint(monkeypatch, homework_module):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        homework_module, 'ENDPOINT',
+        f'http://127.0.0.1:{server.server_address[1]}/'
+    )
+    homework_module.close_session()
+    yield
+    homework_module.close_session()
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpPool:
+
+    def test_session_is_shared(self, homework_module):
+        homework_module.close_session()
+        assert homework_module.get_session() is homework_module.get_session()
+        homework_module.close_session()
+
+    def test_connections_are_reused(self, local_endpoint, homework_module):
+        session = homework_module.get_session()
+        for timestamp in range(5):
+            homework_module.request_homework_statuses(
+                timestamp, homework_module.HEADERS, session
+            )
+        stats = homework_module.get_pool_stats()
+        assert stats['requests'] == 5
+        assert stats['new_connections'] == 1, (
+            'Последовательные запросы должны идти по одному соединению.'
+        )
+        assert stats['reused_connections'] == 4
+
+    def test_request_has_timeout(self, monkeypatch, homework_module):
+        class TimeoutCheckingSession:
+            def get(self, url, **kwargs):
+                self.timeout = kwargs.get('timeout')
+                raise ValueError('stop')
+
+        session = TimeoutCheckingSession()
+        with pytest.raises(Exception):
+            homework_module.request_homework_statuses(
+                0, homework_module.HEADERS, session
+            )
+        assert session.timeout == (
+            homework_module.CONNECT_TIMEOUT, homework_module.READ_TIMEOUT
+        ), 'Запрос к API должен выполняться с таймаутами.'
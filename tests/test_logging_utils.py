@@ -0,0 +1,157 @@
+import json
+import logging
+import queue
+import time
+
+import pytest
+
+
+class SlowListHandler(logging.Handler):
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.records = []
+        self.flushes = 0
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.records.append(self.format(record))
+
+    def flush(self):
+        self.flushes += 1
+
+
+def make_record(message, level=logging.INFO):
+    return logging.makeLogRecord({'msg': message, 'levelno': level})
+
+
+@pytest.fixture
+def logging_utils_module():
+    import logging_utils
+    return logging_utils
+
+
+@pytest.fixture
+def isolated_logger():
+    logger = logging.getLogger('test_logging_utils')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.handlers.clear()
+
+
+class TestLoggingUtils:
+
+    def test_logging_does_not_wait_for_handlers(self, logging_utils_module,
+                                                 isolated_logger):
+        slow = SlowListHandler(delay=0.05)
+        listener = logging_utils_module.setup_queue_logging(
+            isolated_logger, [slow]
+        )
+        started = time.perf_counter()
+        for index in range(10):
+            isolated_logger.info('line %s', index)
+        assert time.perf_counter() - started < 0.05, (
+            'Вызов логера не должен ждать медленный обработчик.'
+        )
+        logging_utils_module.stop_queue_logging(listener)
+        assert slow.records == [f'line {index}' for index in range(10)]
+
+    def test_full_queue_drops_records(self, logging_utils_module):
+        handler = logging_utils_module.DroppingQueueHandler(queue.Queue(2))
+        for index in range(5):
+            handler.handle(make_record(str(index)))
+        assert handler.dropped == 3
+        assert handler.queue.qsize() == 2
+
+    def test_buffering_handler_batches(self, logging_utils_module):
+        target = SlowListHandler()
+        handler = logging_utils_module.BufferingHandler(
+            target, capacity=3, flush_interval=60
+        )
+        for index in range(2):
+            handler.handle(make_record(str(index)))
+        assert target.records == [], 'Записи должны копиться в буфере.'
+        handler.handle(make_record('2'))
+        assert target.records == ['0', '1', '2']
+        handler.handle(make_record('error', logging.ERROR))
+        assert target.records[-1] == 'error', (
+            'Ошибки должны записываться сразу.'
+        )
+        handler.close()
+
+    def test_buffering_handler_flushes_when_idle(self,
+                                                 logging_utils_module):
+        target = SlowListHandler()
+        handler = logging_utils_module.BufferingHandler(
+            target, capacity=100, flush_interval=0.05
+        )
+        for index in range(2):
+            handler.handle(make_record(str(index)))
+        deadline = time.monotonic() + 2
+        while not target.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+        handler.close()
+        assert target.records == ['0', '1'], (
+            'Буфер должен сбрасываться по времени и без новых записей.'
+        )
+
+    def test_arguments_are_merged_before_queueing(self,
+                                                  logging_utils_module):
+        log_queue = queue.Queue()
+        handler = logging_utils_module.DroppingQueueHandler(log_queue)
+        value = ['старое']
+        record = logging.makeLogRecord({'msg': 'значение %s', 'args': (value,)})
+        handler.handle(record)
+        value[0] = 'новое'
+        assert log_queue.get_nowait().getMessage() == "значение ['старое']", (
+            'В журнал должно попадать значение на момент вызова логера.'
+        )
+        assert record.args == (value,), 'Исходная запись не меняется.'
+
+    def test_json_formatter_writes_compact_line(self, logging_utils_module):
+        record = logging.makeLogRecord({
+            'msg': 'Ошибка для чата %s', 'args': (42,),
+            'levelno': logging.ERROR, 'levelname': 'ERROR',
+            'fields': {'tenant': 'abc'},
+        })
+        line = logging_utils_module.JsonFormatter().format(record)
+        assert '\n' not in line and ', ' not in line, (
+            'Запись должна быть одной компактной строкой JSON.'
+        )
+        data = json.loads(line)
+        assert data['msg'] == 'Ошибка для чата 42'
+        assert data['level'] == 'ERROR'
+        assert data['tenant'] == 'abc', 'Поля из extra должны попадать в JSON.'
+
+    def test_sampling_filter_keeps_share_of_records(self,
+                                                    logging_utils_module,
+                                                    isolated_logger):
+        handler = SlowListHandler()
+        isolated_logger.addHandler(handler)
+        sampling = logging_utils_module.SamplingFilter(
+            {'ok': 0.1, 'muted %s': 0}
+        )
+        isolated_logger.addFilter(sampling)
+        for index in range(100):
+            isolated_logger.info('ok')
+            isolated_logger.info('muted %s', index)
+            isolated_logger.info('other %s', index)
+        isolated_logger.removeFilter(sampling)
+        assert handler.records.count('ok') == 10, (
+            'Должна остаться заданная доля записей.'
+        )
+        assert not [line for line in handler.records
+                    if line.startswith('muted')]
+        assert len([line for line in handler.records
+                    if line.startswith('other')]) == 100, (
+            'Записи без доли выборки не должны отбрасываться.'
+        )
+
+    def test_parse_sampling(self, logging_utils_module):
+        assert logging_utils_module.parse_sampling('') == {}
+        assert logging_utils_module.parse_sampling('{"ok": "0.5"}') == {
+            'ok': 0.5
+        }
+        with pytest.raises(ValueError):
+            logging_utils_module.parse_sampling('[0.5]')
@@ -0,0 +1,52 @@
+import utils
+
+
+class TestMessages:
+    HOMEWORKS = [
+        {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+        {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+        {'id': 3, 'homework_name': 'hw3', 'status': 'rejected'},
+    ]
+
+    def test_all_homeworks_are_processed(self, homework_module):
+        messages, changes = homework_module.collect_messages(
+            self.HOMEWORKS, {}
+        )
+        assert len(messages) == 3, (
+            'Сообщение должно формироваться для каждой работы в ответе.'
+        )
+        assert changes == {1: 'approved', 2: 'reviewing', 3: 'rejected'}
+
+    def test_sent_statuses_are_skipped(self, homework_module):
+        messages, changes = homework_module.collect_messages(
+            self.HOMEWORKS, {1: 'approved', 2: 'approved'}
+        )
+        assert [message.split('"')[1] for message in messages] == [
+            'hw2', 'hw3'
+        ], 'Уже отправленный статус не должен отправляться повторно.'
+        assert changes == {2: 'reviewing', 3: 'rejected'}
+
+    def test_batch_messages_respects_limit(self, homework_module):
+        messages = ['a' * 10] * 5
+        batches = list(homework_module.batch_messages(messages, limit=25))
+        assert batches == ['a' * 10 + '\n\n' + 'a' * 10] * 2 + ['a' * 10]
+        assert list(homework_module.batch_messages([])) == []
+
+    def test_engine_sends_one_batch(self, random_timestamp):
+        from engine import PollingEngine, Tenant
+
+        session = utils.FakeSession({'token': {
+            'homeworks': self.HOMEWORKS, 'current_date': random_timestamp
+        }})
+        bot = utils.RecordingTelegramBot()
+        polling_engine = PollingEngine(
+            [Tenant('token', '1')], bot, max_workers=1, session=session
+        )
+        polling_engine.run_once()
+        polling_engine.run_once()
+        assert len(bot.sent) == 1, (
+            'Изменения из одного ответа должны уходить одной пачкой, '
+            'а повторный ответ не должен порождать сообщений.'
+        )
+        chat_id, text = bot.sent[0]
+        assert all(f'"hw{i}"' in text for i in (1, 2, 3))
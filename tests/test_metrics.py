@@ -0,0 +1,98 @@
+import urllib.request
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def metrics_module():
+    import metrics
+    return metrics
+
+
+class TestMetrics:
+
+    def test_histogram_buckets(self, metrics_module):
+        histogram = metrics_module.Histogram('test_seconds', 'test', (1, 2))
+        for value in (0.5, 1.5, 1.5, 10):
+            histogram.observe(value)
+        assert histogram.samples() == [
+            'test_seconds_bucket{le="1"} 1',
+            'test_seconds_bucket{le="2"} 3',
+            'test_seconds_bucket{le="+Inf"} 4',
+            'test_seconds_sum 13.5',
+            'test_seconds_count 4',
+        ]
+
+    def test_counter_labels(self, metrics_module):
+        registry = metrics_module.MetricsRegistry()
+        counter = registry.counter('test_total', 'test', ('status',))
+        counter.inc('200')
+        counter.inc('200')
+        counter.inc('500')
+        assert registry.counter('test_total', 'test') is counter
+        text = registry.render()
+        assert '# TYPE test_total counter' in text
+        assert 'test_total{status="200"} 2' in text
+        assert 'test_total{status="500"} 1' in text
+
+    def test_pipeline_is_instrumented(self, monkeypatch, random_timestamp,
+                                      metrics_module, homework_module):
+        session = utils.FakeSession({'sometoken': {
+            'homeworks': [{'homework_name': 'hw', 'status': 'rejected'}],
+            'current_date': random_timestamp
+        }})
+        requests_before = metrics_module.API_REQUEST_SECONDS.count
+        ok_before = metrics_module.API_RESPONSES.value('200')
+        rejected_before = metrics_module.VERDICTS.value('rejected')
+        sends_before = metrics_module.SENDS.value('ok')
+
+        response = homework_module.request_homework_statuses(
+            0, homework_module.HEADERS, session
+        )
+        homework_module.check_response(response)
+        message = homework_module.parse_status(response['homeworks'][0])
+        homework_module.send_message_to_chat(
+            utils.RecordingTelegramBot(), '1', message
+        )
+
+        assert metrics_module.API_REQUEST_SECONDS.count == requests_before + 1
+        assert metrics_module.API_RESPONSES.value('200') == ok_before + 1
+        assert metrics_module.VERDICTS.value('rejected') == (
+            rejected_before + 1
+        )
+        assert metrics_module.SENDS.value('ok') == sends_before + 1
+
+    def test_decode_error_is_counted_once(self, random_timestamp,
+                                          metrics_module, homework_module):
+        def broken_decoder(content):
+            raise ValueError('Некорректный JSON')
+
+        session = utils.FakeSession({'sometoken': {
+            'homeworks': [], 'current_date': random_timestamp
+        }})
+        ok_before = metrics_module.API_RESPONSES.value('200')
+        error_before = metrics_module.API_RESPONSES.value('error')
+        with pytest.raises(Exception):
+            homework_module.request_homework_statuses(
+                0, homework_module.HEADERS, session, decoder=broken_decoder
+            )
+        assert metrics_module.API_RESPONSES.value('200') == ok_before + 1
+        assert metrics_module.API_RESPONSES.value('error') == error_before, (
+            'Ответ, который не удалось разобрать, учитывается только по коду.'
+        )
+
+    def test_metrics_endpoint(self, metrics_module):
+        server = metrics_module.start_metrics_server(0, host='127.0.0.1')
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics'
+            ) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'practicum_request_seconds_bucket' in body
+        assert 'telegram_send_seconds_count' in body
@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def policy_module():
+    import polling_policy
+    return polling_policy
+
+
+@pytest.fixture
+def tenant_state():
+    from engine import Tenant, TenantState
+    return TenantState(Tenant('token', '1'), timestamp=0)
+
+
+class TestPollingPolicy:
+
+    def test_no_homeworks_uses_default(self, policy_module, tenant_state):
+        policy = policy_module.AdaptivePollingPolicy()
+        policy.observe(tenant_state, [])
+        assert policy.next_interval(tenant_state) == 600
+
+    def test_reviewing_polls_faster(self, policy_module, tenant_state):
+        policy = policy_module.AdaptivePollingPolicy()
+        policy.observe(tenant_state, [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+        ])
+        assert policy.next_interval(tenant_state) == (
+            policy_module.STATUS_INTERVALS['reviewing']
+        ), 'Пока работа на проверке, интервал должен быть коротким.'
+
+    def test_approved_backs_off(self, policy_module, tenant_state):
+        policy = policy_module.AdaptivePollingPolicy(max_interval=5000)
+        policy.observe(tenant_state, [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+        ])
+        intervals = [policy.next_interval(tenant_state)]
+        for _ in range(3):
+            policy.observe(tenant_state, [])
+            intervals.append(policy.next_interval(tenant_state))
+        assert intervals == [3600, 5000, 5000, 5000]
+
+    def test_status_transition(self, policy_module, tenant_state):
+        policy = policy_module.AdaptivePollingPolicy()
+        policy.observe(tenant_state, [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'}
+        ])
+        policy.observe(tenant_state, [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+        ])
+        assert tenant_state.statuses == {1: 'approved'}
+        assert policy.next_interval(tenant_state) == 3600
+
+    def test_rate_limit_is_honored(self, policy_module, tenant_state):
+        policy = policy_module.AdaptivePollingPolicy()
+        policy.on_rate_limit(tenant_state, 1800)
+        assert policy.next_interval(tenant_state) == 1800
+        assert policy.next_interval(tenant_state) == 600, (
+            'Пауза из Retry-After действует только на один опрос.'
+        )
+
+    def test_engine_reschedules_by_policy(self, policy_module):
+        from engine import PollingEngine, Tenant
+        from scheduler import Scheduler
+
+        scheduler = Scheduler(period=600, jitter=0, clock=lambda: 0)
+        session = utils.FakeSession(
+            {'token': {}}, http_status=HTTPStatus.TOO_MANY_REQUESTS,
+            headers={'Retry-After': '900'}
+        )
+        polling_engine = PollingEngine(
+            [Tenant('token', '1')], utils.RecordingTelegramBot(),
+            max_workers=1, session=session, scheduler=scheduler,
+            policy=policy_module.AdaptivePollingPolicy()
+        )
+        polling_engine.run_pending(now=0)
+        polling_engine.executor.shutdown(wait=True)
+        assert scheduler.next_due() == 900, (
+            'При ответе 429 следующий опрос откладывается на Retry-After.'
+        )
+
+    def test_errors_back_off_with_jitter(self, policy_module, tenant_state):
+        policy = policy_module.FixedPollingPolicy(
+            interval=100, max_backoff=1000, rand=lambda: 0.5
+        )
+        intervals = []
+        for _ in range(5):
+            policy.on_error(tenant_state)
+            intervals.append(policy.next_interval(tenant_state))
+        assert intervals == [150, 300, 600, 750, 750], (
+            'Пауза после ошибок должна расти вдвое до max_backoff.'
+        )
+        policy.observe(tenant_state, [])
+        policy.on_error(tenant_state)
+        assert policy.next_interval(tenant_state) == 150, (
+            'Успешный опрос должен сбрасывать счётчик ошибок.'
+        )
+
+    def test_backoff_is_spread(self, policy_module):
+        delays = {
+            policy_module.get_backoff(3, 10, rand=lambda: share)
+            for share in (0, 0.5, 1)
+        }
+        assert delays == {40, 60, 80}
@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def records_module():
+    import records
+    return records
+
+
+class TestRecords:
+
+    def test_status_is_interned(self, records_module, homework_module):
+        status = ''.join(['appr', 'oved'])
+        homework = records_module.Homework(1, status, 'hw')
+        verdict_status = next(
+            key for key in homework_module.HOMEWORK_VERDICTS
+            if key == 'approved'
+        )
+        assert homework.status is verdict_status, (
+            'Статус записи должен совпадать по объекту с ключом '
+            'HOMEWORK_VERDICTS.'
+        )
+        event = records_module.StatusEvent(1, 'hw', ''.join(['rej', 'ected']))
+        assert event.status is sys.intern('rejected')
+
+    def test_homework_is_dict_compatible(self, records_module):
+        data = {'id': 1, 'status': 'approved', 'homework_name': 'hw',
+                'lesson_name': 'Урок'}
+        homework = records_module.as_homework(data)
+        assert homework == data, (
+            'Запись должна быть равна словарю с теми же полями.'
+        )
+        assert homework.to_dict() == {
+            'id': 1, 'status': 'approved', 'homework_name': 'hw'
+        }
+        assert records_module.as_homework(homework) is homework
+        assert records_module.as_homework('text') == 'text'
+
+    def test_homework_is_smaller_than_dict(self, records_module):
+        data = {'id': 1, 'status': 'approved', 'homework_name': 'hw'}
+        homework = records_module.Homework.from_dict(data)
+        assert not hasattr(homework, '__dict__')
+        assert sys.getsizeof(homework) < sys.getsizeof(data)
+
+    def test_collect_events(self, records_module, homework_module):
+        homeworks = [
+            {'id': 1, 'status': 'approved', 'homework_name': 'hw1'},
+            records_module.Homework(2, 'reviewing', 'hw2'),
+        ]
+        events = homework_module.collect_events(homeworks, {1: 'approved'})
+        assert events == [records_module.StatusEvent(2, 'hw2', 'reviewing')]
+        assert homework_module.format_event(events[0]) == (
+            homework_module.parse_status(homeworks[1])
+        )
@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def rendering_module():
+    import rendering
+    return rendering
+
+
+@pytest.fixture
+def renderer(rendering_module):
+    return rendering_module.create_renderer(
+        {'approved': 'Принято {без} изменений.'}, locale='ru'
+    )
+
+
+class TestRendering:
+
+    def test_render_matches_template(self, renderer):
+        assert renderer.render('hw.zip', 'approved') == (
+            'Изменился статус проверки работы "hw.zip". '
+            'Принято {без} изменений.'
+        ), 'Фигурные скобки в вердикте должны выводиться как есть.'
+        assert renderer.render('hw.zip', 'approved', 'en').startswith(
+            'Homework "hw.zip" status changed.'
+        )
+        with pytest.raises(KeyError):
+            renderer.render('hw.zip', 'lost')
+
+    def test_messages_are_cached(self, renderer):
+        for _ in range(3):
+            renderer.render('hw.zip', 'approved')
+        info = renderer.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    def test_cache_evicts_old_messages(self, rendering_module):
+        renderer = rendering_module.MessageRenderer('ru', cache_size=2)
+        renderer.add_locale('ru', '{homework_name}: {verdict}', {'ok': 'да'})
+        for name in ('a', 'b', 'c', 'a'):
+            renderer.render(name, 'ok')
+        info = renderer.cache_info()
+        assert info.currsize == 2 and info.misses == 4, (
+            'Кеш должен вытеснять давно не использованные сообщения.'
+        )
+
+    def test_new_verdict_is_accepted_by_parse_status(self, homework_module):
+        renderer = homework_module.renderer
+        renderer.add_verdict('on_hold', 'Проверка отложена.')
+        try:
+            assert homework_module.parse_status(
+                {'status': 'on_hold', 'homework_name': 'hw'}
+            ) == 'Изменился статус проверки работы "hw". Проверка отложена.'
+        finally:
+            renderer.remove_verdict('on_hold')
+        assert 'on_hold' not in homework_module.HOMEWORK_VERDICTS
+        with pytest.raises(ValueError):
+            homework_module.parse_status(
+                {'status': 'on_hold', 'homework_name': 'hw'}
+            )
@@ -0,0 +1,112 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+
+class CountingResponse:
+    def __init__(self, data, status_code=HTTPStatus.OK, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data).encode()
+        self.text = self.content.decode()
+        self.json_calls = 0
+        self.data = data
+
+    def json(self):
+        self.json_calls += 1
+        return self.data
+
+
+class ScriptedSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache():
+    from response_cache import ResponseCache
+    return ResponseCache()
+
+
+class TestResponseCache:
+    DATA = {'homeworks': [], 'current_date': 10}
+
+    def test_identical_body_is_not_parsed(self, cache, homework_module):
+        second = CountingResponse(self.DATA)
+        session = ScriptedSession(CountingResponse(self.DATA), second)
+        first_result = homework_module.request_homework_statuses(
+            1, homework_module.HEADERS, session, cache
+        )
+        second_result = homework_module.request_homework_statuses(
+            1, homework_module.HEADERS, session, cache
+        )
+        assert first_result == self.DATA
+        assert second_result is None, (
+            'Неизменившийся ответ не должен возвращаться повторно.'
+        )
+        assert second.json_calls == 0, (
+            'Неизменившийся ответ не должен разбираться из JSON.'
+        )
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_server_time_is_ignored(self, cache, homework_module):
+        session = ScriptedSession(
+            CountingResponse({'homeworks': [], 'current_date': 10}),
+            CountingResponse({'homeworks': [], 'current_date': 11}),
+            CountingResponse({
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 12
+            })
+        )
+        results = [
+            homework_module.request_homework_statuses(
+                1, homework_module.HEADERS, session, cache
+            )
+            for _ in range(3)
+        ]
+        assert results[1] is None, (
+            'Ответ, в котором изменилось только current_date, '
+            'не должен разбираться повторно.'
+        )
+        assert results[2]['current_date'] == 12
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_conditional_headers_are_sent(self, cache, homework_module):
+        session = ScriptedSession(
+            CountingResponse(self.DATA, headers={
+                'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024'
+            }),
+            CountingResponse({}, status_code=HTTPStatus.NOT_MODIFIED)
+        )
+        homework_module.request_homework_statuses(
+            1, homework_module.HEADERS, session, cache
+        )
+        result = homework_module.request_homework_statuses(
+            1, homework_module.HEADERS, session, cache
+        )
+        assert 'If-None-Match' not in session.sent_headers[0]
+        assert session.sent_headers[1]['If-None-Match'] == '"v1"'
+        assert session.sent_headers[1]['If-Modified-Since'] == (
+            'Mon, 01 Jan 2024'
+        )
+        assert result is None, 'На ответ 304 должен возвращаться None.'
+
+    def test_other_from_date_is_a_miss(self, cache, homework_module):
+        session = ScriptedSession(
+            CountingResponse(self.DATA), CountingResponse(self.DATA)
+        )
+        homework_module.request_homework_statuses(
+            1, homework_module.HEADERS, session, cache
+        )
+        result = homework_module.request_homework_statuses(
+            2, homework_module.HEADERS, session, cache
+        )
+        assert result == self.DATA
+        assert session.sent_headers[1] == homework_module.HEADERS
+        assert len(cache) == 1
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def scheduler_module():
+    import scheduler
+    return scheduler
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler:
+
+    def test_spread_is_even(self, scheduler_module):
+        scheduler = scheduler_module.Scheduler(
+            period=100, jitter=0, clock=FakeClock()
+        )
+        scheduler.spread(range(10))
+        due = [due for due, _ in scheduler.pop_due(now=100)]
+        assert due == [float(i * 10) for i in range(10)], (
+            'Задачи должны равномерно распределяться по периоду.'
+        )
+
+    def test_jitter_stays_inside_slot(self, scheduler_module):
+        scheduler = scheduler_module.Scheduler(
+            period=100, jitter=0.5, clock=FakeClock()
+        )
+        scheduler.spread(range(10))
+        for due, job in scheduler.pop_due(now=100):
+            assert job * 10 <= due <= job * 10 + 5
+
+    def test_pop_due_returns_only_ready_jobs(self, scheduler_module):
+        scheduler = scheduler_module.Scheduler(period=10, clock=FakeClock())
+        scheduler.schedule('late', 5)
+        scheduler.schedule('early', 1)
+        assert [job for _, job in scheduler.pop_due(now=2)] == ['early']
+        assert len(scheduler) == 1
+        assert scheduler.wait_time(now=2) == 3
+
+    def test_reschedule_keeps_cadence(self, scheduler_module):
+        scheduler = scheduler_module.Scheduler(period=10, clock=FakeClock())
+        assert scheduler.reschedule('job', 3, now=7) == 13, (
+            'Следующий запуск считается от запланированного времени.'
+        )
+        assert scheduler.reschedule('job', 3, now=35) == 43, (
+            'Пропущенные запуски не должны догоняться.'
+        )
+
+    def test_many_jobs(self, scheduler_module):
+        scheduler = scheduler_module.Scheduler(
+            period=600, jitter=0, clock=FakeClock()
+        )
+        started = time.perf_counter()
+        scheduler.spread(range(100_000))
+        assert time.perf_counter() - started < 5
+        assert len(scheduler) == 100_000
+        assert len(scheduler.pop_due(now=300)) == pytest.approx(
+            50_000, abs=1
+        ), 'К середине периода должна наступить половина запусков.'
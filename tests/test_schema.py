@@ -0,0 +1,94 @@
+import pytest
+
+
+@pytest.fixture
+def schema_module():
+    import schema
+    return schema
+
+
+@pytest.fixture
+def response_schema(schema_module):
+    field = schema_module.Field
+    homework = field(dict, fields={
+        'status': field(choices={'approved', 'rejected'}, messages={
+            'choice': 'Неизвестный статус: {value}',
+        }),
+        'homework_name': field(str),
+    })
+    return field(dict, fields={
+        'homeworks': field(list, items=homework),
+        'current_date': field(int, required=False),
+    })
+
+
+class TestSchema:
+
+    def test_valid_value_has_no_errors(self, schema_module,
+                                       response_schema):
+        validate = schema_module.compile_schema(response_schema)
+        assert validate({
+            'homeworks': [{'status': 'approved', 'homework_name': 'hw'}],
+            'current_date': 1,
+        }) == []
+        assert validate({'homeworks': []}) == [], (
+            'Необязательный ключ может отсутствовать.'
+        )
+
+    def test_errors_have_paths(self, schema_module, response_schema):
+        validate = schema_module.compile_schema(response_schema)
+        errors = validate({
+            'homeworks': [
+                {'status': 'approved', 'homework_name': 'hw'},
+                {'status': 'unknown', 'homework_name': 1},
+                {'homework_name': 'hw'},
+            ],
+            'current_date': 'today',
+        })
+        assert [(error.path, error.kind) for error in errors] == [
+            (('homeworks', 1, 'status'), 'choice'),
+            (('homeworks', 1, 'homework_name'), 'type'),
+            (('homeworks', 2, 'status'), 'missing'),
+            (('current_date',), 'type'),
+        ]
+        assert errors[0].message == 'Неизвестный статус: unknown'
+
+    def test_wrong_container_types(self, schema_module, response_schema):
+        validate = schema_module.compile_schema(response_schema)
+        assert [error.kind for error in validate([])] == ['type']
+        assert [error.path for error in validate({'homeworks': {}})] == [
+            ('homeworks',)
+        ]
+        assert [error.kind for error in validate({})] == ['missing']
+
+    def test_batch_validation(self, schema_module, response_schema):
+        validate_batch = schema_module.compile_batch(response_schema)
+        good = {'homeworks': [{'status': 'rejected', 'homework_name': 'a'}]}
+        assert validate_batch([good, good]) == []
+        errors = validate_batch([good, {'homeworks': None}, good, 'text'])
+        assert [error.path for error in errors] == [(1, 'homeworks'), (3,)], (
+            'Путь ошибки должен начинаться с индекса ответа в пачке.'
+        )
+
+    def test_dict_subclass_is_accepted(self, schema_module,
+                                       response_schema):
+        from collections import OrderedDict
+        validate = schema_module.compile_schema(response_schema)
+        assert validate(OrderedDict(homeworks=[])) == []
+
+
+class TestHomeworkSchema:
+
+    def test_collect_messages_falls_back_on_invalid(self):
+        import homework
+        messages, _ = homework.collect_messages(
+            [{'id': 1, 'status': 'approved', 'homework_name': 'hw'}], {}
+        )
+        assert messages == [homework.parse_status(
+            {'status': 'approved', 'homework_name': 'hw'}
+        )]
+        with pytest.raises(ValueError, match='Неизвестный статус работы'):
+            homework.collect_messages(
+                [{'id': 1, 'status': 'approved', 'homework_name': 'hw'},
+                 {'id': 2, 'status': 'lost', 'homework_name': 'hw'}], {}
+            )
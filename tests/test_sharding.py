@@ -0,0 +1,185 @@
+import multiprocessing
+import queue
+import time
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def sharding_module():
+    import sharding
+    return sharding
+
+
+def make_tenants(count):
+    from engine import Tenant
+    return [Tenant(f'token{index}', str(index)) for index in range(count)]
+
+
+def idle_worker(index, tenants, assignments):
+    for _ in iter(assignments.get, None):
+        pass
+
+
+def failing_worker(index, tenants, assignments):
+    if index == 0:
+        raise SystemExit(3)
+    idle_worker(index, tenants, assignments)
+
+
+class FakeProcess:
+
+    def __init__(self, target, args, name, daemon):
+        self.args = args
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return True
+
+
+class FakeContext:
+    """Контекст multiprocessing, который не запускает процессы."""
+
+    def __init__(self):
+        self.spawned = []
+
+    def Queue(self):
+        return queue.Queue()
+
+    def Process(self, **kwargs):
+        process = FakeProcess(**kwargs)
+        self.spawned.append(process)
+        return process
+
+
+def owners(assignment):
+    return {
+        tenant: node for node, tenants in assignment.items()
+        for tenant in tenants
+    }
+
+
+class TestSharding:
+
+    def test_ring_spreads_tenants_evenly(self, sharding_module):
+        tenants = make_tenants(4000)
+        assignment = sharding_module.HashRing(range(4)).assign(tenants)
+        for tenants_of_node in assignment.values():
+            assert 700 < len(tenants_of_node) < 1300, (
+                'Подписчики должны делиться между узлами примерно поровну.'
+            )
+
+    def test_shared_token_stays_on_one_node(self, sharding_module):
+        from engine import Tenant
+
+        ring = sharding_module.HashRing(range(8))
+        nodes = {
+            ring.node_for(tenant.token)
+            for tenant in [Tenant('shared', str(chat)) for chat in range(20)]
+        }
+        assert len(nodes) == 1, (
+            'Подписчики с общим токеном должны попадать на один узел.'
+        )
+
+    def test_join_and_leave_move_only_own_share(self, sharding_module):
+        tenants = make_tenants(2000)
+        ring = sharding_module.HashRing(range(4))
+        before = owners(ring.assign(tenants))
+        ring.add(4)
+        after_join = owners(ring.assign(tenants))
+        moved = [t for t in tenants if before[t] != after_join[t]]
+        assert all(after_join[tenant] == 4 for tenant in moved), (
+            'При добавлении узла подписчики переезжают только на него.'
+        )
+        assert len(moved) < len(tenants) * 0.3
+        ring.remove(4)
+        assert owners(ring.assign(tenants)) == before, (
+            'После удаления узла раскладка должна вернуться к прежней.'
+        )
+
+    def test_select_shard_partitions_tenants(self, sharding_module):
+        tenants = make_tenants(300)
+        shards = [
+            sharding_module.select_shard(tenants, index, 3)
+            for index in range(3)
+        ]
+        assert sorted(sum(shards, []), key=tenants.index) == tenants, (
+            'Каждый подписчик должен попасть ровно в один шард.'
+        )
+
+    def test_engine_assign_replaces_tenants(self, sharding_module):
+        from engine import PollingEngine
+
+        tenants = make_tenants(6)
+        polling_engine = PollingEngine(
+            tenants[:4], utils.RecordingTelegramBot(),
+            session=utils.FakeSession({})
+        )
+        kept = polling_engine.states[2]
+        polling_engine.assign(tenants[2:])
+        assert [state.tenant for state in polling_engine.states] == (
+            tenants[2:]
+        )
+        assert polling_engine.states[0] is kept, (
+            'Состояние оставшегося подписчика должно сохраняться.'
+        )
+        assert len(polling_engine.scheduler) == 4
+
+    def test_workers_start_with_final_share(self, sharding_module):
+        tenants = make_tenants(200)
+        context = FakeContext()
+        coordinator = sharding_module.Coordinator(
+            tenants, workers=4, context=context
+        ).start()
+        started = [process.args[1] for process in context.spawned]
+        assert sorted(sum(started, []), key=tenants.index) == tenants, (
+            'При старте процессы не должны делить подписчиков.'
+        )
+        assert all(
+            assignments.empty()
+            for _, assignments in coordinator.processes.values()
+        ), 'Процессы должны стартовать сразу с окончательной долей.'
+
+    def test_shard_index_from_dyno(self, sharding_module):
+        get_shard_index = sharding_module.get_shard_index
+        assert get_shard_index({'DYNO': 'shards.3'}) == 2
+        assert get_shard_index({'DYNO': 'shards.3', 'SHARD_INDEX': '0'}) == 0
+        assert get_shard_index({'DYNO': 'run.1234x'}) == 0
+        assert get_shard_index({}) == 0
+
+    def test_invalid_shard_config_stops_program(self, sharding_module):
+        check = sharding_module.check_shard_config
+        with pytest.raises(ValueError):
+            sharding_module.select_shard(make_tenants(3), 2, 1)
+        with pytest.raises(SystemExit):
+            check(index=2, count=1, workers=1, store_url=None)
+        for store_url in (None, 'log:///state.log'):
+            with pytest.raises(SystemExit):
+                check(index=0, count=1, workers=2, store_url=store_url)
+        check(index=0, count=1, workers=1, store_url=None)
+        check(index=1, count=2, workers=2, store_url='sqlite:///state.db')
+
+    def test_coordinator_rebalances_on_failure(self, sharding_module):
+        tenants = make_tenants(200)
+        coordinator = sharding_module.Coordinator(
+            tenants, workers=3, target=failing_worker,
+            context=multiprocessing.get_context('fork')
+        )
+        coordinator.start()
+        try:
+            deadline = time.monotonic() + 5
+            dead = []
+            while not dead and time.monotonic() < deadline:
+                time.sleep(0.05)
+                dead = coordinator.check_workers()
+            assert dead == [0]
+            assert sorted(coordinator.assignment) == [1, 2]
+            assert sorted(
+                sum(coordinator.assignment.values(), []), key=tenants.index
+            ) == tenants, 'Подписчики упавшего процесса должны переехать.'
+        finally:
+            coordinator.stop()
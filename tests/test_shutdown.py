@@ -0,0 +1,129 @@
+import inspect
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def shutdown_module():
+    import shutdown
+    return shutdown
+
+
+def send_sigterm(delay=0.0):
+    timer = threading.Timer(delay, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+    return timer
+
+
+class StoreSpy:
+
+    def __init__(self):
+        from state_store import MemoryStateStore
+
+        self.store = MemoryStateStore()
+        self.closed = False
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def close(self):
+        self.closed = True
+
+
+class TestGracefulShutdown:
+
+    def test_signal_sets_event_and_handler_is_restored(self,
+                                                       shutdown_module):
+        previous = signal.getsignal(signal.SIGTERM)
+        with shutdown_module.GracefulShutdown() as shutdown:
+            os.kill(os.getpid(), signal.SIGTERM)
+            assert shutdown.requested, 'SIGTERM должен запрашивать завершение.'
+        assert signal.getsignal(signal.SIGTERM) is previous
+
+    def test_signal_interrupts_wait(self, shutdown_module):
+        started = time.monotonic()
+        with shutdown_module.GracefulShutdown() as shutdown:
+            send_sigterm(0.1)
+            with pytest.raises(shutdown_module.ShutdownRequested):
+                with shutdown.interruptible():
+                    time.sleep(10)
+        assert time.monotonic() - started < 5, (
+            'Сигнал должен прерывать паузу между опросами сразу.'
+        )
+
+    def test_engine_drains_sends_and_flushes_state(self, random_timestamp):
+        from dispatcher import SendDispatcher
+        from engine import PollingEngine, Tenant
+        from shutdown import GracefulShutdown
+
+        tenants = [Tenant(f'token{index}', str(index)) for index in range(10)]
+        data = {
+            tenant.token: {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            for tenant in tenants
+        }
+        bot = utils.RecordingTelegramBot()
+        store = StoreSpy()
+        polling_engine = PollingEngine(
+            tenants, SendDispatcher(bot, workers=2).start(),
+            session=utils.FakeSession(data), store=store
+        )
+        shutdown = GracefulShutdown()
+        shutdown.request()
+        polling_engine.run_forever(shutdown)
+        polling_engine.run_once()
+        assert polling_engine.shutdown(timeout=10), (
+            'Движок должен успеть дописать очередь отправки.'
+        )
+        assert len(bot.sent) == len(tenants), (
+            'Изменения, полученные до остановки, не должны теряться.'
+        )
+        assert store.closed, 'При остановке состояние сбрасывается на диск.'
+
+    def test_main_finishes_iteration_on_sigterm(self, monkeypatch,
+                                                homework_module):
+        import telegram
+
+        bot = utils.RecordingTelegramBot()
+        monkeypatch.setattr(telegram, 'Bot', lambda **kwargs: bot)
+
+        def get_api_answer(timestamp):
+            os.kill(os.getpid(), signal.SIGTERM)
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': timestamp + 1
+            }
+
+        monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+        inspect.unwrap(homework_module.main)()
+        assert len(bot.sent) == 1, (
+            'Сообщение, полученное до сигнала, должно быть отправлено.'
+        )
+
+    def test_alerts_bypass_stopped_dispatcher(self, monkeypatch,
+                                              homework_module):
+        from dispatcher import PRIORITY_ALERT, SendDispatcher
+        from engine import PollingEngine, Tenant
+
+        bot = utils.RecordingTelegramBot()
+        dispatcher = SendDispatcher(bot, workers=1).start()
+        monkeypatch.setattr(
+            homework_module.telegram_handler, '_bot',
+            dispatcher.lane(PRIORITY_ALERT)
+        )
+        polling_engine = PollingEngine(
+            [Tenant('token', '1')], dispatcher,
+            session=utils.FakeSession({})
+        )
+        assert polling_engine.shutdown(timeout=5)
+        assert homework_module.telegram_handler.get_bot() is bot, (
+            'После остановки очереди оповещения должны уходить напрямую.'
+        )
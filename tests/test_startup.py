@@ -0,0 +1,88 @@
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def homework_import(tmp_path):
+    code = (
+        'import sys, threading, homework; '
+        'print(",".join(name for name in ("telegram", "requests") '
+        'if name in sys.modules)); '
+        'print(threading.active_count())'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=tmp_path, capture_output=True,
+        text=True, check=True, env={**os.environ, 'PYTHONPATH': ROOT}
+    )
+    return result.stdout.split('\n'), tmp_path
+
+
+class TestStartup:
+
+    def test_import_is_lazy(self, homework_import):
+        (heavy, threads, _), _ = homework_import
+        assert heavy == '', (
+            'Импорт homework не должен загружать telegram и requests.'
+        )
+        assert threads == '1', (
+            'Импорт homework не должен запускать потоки журнала.'
+        )
+
+    def test_import_creates_no_files(self, homework_import):
+        _, workdir = homework_import
+        assert os.listdir(workdir) == [], (
+            'Импорт homework не должен создавать main.log.'
+        )
+
+    def test_log_file_is_appended(self, monkeypatch, tmp_path,
+                                  homework_module):
+        path = tmp_path / 'main.log'
+        path.write_text('старая запись\n', encoding='utf-8')
+        monkeypatch.setattr(homework_module, 'LOG_FILE', str(path))
+        handler = homework_module.get_file_handler()
+        handler.close()
+        assert path.read_text(encoding='utf-8') == 'старая запись\n', (
+            'Журнал прошлого запуска не должен затираться.'
+        )
+
+    def test_init_is_idempotent(self, monkeypatch, homework_module):
+        listener = object()
+        monkeypatch.setattr(homework_module, 'log_listener', listener)
+        assert homework_module.init() is listener
+
+    def test_module_loggers_reach_handlers(self, monkeypatch, tmp_path,
+                                           homework_module):
+        from logging_utils import DroppingQueueHandler, stop_queue_logging
+
+        records = []
+        monkeypatch.setattr(
+            homework_module, 'LOG_FILE', str(tmp_path / 'main.log')
+        )
+        monkeypatch.setattr(homework_module, 'log_listener', None)
+        monkeypatch.setattr(
+            homework_module.telegram_handler, 'emit', records.append
+        )
+        root = logging.getLogger()
+        monkeypatch.setattr(root, 'handlers', [
+            handler for handler in root.handlers
+            if not isinstance(handler, DroppingQueueHandler)
+        ])
+        listener = homework_module.init()
+        try:
+            logging.getLogger('engine').error('Ошибка опроса')
+            logging.getLogger('aiohttp.server').error('Ошибка библиотеки')
+            logging.error('Сбой отправки')
+        finally:
+            stop_queue_logging(listener)
+        assert [record.getMessage() for record in records] == [
+            'Ошибка опроса'
+        ], (
+            'Ошибки движка должны доходить до оповещения в Telegram, '
+            'а ошибки сторонних библиотек и корневого логера - нет.'
+        )
@@ -0,0 +1,181 @@
+import inspect
+import os
+import signal
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def state_store_module():
+    import state_store
+    return state_store
+
+
+@pytest.fixture(params=['sqlite', 'log'])
+def store_url(request, tmp_path):
+    return f'{request.param}:///{tmp_path / "state"}'
+
+
+class TestStateStore:
+
+    def test_memory_store(self, state_store_module):
+        store = state_store_module.open_state_store()
+        store.set_cursor('tenant', 10)
+        store.set_status('tenant', 1, 'approved')
+        assert store.get_cursor('tenant') == 10
+        assert store.get_statuses('tenant') == {1: 'approved'}
+        assert store.get_cursor('other') is None
+
+    def test_state_survives_reopen(self, state_store_module, store_url):
+        store = state_store_module.open_state_store(store_url)
+        store.set_cursor('tenant', 10)
+        store.set_status('tenant', 1, 'reviewing')
+        store.set_status('tenant', 1, 'approved')
+        store.set_status('tenant', 'hw', 'rejected')
+        store.set_name('tenant', 1, 'hw1')
+        store.close()
+
+        reopened = state_store_module.open_state_store(store_url)
+        assert reopened.get_cursor('tenant') == 10, (
+            'Метка времени должна переживать перезапуск.'
+        )
+        assert reopened.get_statuses('tenant') == {
+            1: 'approved', 'hw': 'rejected'
+        }, 'Отправленные статусы должны переживать перезапуск.'
+        assert reopened.get_names('tenant') == {1: 'hw1'}
+        reopened.close()
+
+    def test_writes_are_batched(self, state_store_module, tmp_path):
+        path = tmp_path / 'state.log'
+        store = state_store_module.LogStateStore(
+            str(path), batch_size=3, flush_interval=60
+        )
+        store.set_cursor('a', 1)
+        store.set_cursor('b', 1)
+        assert path.stat().st_size == 0, (
+            'Изменения должны записываться пачками.'
+        )
+        store.set_cursor('c', 1)
+        assert path.read_bytes().count(b'\n') == 3
+        store.close()
+
+    def test_sqlite_reload_reads_other_process(self, state_store_module,
+                                               tmp_path):
+        path = str(tmp_path / 'state.db')
+        reader = state_store_module.SQLiteStateStore(path)
+        writer = state_store_module.SQLiteStateStore(path)
+        writer.set_cursor('tenant', 42)
+        writer.set_status('tenant', 1, 'approved')
+        writer.flush()
+        assert reader.get_cursor('tenant') is None
+        reader.reload('tenant')
+        assert reader.get_cursor('tenant') == 42
+        assert reader.get_statuses('tenant') == {1: 'approved'}, (
+            'reload должен подхватывать записи другого процесса.'
+        )
+        writer.close()
+        reader.close()
+
+    def test_log_is_compacted(self, state_store_module, tmp_path):
+        path = str(tmp_path / 'state.log')
+        store = state_store_module.LogStateStore(path, batch_size=1)
+        for timestamp in range(50):
+            store.set_cursor('tenant', timestamp)
+        store.close()
+        reopened = state_store_module.LogStateStore(path, batch_size=1)
+        assert reopened.get_cursor('tenant') == 49
+        with open(path, 'rb') as log_file:
+            assert log_file.read().count(b'\n') == 1
+        reopened.close()
+
+    def test_torn_write_is_dropped(self, state_store_module, tmp_path):
+        path = tmp_path / 'state.log'
+        path.write_bytes(
+            b'["cursor", "tenant", null, 5]\n["status", "ten'
+        )
+        store = state_store_module.LogStateStore(str(path))
+        assert store.get_cursor('tenant') == 5
+        store.set_cursor('tenant', 6)
+        store.close()
+        reopened = state_store_module.LogStateStore(str(path))
+        assert reopened.get_cursor('tenant') == 6
+        reopened.close()
+
+    def test_line_without_newline_is_dropped(self, state_store_module,
+                                             tmp_path):
+        path = tmp_path / 'state.log'
+        path.write_bytes(
+            b'["cursor", "tenant", null, 5]\n'
+            b'["status", "tenant", 1, "approved"]'
+        )
+        store = state_store_module.LogStateStore(str(path))
+        assert store.get_statuses('tenant') == {}
+        store.set_status('tenant', 2, 'reviewing')
+        store.close()
+        reopened = state_store_module.LogStateStore(str(path))
+        assert reopened.get_cursor('tenant') == 5, (
+            'Строка без перевода строки не должна склеиваться со следующей.'
+        )
+        assert reopened.get_statuses('tenant') == {2: 'reviewing'}
+        reopened.close()
+
+    def test_main_flushes_after_each_poll(self, monkeypatch, tmp_path,
+                                          homework_module):
+        import telegram
+
+        path = tmp_path / 'state.log'
+        monkeypatch.setattr(telegram, 'Bot', utils.RecordingTelegramBot)
+        monkeypatch.setattr(
+            homework_module, 'STATE_STORE_URL', f'log:///{path}'
+        )
+        monkeypatch.setattr(homework_module, 'RETRY_PERIOD', 0)
+        answers = [{
+            'homeworks': [{'id': 1, 'homework_name': 'hw',
+                           'status': 'approved'}],
+            'current_date': 1
+        }]
+        persisted = []
+
+        def get_api_answer(timestamp):
+            if answers:
+                return answers.pop()
+            persisted.append(path.read_bytes().count(b'\n'))
+            os.kill(os.getpid(), signal.SIGTERM)
+            return {'homeworks': [], 'current_date': timestamp}
+
+        monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+        inspect.unwrap(homework_module.main)()
+        assert persisted == [2], (
+            'Состояние опроса должно попадать на диск до следующего опроса.'
+        )
+
+    def test_engine_restores_state(self, state_store_module, store_url,
+                                   random_timestamp):
+        from engine import PollingEngine, Tenant
+
+        tenants = [Tenant('token', '1')]
+        session = utils.FakeSession({'token': {
+            'homeworks': [{'id': 7, 'homework_name': 'hw',
+                           'status': 'approved'}],
+            'current_date': random_timestamp
+        }})
+        store = state_store_module.open_state_store(store_url)
+        bot = utils.RecordingTelegramBot()
+        PollingEngine(
+            tenants, bot, max_workers=1, session=session, store=store
+        ).run_once()
+        store.close()
+
+        store = state_store_module.open_state_store(store_url)
+        restarted = PollingEngine(
+            tenants, bot, max_workers=1, session=session, store=store
+        )
+        assert restarted.states[0].timestamp == random_timestamp
+        restarted.run_once()
+        assert len(bot.sent) == 1, (
+            'После перезапуска уже отправленный статус не должен '
+            'отправляться повторно.'
+        )
+        store.close()
@@ -1,3 +1,4 @@
+import json
 import logging
 import signal
 import re
@@ -165,3 +166,34 @@ def with_timeout(f):
             )
 
     return inner
+
+
+class RecordingTelegramBot:
+    """Bot stub that remembers every sent message."""
+
+    def __init__(self, **kwargs):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class FakeSession:
+    """Session stub answering with per-token data."""
+
+    def __init__(self, data_by_token, http_status=HTTPStatus.OK,
+                 headers=None):
+        self.data_by_token = data_by_token
+        self.http_status = http_status
+        self.headers = headers or {}
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        token = headers['Authorization'].split(' ', 1)[1]
+        self.calls.append((token, params['from_date']))
+        response = MockResponseGET(
+            http_status=self.http_status, data=self.data_by_token[token]
+        )
+        response.headers = self.headers
+        response.content = json.dumps(response.data).encode()
+        return response